@@ -0,0 +1,183 @@
+import hashlib
+import json
+import math
+import re
+import time
+from collections import Counter, OrderedDict
+from typing import TypedDict
+from app.config import ANSWER_CACHE_TTL, ANSWER_CACHE_THRESHOLD, ANSWER_CACHE_MAX_ENTRIES
+from app.metrics import register_cache
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+# Words that change what a question asks for while barely moving its trigram
+# vector, mapped to a canonical term. Two questions only match if they
+# mention the same set of these (and the same numbers).
+_KEY_TERMS = {
+    **{
+        word: word
+        for word in (
+            "cpa", "cpc", "cpm", "ctr", "cvr", "roas", "roi", "spend", "cost", "budget",
+            "revenue", "profit", "impressions", "clicks", "conversions", "leads", "reach",
+        )
+    },
+    "impression": "impressions",
+    "click": "clicks",
+    "conversion": "conversions",
+    "lead": "leads",
+    "spent": "spend",
+    "costs": "cost",
+    **{
+        word: word
+        for word in (
+            "google", "meta", "bing", "microsoft", "linkedin", "tiktok", "twitter",
+            "pinterest", "snapchat", "reddit", "amazon", "youtube", "instagram", "stripe",
+        )
+    },
+    "facebook": "meta",
+    "ga": "analytics",
+    "analytics": "analytics",
+    **{
+        word: word
+        for word in ("today", "yesterday", "day", "week", "month", "quarter", "year")
+    },
+    "days": "day",
+    "weeks": "week",
+    "months": "month",
+    "quarters": "quarter",
+    "years": "year",
+    "last": "last",
+    "past": "last",
+    "previous": "last",
+    "this": "this",
+    "current": "this",
+}
+
+
+def normalize_question(question: str) -> str:
+    text = _PUNCTUATION_RE.sub("", question.lower())
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def kpi_fingerprint(kpi_rows: list[dict]) -> str:
+    payload = json.dumps(kpi_rows, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def key_terms(key: str) -> frozenset[str]:
+    """Numbers and canonical metric, platform and period words in `key`."""
+    terms = {_KEY_TERMS[word] for word in key.split() if word in _KEY_TERMS}
+    return frozenset(terms.union(_NUMBER_RE.findall(key)))
+
+
+def _trigrams(text: str) -> Counter:
+    padded = f" {text} "
+    return Counter(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+class CachedAnswer(TypedDict):
+    answer: str
+    vector: Counter
+    norm: float
+    terms: frozenset[str]
+    stored_at: float
+
+
+class AnswerCache:
+    """Copilot answer cache that also matches near-duplicate questions.
+
+    Entries are partitioned by tenant and KPI snapshot fingerprint, so an
+    answer is only served against the data it was generated from; when
+    `kpi_rows` change the old partitions simply stop matching and only the
+    `max_snapshots` most recent ones per tenant are kept. Questions are compared by
+    character-trigram cosine similarity and must mention the same numbers
+    and the same metric, platform and period words (see `key_terms`), so
+    "last 7 days" never matches "last 30 days" and "cpa" never matches "cpc".
+    """
+
+    def __init__(
+        self,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        ttl: float = ANSWER_CACHE_TTL,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        max_snapshots: int = 4,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_snapshots = max_snapshots
+        self.hits = 0
+        self.misses = 0
+        self._partitions: OrderedDict[tuple[str, str], OrderedDict[str, CachedAnswer]] = (
+            OrderedDict()
+        )
+
+    def _partition(self, tenant_id: str, fingerprint: str) -> OrderedDict[str, CachedAnswer]:
+        key = (tenant_id, fingerprint)
+        partition = self._partitions.get(key)
+        if partition is None:
+            partition = self._partitions[key] = OrderedDict()
+            snapshots = [k for k in self._partitions if k[0] == tenant_id]
+            for old_key in snapshots[: -self.max_snapshots]:
+                del self._partitions[old_key]
+        self._partitions.move_to_end(key)
+        return partition
+
+    def get(self, tenant_id: str, fingerprint: str, question: str) -> str | None:
+        entries = self._partition(tenant_id, fingerprint)
+        key = normalize_question(question)
+        now = time.monotonic()
+        while entries and now - next(iter(entries.values()))["stored_at"] >= self.ttl:
+            entries.popitem(last=False)
+        entry = entries.get(key)
+        if entry is None:
+            vector = _trigrams(key)
+            norm = math.sqrt(sum(v * v for v in vector.values()))
+            terms = key_terms(key)
+            best_score = self.threshold
+            for candidate in entries.values():
+                if candidate["terms"] != terms or not norm:
+                    continue
+                candidate_vector = candidate["vector"]
+                dot = sum(
+                    count * candidate_vector[gram]
+                    for gram, count in vector.items()
+                    if gram in candidate_vector
+                )
+                score = dot / (norm * candidate["norm"])
+                if score >= best_score:
+                    best_score = score
+                    entry = candidate
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["answer"]
+
+    def put(self, tenant_id: str, fingerprint: str, question: str, answer: str):
+        entries = self._partition(tenant_id, fingerprint)
+        key = normalize_question(question)
+        vector = _trigrams(key)
+        entries[key] = {
+            "answer": answer,
+            "vector": vector,
+            "norm": math.sqrt(sum(v * v for v in vector.values())),
+            "terms": key_terms(key),
+            "stored_at": time.monotonic(),
+        }
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def invalidate(self, tenant_id: str | None = None):
+        if tenant_id is None:
+            self._partitions.clear()
+            return
+        for key in [k for k in self._partitions if k[0] == tenant_id]:
+            del self._partitions[key]
+
+
+answer_cache = AnswerCache()
+register_cache("answers", answer_cache)
@@ -1,39 +1,60 @@
 import reflex as rx
 import logging
 from fastapi import FastAPI, Request, Depends, HTTPException
+from fastapi.responses import JSONResponse, Response
 from app.connexify.webhooks import verify_signature
-from pydantic import BaseModel
+from app.connexify.webhook_queue import webhook_queue
+from app.metrics import PROMETHEUS_CONTENT_TYPE, render_prometheus
+from pydantic import BaseModel, ValidationError
 from typing import Literal
 
 
 class WebhookPayload(BaseModel):
     event: str
     data: dict
+    id: str | None = None
+
+
+async def verified_payload(data: dict = Depends(verify_signature)) -> WebhookPayload:
+    try:
+        return WebhookPayload(**data)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
 
 
 async def connexify_webhook_handler(
-    payload: WebhookPayload,
     request: Request,
-    signature: str = Depends(verify_signature),
+    payload: WebhookPayload = Depends(verified_payload),
 ):
     """
     Handle incoming webhooks from Connexify.
-    The signature is verified by the `verify_signature` dependency.
+    The body is read, verified and decoded once by the `verify_signature`
+    dependency. The event is queued for background processing and
+    acknowledged with 202 right away; redeliveries of an event id that was
+    already received are ignored.
     """
+    # The signature is an HMAC of the body, so it identifies redeliveries too.
+    event_id = (
+        request.headers.get("x-connexify-event-id")
+        or payload.id
+        or request.headers["x-connexify-signature"]
+    )
     logging.info(
-        f"Received Connexify webhook. Event: {payload.event}, Client ID: {payload.data.get('client_id')}"
+        f"Received Connexify webhook {event_id}. Event: {payload.event}, Client ID: {payload.data.get('client_id')}"
+    )
+    accepted = await webhook_queue.enqueue(event_id, payload.event, payload.data)
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": "accepted" if accepted else "duplicate",
+            "event_received": payload.event,
+        },
     )
-    if payload.event == "account.connected":
-        logging.info(
-            f"Account connected for client: {payload.data.get('client_id')}. Triggering sync."
-        )
-    elif payload.event == "onboarding.completed":
-        logging.info(
-            f"Onboarding completed for client: {payload.data.get('client_id')}."
-        )
-    else:
-        logging.warning(f"Received unhandled Connexify event type: {payload.event}")
-    return {"status": "ok", "event_received": payload.event}
+
+
+async def metrics_handler():
+    """Prometheus scrape endpoint for upstream, event handler and cache metrics."""
+    return Response(render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
 
 
 api = FastAPI()
@@ -42,4 +63,10 @@ api.add_api_route(
     endpoint=connexify_webhook_handler,
     methods=["POST"],
     name="connexify_webhook",
-)
\ No newline at end of file
+)
+api.add_api_route(
+    "/metrics",
+    endpoint=metrics_handler,
+    methods=["GET"],
+    name="metrics",
+)
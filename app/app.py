@@ -1,10 +1,12 @@
 import reflex as rx
+from contextlib import asynccontextmanager
 from app.state import AppState
 from app.pages.dashboard import dashboard
 from app.pages.copilot import copilot
 from app.pages.onboarding import onboarding
+from app.pages.accounts import accounts
 from app.components.sidebar import main_content
-from app.connexify.state import OnboardingState
+from app.connexify.state import OnboardingState, AccountHealthState
 from app.widgets.state import WidgetState
 
 
@@ -24,7 +26,20 @@ def index() -> rx.Component:
     )
 
 
+def mount_api(backend):
+    """Serve the webhook and metrics API in front of the Reflex backend.
+
+    Imported here so FastAPI and the webhook pipeline only load when the
+    backend is actually served, not when the app is compiled or exported.
+    """
+    from app.api import api
+
+    api.mount("", backend)
+    return api
+
+
 app = rx.App(
+    api_transformer=mount_api,
     theme=rx.theme(appearance="light"),
     head_components=[
         rx.el.link(rel="preconnect", href="https://fonts.googleapis.com"),
@@ -35,7 +50,37 @@ app = rx.App(
         ),
     ],
 )
+
+
+@asynccontextmanager
+async def integrations_lifespan():
+    from app.backend_client import backend_client
+    from app.connexify.client import connexify_client
+    from app.connexify.webhook_queue import webhook_queue
+    from app.mcp_server.pool import mcp_pool
+    from app.mcp_server.replica import metrics_replica
+    from app.mistral_gateway import mistral_gateway
+
+    await backend_client.start()
+    await connexify_client.start()
+    await webhook_queue.start()
+    await metrics_replica.start()
+    yield
+    await metrics_replica.close()
+    await webhook_queue.close()
+    await backend_client.close()
+    await connexify_client.close()
+    await mcp_pool.close()
+    await mistral_gateway.close()
+
+
+app.register_lifespan_task(integrations_lifespan)
 app.add_page(index, route="/")
-app.add_page(dashboard, route="/dashboard", on_load=WidgetState.load_available_widgets)
+app.add_page(
+    dashboard,
+    route="/dashboard",
+    on_load=[WidgetState.load_available_widgets, WidgetState.load_widget_data],
+)
 app.add_page(copilot, route="/copilot")
-app.add_page(onboarding, route="/onboarding", on_load=OnboardingState.load_clients)
\ No newline at end of file
+app.add_page(onboarding, route="/onboarding", on_load=OnboardingState.load_clients)
+app.add_page(accounts, route="/accounts", on_load=AccountHealthState.load_accounts)
\ No newline at end of file
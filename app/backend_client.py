@@ -0,0 +1,73 @@
+import httpx
+from app.resilience import ResilientTransport
+from app.config import (
+    API_BACKEND_URL,
+    API_BACKEND_MAX_CONNECTIONS,
+    API_BACKEND_MAX_KEEPALIVE,
+    API_BACKEND_KEEPALIVE_EXPIRY,
+    API_BACKEND_HTTP2,
+)
+
+
+class BackendClient:
+    """Application-wide pooled HTTP client for the api-backend service.
+
+    One `httpx.AsyncClient` is shared by every state event so dashboard loads
+    and copilot fallbacks reuse kept-alive connections instead of paying a new
+    TCP/TLS handshake each time. Calls go through the "backend" circuit
+    breaker and honour the current request deadline. Started and closed with
+    the app lifespan.
+    """
+
+    def __init__(
+        self,
+        base_url: str = API_BACKEND_URL,
+        max_connections: int = API_BACKEND_MAX_CONNECTIONS,
+        max_keepalive_connections: int = API_BACKEND_MAX_KEEPALIVE,
+        keepalive_expiry: float = API_BACKEND_KEEPALIVE_EXPIRY,
+        http2: bool = API_BACKEND_HTTP2,
+        timeout: float = 30,
+    ):
+        self.base_url = base_url
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self.timeout = timeout
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                transport=ResilientTransport(
+                    "backend", limits=self.limits, http2=self.http2
+                ),
+            )
+        return self._client
+
+    async def start(self):
+        """Create the connection pool ahead of the first request."""
+        self.client
+
+    async def get(self, path: str, **kwargs) -> httpx.Response:
+        return await self.client.get(path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> httpx.Response:
+        return await self.client.post(path, **kwargs)
+
+    def stream(self, method: str, path: str, **kwargs):
+        """Send a request whose body is read incrementally inside `async with`."""
+        return self.client.stream(method, path, **kwargs)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+backend_client = BackendClient()
@@ -35,6 +35,7 @@ def sidebar() -> rx.Component:
             nav_item("Dashboard", "/dashboard", "layout-dashboard"),
             nav_item("AI Copilot", "/copilot", "bot-message-square"),
             nav_item("Client Onboarding", "/onboarding", "users"),
+            nav_item("Account Health", "/accounts", "activity"),
             class_name="flex-1 overflow-auto py-4 px-4 flex flex-col gap-1",
         ),
         class_name="h-screen w-64 border-r bg-gray-50 flex flex-col fixed",
@@ -1,15 +1,116 @@
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
-API_BACKEND_URL = os.getenv("API_BACKEND_URL", "http://localhost:8000")
-TENANT_ID = os.getenv("TENANT_ID", "default-tenant")
-CLIENT_NAME = os.getenv("CLIENT_NAME", "default-client")
-DATE_RANGE_DEFAULT = os.getenv("DATE_RANGE_DEFAULT", "last_30_days")
-MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY")
-LEMONADO_MCP_URL = os.getenv("LEMONADO_MCP_URL", "https://mcp.lemonado.io/mcp")
-LEMONADO_BEARER_TOKEN = os.getenv("LEMONADO_BEARER_TOKEN")
-CONNEXIFY_API_KEY = os.getenv("CONNEXIFY_API_KEY")
-CONNEXIFY_API_URL = os.getenv("CONNEXIFY_API_URL", "https://www.connexify.io")
-CONNEXIFY_WEBHOOK_SECRET = os.getenv("CONNEXIFY_WEBHOOK_SECRET")
-CONNEXIFY_BRAND_NAME = os.getenv("CONNEXIFY_BRAND_NAME", "AskYourAds")
\ No newline at end of file
+from dataclasses import dataclass, fields
+from functools import cache
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Application settings, resolved once from the environment and `.env`.
+
+    Every field can be overridden by an environment variable of the same
+    name. Modules may keep importing them as `from app.config import NAME`.
+    """
+
+    API_BACKEND_URL: str = "http://localhost:8000"
+    TENANT_ID: str = "default-tenant"
+    CLIENT_NAME: str = "default-client"
+    DATE_RANGE_DEFAULT: str = "last_30_days"
+    MISTRAL_API_KEY: str | None = None
+    LEMONADO_MCP_URL: str = "https://mcp.lemonado.io/mcp"
+    LEMONADO_BEARER_TOKEN: str | None = None
+    CONNEXIFY_API_KEY: str | None = None
+    CONNEXIFY_API_URL: str = "https://www.connexify.io"
+    CONNEXIFY_WEBHOOK_SECRET: str | None = None
+    CONNEXIFY_BRAND_NAME: str = "AskYourAds"
+    MCP_MAX_SESSIONS_PER_TENANT: int = 4
+    MCP_SESSION_IDLE_TTL: float = 300.0
+    MCP_CATALOG_TTL: float = 900.0
+    MCP_SQL_CACHE_TTL: float = 300.0
+    MCP_SQL_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    MCP_SQL_CACHE_PATH: str | None = None
+    API_BACKEND_MAX_CONNECTIONS: int = 100
+    API_BACKEND_MAX_KEEPALIVE: int = 20
+    API_BACKEND_KEEPALIVE_EXPIRY: float = 30.0
+    API_BACKEND_HTTP2: bool = False
+    KPI_CACHE_MAX_AGE: float = 300.0
+    KPI_CACHE_MAX_STALE: float = 86400.0
+    CHART_MAX_POINTS: int = 300
+    TOP_CAMPAIGNS_K: int = 10
+    MISTRAL_MODEL: str = "mistral-medium-latest"
+    CHAT_STREAM_FLUSH_INTERVAL: float = 0.05
+    CHAT_STREAM_FLUSH_CHUNKS: int = 16
+    MISTRAL_MAX_CONCURRENCY: int = 8
+    MISTRAL_MAX_CONCURRENCY_PER_TENANT: int = 4
+    MISTRAL_TOKENS_PER_MINUTE: int = 0
+    MISTRAL_TOKENS_PER_MINUTE_PER_TENANT: int = 0
+    MISTRAL_MAX_RETRIES: int = 3
+    MISTRAL_DEADLINE: float = 30.0
+    ANSWER_CACHE_TTL: float = 3600.0
+    ANSWER_CACHE_THRESHOLD: float = 0.85
+    ANSWER_CACHE_MAX_ENTRIES: int = 500
+    PROMPT_TOKEN_BUDGET: int = 3000
+    PROMPT_HISTORY_TURNS: int = 6
+    COPILOT_DEADLINE: float = 60.0
+    COPILOT_MCP_HEDGE_DELAY: float = 2.0
+    COPILOT_MISTRAL_HEDGE_DELAY: float = 4.0
+    COPILOT_MCP_MAX_OBJECTS: int = 5
+    CIRCUIT_FAILURE_RATE: float = 0.5
+    CIRCUIT_MIN_REQUESTS: int = 5
+    CIRCUIT_WINDOW: float = 60.0
+    CIRCUIT_COOLDOWN: float = 30.0
+    EVENT_DEADLINE: float = 30.0
+    RETRY_BUDGET_RATIO: float = 0.2
+    RETRY_BUDGET_MIN_RETRIES: int = 3
+    RETRY_BUDGET_WINDOW: float = 10.0
+    CONNEXIFY_PAGE_SIZE: int = 100
+    CONNEXIFY_PREFETCH_PAGES: int = 3
+    CONNEXIFY_CLIENT_CACHE_TTL: float = 900.0
+    CONNEXIFY_MAX_CONNECTIONS: int = 20
+    CONNEXIFY_ACCOUNT_CONCURRENCY: int = 16
+    CONNEXIFY_ACCOUNT_INDEX_TTL: float = 900.0
+    CONNEXIFY_HTTP2: bool = True
+    CONNEXIFY_KEEPALIVE_EXPIRY: float = 60.0
+    WEBHOOK_QUEUE_PATH: str = "data/webhook_queue.db"
+    WEBHOOK_WORKERS: int = 4
+    WEBHOOK_COALESCE_WINDOW: float = 5.0
+    WEBHOOK_MAX_ATTEMPTS: int = 5
+    WEBHOOK_RETENTION: float = 7 * 24 * 3600.0
+    WEBHOOK_MAX_BODY_BYTES: int = 1024 * 1024
+    MISTRAL_SERVER_URL: str | None = None
+    TRACING_ENABLED: bool = True
+    METRICS_REPLICA_ENABLED: bool = True
+    METRICS_REPLICA_DIR: str = "data/metrics_replica"
+    METRICS_REPLICA_TABLE: str = "metrics"
+    METRICS_REPLICA_SYNC_HOUR: int = 2
+    METRICS_REPLICA_SYNC_DELAY: float = 1800.0
+    METRICS_REPLICA_OVERLAP_DAYS: int = 3
+    METRICS_REPLICA_QUERY_TIMEOUT: float = 2.0
+
+    @classmethod
+    def from_env(cls, environ: dict[str, str] = os.environ) -> "Settings":
+        values: dict[str, object] = {}
+        for field in fields(cls):
+            raw = environ.get(field.name)
+            if raw is None:
+                continue
+            if field.type is bool:
+                values[field.name] = raw.lower() == "true"
+            elif field.type in (int, float):
+                values[field.name] = field.type(raw)
+            else:
+                values[field.name] = raw
+        return cls(**values)
+
+
+@cache
+def get_settings() -> Settings:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return Settings.from_env()
+
+
+def __getattr__(name: str) -> object:
+    if name.startswith("_") or name not in Settings.__dataclass_fields__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(get_settings(), name)
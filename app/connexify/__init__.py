@@ -1,15 +1,18 @@
-from .client import ConnexifyAPIClient
+from .client import ConnexifyAPIClient, connexify_client
 from .schemas import (
     OnboardingLinkRequest,
     OnboardingLinkResponse,
     ConnexifyClient,
     ConnectedAccount,
+    Pagination,
 )
 
 __all__ = [
     "ConnexifyAPIClient",
+    "connexify_client",
     "OnboardingLinkRequest",
     "OnboardingLinkResponse",
     "ConnexifyClient",
     "ConnectedAccount",
+    "Pagination",
 ]
\ No newline at end of file
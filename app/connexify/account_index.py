@@ -0,0 +1,131 @@
+import logging
+import time
+from typing import TypedDict
+from pydantic import ValidationError
+from app.config import CONNEXIFY_ACCOUNT_INDEX_TTL
+from .client import ConnexifyAPIClient
+from .schemas import ConnectedAccount
+
+
+class IndexedAccount(TypedDict):
+    client_id: str
+    account: ConnectedAccount
+
+
+class TenantAccounts:
+    def __init__(self):
+        self.by_client: dict[str, list[ConnectedAccount]] = {}
+        self.by_platform_status: dict[tuple[str, str], dict[str, IndexedAccount]] = {}
+        self.stale: set[str] = set()
+        self.loaded_at: float | None = None
+
+    def set_client_accounts(self, client_id: str, accounts: list[ConnectedAccount]):
+        for account in self.by_client.get(client_id, []):
+            bucket = self.by_platform_status.get((account.platform, account.status))
+            if bucket is not None:
+                bucket.pop(account.id, None)
+                if not bucket:
+                    del self.by_platform_status[(account.platform, account.status)]
+        self.by_client[client_id] = accounts
+        for account in accounts:
+            self.by_platform_status.setdefault((account.platform, account.status), {})[
+                account.id
+            ] = {"client_id": client_id, "account": account}
+        self.stale.discard(client_id)
+
+
+class ConnectedAccountIndex:
+    """Agency-wide index of connected accounts, keyed by platform and status.
+
+    Built with one concurrent bulk fetch across every client, then kept
+    current incrementally: `account.connected` webhooks either upsert the
+    account directly or mark just that client stale, and the next `refresh()`
+    refetches only stale or new clients until the whole index is older than
+    `ttl`.
+    """
+
+    def __init__(self, ttl: float = CONNEXIFY_ACCOUNT_INDEX_TTL):
+        self.ttl = ttl
+        self._tenants: dict[str, TenantAccounts] = {}
+
+    def _tenant(self, tenant_id: str) -> TenantAccounts:
+        tenant = self._tenants.get(tenant_id)
+        if tenant is None:
+            tenant = self._tenants[tenant_id] = TenantAccounts()
+        return tenant
+
+    async def refresh(
+        self, tenant_id: str, api_client: ConnexifyAPIClient, client_ids: list[str]
+    ):
+        """Bring the index up to date for `client_ids`, fetching as little as possible."""
+        tenant = self._tenant(tenant_id)
+        expired = tenant.loaded_at is None or time.monotonic() - tenant.loaded_at >= self.ttl
+        to_fetch = [
+            client_id
+            for client_id in client_ids
+            if expired or client_id in tenant.stale or client_id not in tenant.by_client
+        ]
+        for client_id in set(tenant.by_client) - set(client_ids):
+            tenant.set_client_accounts(client_id, [])
+            del tenant.by_client[client_id]
+        if not to_fetch:
+            return
+        started = time.monotonic()
+        accounts = await api_client.get_connected_accounts_bulk(to_fetch)
+        for client_id, client_accounts in accounts.items():
+            tenant.set_client_accounts(client_id, client_accounts)
+        if expired:
+            # Clients that failed stay out of `by_client` and are retried next time.
+            tenant.loaded_at = time.monotonic()
+        logging.info(
+            f"Refreshed connected accounts for {len(accounts)}/{len(to_fetch)} "
+            f"clients of tenant {tenant_id} in {time.monotonic() - started:.2f}s."
+        )
+
+    def accounts(
+        self, tenant_id: str, platform: str | None = None, status: str | None = None
+    ) -> list[IndexedAccount]:
+        """Accounts matching `platform` and `status` (None matches any)."""
+        return [
+            entry
+            for (entry_platform, entry_status), bucket in self._tenant(
+                tenant_id
+            ).by_platform_status.items()
+            if (platform is None or entry_platform == platform)
+            and (status is None or entry_status == status)
+            for entry in bucket.values()
+        ]
+
+    def counts(self, tenant_id: str) -> dict[tuple[str, str], int]:
+        """Number of accounts per (platform, status)."""
+        return {
+            key: len(bucket)
+            for key, bucket in self._tenant(tenant_id).by_platform_status.items()
+        }
+
+    def apply_webhook(self, tenant_id: str, event: str, data: dict):
+        """Update the index from a Connexify webhook event."""
+        if event != "account.connected":
+            return
+        client_id = data.get("client_id")
+        if not client_id:
+            return
+        tenant = self._tenant(tenant_id)
+        if client_id not in tenant.by_client:
+            return
+        try:
+            account = ConnectedAccount(**data["account"])
+        except (KeyError, TypeError, ValidationError):
+            tenant.stale.add(client_id)
+            return
+        accounts = [a for a in tenant.by_client.get(client_id, []) if a.id != account.id]
+        tenant.set_client_accounts(client_id, accounts + [account])
+
+    def invalidate(self, tenant_id: str | None = None):
+        if tenant_id is None:
+            self._tenants.clear()
+            return
+        self._tenants.pop(tenant_id, None)
+
+
+connected_accounts = ConnectedAccountIndex()
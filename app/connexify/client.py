@@ -1,28 +1,88 @@
+import asyncio
 import httpx
 import logging
-from app.config import CONNEXIFY_API_URL, CONNEXIFY_BRAND_NAME
+from collections import deque
+from typing import AsyncIterator
+from app.config import (
+    CONNEXIFY_API_KEY,
+    CONNEXIFY_API_URL,
+    CONNEXIFY_BRAND_NAME,
+    CONNEXIFY_PAGE_SIZE,
+    CONNEXIFY_PREFETCH_PAGES,
+    CONNEXIFY_MAX_CONNECTIONS,
+    CONNEXIFY_ACCOUNT_CONCURRENCY,
+    CONNEXIFY_HTTP2,
+    CONNEXIFY_KEEPALIVE_EXPIRY,
+)
+from app.metrics import get_upstream_metrics
+from app.resilience import ResilientTransport
 from .schemas import (
     OnboardingLinkRequest,
     OnboardingLinkResponse,
     ConnexifyClient,
     ConnectedAccount,
+    Pagination,
 )
 
 
 class ConnexifyAPIClient:
-    def __init__(self, api_key: str, timeout: int = 30):
-        if not api_key:
-            raise ValueError("Connexify API key is required.")
+    """Connexify API client with a lazily created, pooled HTTP connection.
+
+    The application shares one instance (`connexify_client`), started and
+    closed with the app lifespan, so onboarding events reuse warm
+    connections. HTTP/2 is negotiated when the server supports it.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = CONNEXIFY_API_KEY,
+        timeout: int = 30,
+        http2: bool = CONNEXIFY_HTTP2,
+        max_connections: int = CONNEXIFY_MAX_CONNECTIONS,
+        keepalive_expiry: float = CONNEXIFY_KEEPALIVE_EXPIRY,
+    ):
+        self.api_key = api_key
         self.base_url = CONNEXIFY_API_URL
         self.brand_name = CONNEXIFY_BRAND_NAME
-        self.client = httpx.AsyncClient(
-            base_url=self.base_url,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            timeout=timeout,
+        self.timeout = timeout
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
         )
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def is_configured(self) -> bool:
+        return bool(self.api_key)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            if not self.api_key:
+                raise ValueError("Connexify API key is required.")
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+                timeout=self.timeout,
+                transport=ResilientTransport(
+                    "connexify", limits=self.limits, http2=self.http2
+                ),
+            )
+        return self._client
+
+    async def start(self):
+        """Create the connection pool ahead of the first request, if configured."""
+        if self.is_configured:
+            self.client
+
+    def stats(self) -> dict[str, object]:
+        """Request count, latency histogram and status codes for Connexify calls."""
+        return get_upstream_metrics("connexify").snapshot()
 
     async def create_onboarding_link(
         self, request: OnboardingLinkRequest
@@ -35,16 +95,79 @@ class ConnexifyAPIClient:
             logging.exception(f"HTTP error creating onboarding link: {e}")
             raise
 
-    async def list_clients(self) -> list[ConnexifyClient]:
+    async def list_clients_page(
+        self, page: int = 1, per_page: int = CONNEXIFY_PAGE_SIZE
+    ) -> tuple[list[ConnexifyClient], Pagination | None]:
         try:
-            response = await self.client.get("/api/data/clients")
+            response = await self.client.get(
+                "/api/data/clients", params={"page": page, "per_page": per_page}
+            )
             response.raise_for_status()
             response_data = response.json()
-            return [ConnexifyClient(**c) for c in response_data.get("data", [])]
+            pagination = response_data.get("pagination")
+            return (
+                [ConnexifyClient(**c) for c in response_data.get("data", [])],
+                Pagination(**pagination) if pagination else None,
+            )
         except httpx.HTTPStatusError as e:
             logging.exception(f"HTTP error listing clients: {e}")
             raise
 
+    async def iter_clients(
+        self,
+        per_page: int = CONNEXIFY_PAGE_SIZE,
+        prefetch: int = CONNEXIFY_PREFETCH_PAGES,
+    ) -> AsyncIterator[ConnexifyClient]:
+        """Yield every client across all pages, in order.
+
+        When the first page reports the page count, up to `prefetch` of the
+        following pages are fetched concurrently while earlier ones are
+        consumed. Otherwise pages are walked one by one while `has_more` (or,
+        without it, a full page) says there is more. A response without a
+        `pagination` block is treated as the complete list.
+        """
+        clients, pagination = await self.list_clients_page(1, per_page)
+        for client in clients:
+            yield client
+        total_pages = None
+        if pagination is not None:
+            total_pages = pagination.total_pages
+            if total_pages is None and pagination.total is not None:
+                total_pages = -(-pagination.total // (pagination.per_page or per_page))
+        if total_pages is None:
+            page = 1
+            while pagination is not None and (
+                len(clients) >= per_page
+                if pagination.has_more is None
+                else pagination.has_more
+            ):
+                page += 1
+                clients, pagination = await self.list_clients_page(page, per_page)
+                for client in clients:
+                    yield client
+            return
+        pending: deque[asyncio.Task] = deque()
+        next_page = 2
+        try:
+            while next_page <= total_pages or pending:
+                while next_page <= total_pages and len(pending) < max(prefetch, 1):
+                    pending.append(
+                        asyncio.create_task(self.list_clients_page(next_page, per_page))
+                    )
+                    next_page += 1
+                clients, _ = await pending.popleft()
+                for client in clients:
+                    yield client
+        finally:
+            # Stopped early or a page failed: reap the prefetches so their
+            # errors are not reported as never retrieved.
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def list_clients(self) -> list[ConnexifyClient]:
+        return [client async for client in self.iter_clients()]
+
     async def get_connected_accounts(self, client_id: str) -> list[ConnectedAccount]:
         try:
             response = await self.client.get(f"/api/data/clients/{client_id}/accounts")
@@ -54,5 +177,38 @@ class ConnexifyAPIClient:
             logging.exception(f"HTTP error getting connected accounts: {e}")
             raise
 
+    async def get_connected_accounts_bulk(
+        self, client_ids: list[str], concurrency: int = CONNEXIFY_ACCOUNT_CONCURRENCY
+    ) -> dict[str, list[ConnectedAccount]]:
+        """Fetch connected accounts for many clients concurrently.
+
+        At most `concurrency` requests are in flight at once, on top of the
+        client's connection limit. Clients whose lookup failed are logged and
+        left out of the result.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(client_id: str) -> list[ConnectedAccount]:
+            async with semaphore:
+                return await self.get_connected_accounts(client_id)
+
+        results = await asyncio.gather(
+            *(fetch(client_id) for client_id in client_ids), return_exceptions=True
+        )
+        accounts: dict[str, list[ConnectedAccount]] = {}
+        for client_id, result in zip(client_ids, results):
+            if isinstance(result, BaseException):
+                logging.warning(
+                    f"Failed to get connected accounts for client {client_id}: {result}"
+                )
+                continue
+            accounts[client_id] = result
+        return accounts
+
     async def close(self):
-        await self.client.aclose()
\ No newline at end of file
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+connexify_client = ConnexifyAPIClient()
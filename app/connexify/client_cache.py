@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+from typing import Literal
+from app.config import CONNEXIFY_CLIENT_CACHE_TTL
+from .client import ConnexifyAPIClient
+from .schemas import ConnexifyClient
+
+StatusFilter = Literal["all", "pending", "completed", "expired"]
+
+
+class ConnexifyClientCache:
+    """Per-tenant local copy of the Connexify client list.
+
+    The full list is streamed from the paginated API at most once per `ttl`
+    (concurrent loads share one fetch) and kept current between loads by
+    webhook events. The onboarding page queries it for one filtered page at
+    a time instead of holding every client in Reflex state.
+    """
+
+    def __init__(self, ttl: float = CONNEXIFY_CLIENT_CACHE_TTL):
+        self.ttl = ttl
+        self._clients: dict[str, dict[str, ConnexifyClient]] = {}
+        self._loaded_at: dict[str, float] = {}
+        self._inflight: dict[str, asyncio.Task] = {}
+        # Webhook upserts and invalidations seen while a fetch is in flight;
+        # the pages it already read may predate them.
+        self._upserted_during_fetch: dict[str, dict[str, ConnexifyClient]] = {}
+        self._invalidated_during_fetch: set[str] = set()
+
+    def is_fresh(self, tenant_id: str) -> bool:
+        loaded_at = self._loaded_at.get(tenant_id)
+        return loaded_at is not None and time.monotonic() - loaded_at < self.ttl
+
+    async def load(self, tenant_id: str, api_client: ConnexifyAPIClient):
+        """Make sure the tenant's client list is cached and not older than `ttl`."""
+        if self.is_fresh(tenant_id):
+            return
+        task = self._inflight.get(tenant_id)
+        if task is None:
+            task = asyncio.create_task(self._fetch(tenant_id, api_client))
+            self._inflight[tenant_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(tenant_id, None))
+        await asyncio.shield(task)
+
+    async def _fetch(self, tenant_id: str, api_client: ConnexifyAPIClient):
+        started = time.monotonic()
+        self._upserted_during_fetch[tenant_id] = {}
+        self._invalidated_during_fetch.discard(tenant_id)
+        try:
+            clients = {client.id: client async for client in api_client.iter_clients()}
+            clients.update(self._upserted_during_fetch[tenant_id])
+        finally:
+            del self._upserted_during_fetch[tenant_id]
+        self._clients[tenant_id] = clients
+        if tenant_id in self._invalidated_during_fetch:
+            self._invalidated_during_fetch.discard(tenant_id)
+        else:
+            self._loaded_at[tenant_id] = time.monotonic()
+        logging.info(
+            f"Loaded {len(clients)} Connexify clients for tenant {tenant_id} "
+            f"in {time.monotonic() - started:.2f}s."
+        )
+
+    def get(self, tenant_id: str, client_id: str) -> ConnexifyClient | None:
+        return self._clients.get(tenant_id, {}).get(client_id)
+
+    def client_ids(self, tenant_id: str) -> list[str]:
+        return list(self._clients.get(tenant_id, {}))
+
+    def query(
+        self,
+        tenant_id: str,
+        search: str = "",
+        status: StatusFilter = "all",
+        offset: int = 0,
+        limit: int = 20,
+    ) -> tuple[list[ConnexifyClient], int]:
+        """Return one page of matching clients and the total number of matches."""
+        needle = search.strip().casefold()
+        matches = [
+            client
+            for client in self._clients.get(tenant_id, {}).values()
+            if (status == "all" or client.onboarding_status == status)
+            and (not needle or needle in client.name.casefold() or needle == client.id)
+        ]
+        return matches[offset : offset + limit], len(matches)
+
+    def upsert(self, tenant_id: str, client: ConnexifyClient):
+        upserted = self._upserted_during_fetch.get(tenant_id)
+        if upserted is not None:
+            upserted[client.id] = client
+        clients = self._clients.get(tenant_id)
+        if clients is not None:
+            clients[client.id] = client
+
+    def apply_webhook(self, tenant_id: str, event: str, data: dict):
+        """Update the cached list from a Connexify webhook event."""
+        if event != "onboarding.completed":
+            return
+        clients = self._clients.get(tenant_id)
+        client_id = data.get("client_id")
+        if not client_id or (clients is None and tenant_id not in self._upserted_during_fetch):
+            return
+        known = (clients or {}).get(client_id)
+        name = data.get("client_name") or (known.name if known else None)
+        if name is None:
+            # A client we have never seen and cannot describe; refetch next time.
+            self.invalidate(tenant_id)
+            return
+        self.upsert(
+            tenant_id,
+            ConnexifyClient(id=client_id, name=name, onboarding_status="completed"),
+        )
+
+    def invalidate(self, tenant_id: str | None = None):
+        """Force the next `load()` to refetch, for one tenant or for all tenants."""
+        if tenant_id is None:
+            self._loaded_at.clear()
+            self._invalidated_during_fetch.update(self._upserted_during_fetch)
+            return
+        self._loaded_at.pop(tenant_id, None)
+        if tenant_id in self._upserted_during_fetch:
+            self._invalidated_during_fetch.add(tenant_id)
+
+
+connexify_clients = ConnexifyClientCache()
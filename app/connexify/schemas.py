@@ -13,6 +13,14 @@ class OnboardingLinkResponse(BaseModel):
     expires_at: str
 
 
+class Pagination(BaseModel):
+    page: int = 1
+    per_page: int | None = None
+    total: int | None = None
+    total_pages: int | None = None
+    has_more: bool | None = None
+
+
 class ConnexifyClient(BaseModel):
     id: str
     name: str
@@ -1,7 +1,15 @@
 import reflex as rx
 import logging
+from typing import TypedDict
 from .schemas import ConnexifyClient, OnboardingLinkRequest
-from app.config import CONNEXIFY_API_KEY
+from app.config import EVENT_DEADLINE, TENANT_ID
+from app.metrics import instrument, record_error
+from app.resilience import deadline
+from .account_index import connected_accounts
+from .client import ConnexifyAPIClient, connexify_client
+from .client_cache import connexify_clients
+
+MAX_ACCOUNT_ROWS = 200
 
 
 class OnboardingState(rx.State):
@@ -9,17 +17,65 @@ class OnboardingState(rx.State):
     onboarding_link: str = ""
     is_loading: bool = False
     error: str = ""
+    search: str = ""
+    status_filter: str = "all"
+    page: int = 1
+    page_size: int = 20
+    total_clients: int = 0
+
+    @rx.var
+    def page_count(self) -> int:
+        return max(1, -(-self.total_clients // self.page_size))
+
+    def _show_page(self):
+        """Fill `clients` with the current page of the cached, filtered list."""
+        clients, total = connexify_clients.query(
+            TENANT_ID,
+            search=self.search,
+            status=self.status_filter,
+            offset=(self.page - 1) * self.page_size,
+            limit=self.page_size,
+        )
+        self.total_clients = total
+        if clients or self.page == 1:
+            self.clients = clients
+            return
+        self.page = self.page_count
+        self._show_page()
+
+    @rx.event
+    def set_search(self, value: str):
+        self.search = value
+        self.page = 1
+        self._show_page()
+
+    @rx.event
+    def set_status_filter(self, value: str):
+        self.status_filter = value
+        self.page = 1
+        self._show_page()
 
-    async def _get_client(self):
-        from .client import ConnexifyAPIClient
+    @rx.event
+    def next_page(self):
+        if self.page < self.page_count:
+            self.page += 1
+            self._show_page()
 
-        if not CONNEXIFY_API_KEY:
+    @rx.event
+    def previous_page(self):
+        if self.page > 1:
+            self.page -= 1
+            self._show_page()
+
+    async def _get_client(self) -> ConnexifyAPIClient | None:
+        if not connexify_client.is_configured:
             async with self:
                 self.error = "Connexify API key is not configured."
             return None
-        return ConnexifyAPIClient(api_key=CONNEXIFY_API_KEY)
+        return connexify_client
 
     @rx.event(background=True)
+    @instrument("load_clients")
     async def load_clients(self):
         async with self:
             self.is_loading = True
@@ -27,12 +83,13 @@ class OnboardingState(rx.State):
         try:
             client = await self._get_client()
             if client:
-                clients_data = await client.list_clients()
+                with deadline(EVENT_DEADLINE):
+                    await connexify_clients.load(TENANT_ID, client)
                 async with self:
-                    self.clients = clients_data
-                await client.close()
+                    self._show_page()
         except Exception as e:
             logging.exception("Error loading clients")
+            record_error(e)
             async with self:
                 self.error = f"Failed to load clients: {e}"
         finally:
@@ -52,14 +109,99 @@ class OnboardingState(rx.State):
                     client_name=form_data["client_name"],
                     client_email=form_data["client_email"],
                 )
-                response = await client.create_onboarding_link(request)
+                with deadline(EVENT_DEADLINE):
+                    response = await client.create_onboarding_link(request)
+                connexify_clients.invalidate(TENANT_ID)
                 async with self:
                     self.onboarding_link = response.onboarding_url
-                await client.close()
         except Exception as e:
             logging.exception("Error creating onboarding link")
             async with self:
                 self.error = f"Failed to create link: {e}"
         finally:
             async with self:
-                self.is_loading = False
\ No newline at end of file
+                self.is_loading = False
+
+
+class AccountStatusRow(TypedDict):
+    platform: str
+    active: int
+    disconnected: int
+    error: int
+
+
+class AccountRow(TypedDict):
+    client_name: str
+    platform: str
+    display_name: str
+    status: str
+
+
+class AccountHealthState(rx.State):
+    status_rows: list[AccountStatusRow] = []
+    accounts: list[AccountRow] = []
+    account_status: str = "error"
+    total_accounts: int = 0
+    is_loading: bool = False
+    error: str = ""
+
+    def _show_accounts(self):
+        counts = connected_accounts.counts(TENANT_ID)
+        platforms = sorted({platform for platform, _ in counts})
+        self.status_rows = [
+            {
+                "platform": platform.replace("_", " ").title(),
+                "active": counts.get((platform, "active"), 0),
+                "disconnected": counts.get((platform, "disconnected"), 0),
+                "error": counts.get((platform, "error"), 0),
+            }
+            for platform in platforms
+        ]
+        entries = connected_accounts.accounts(TENANT_ID, status=self.account_status)
+        self.total_accounts = len(entries)
+        rows: list[AccountRow] = []
+        for entry in entries[:MAX_ACCOUNT_ROWS]:
+            client = connexify_clients.get(TENANT_ID, entry["client_id"])
+            account = entry["account"]
+            rows.append(
+                {
+                    "client_name": client.name if client else entry["client_id"],
+                    "platform": account.platform.replace("_", " ").title(),
+                    "display_name": account.display_name,
+                    "status": account.status,
+                }
+            )
+        self.accounts = rows
+
+    @rx.event
+    def set_account_status(self, value: str):
+        self.account_status = value
+        self._show_accounts()
+
+    @rx.event(background=True)
+    async def load_accounts(self):
+        async with self:
+            self.is_loading = True
+            self.error = ""
+        if not connexify_client.is_configured:
+            async with self:
+                self.error = "Connexify API key is not configured."
+                self.is_loading = False
+            return
+        try:
+            with deadline(EVENT_DEADLINE):
+                await connexify_clients.load(TENANT_ID, connexify_client)
+                await connected_accounts.refresh(
+                    TENANT_ID,
+                    connexify_client,
+                    connexify_clients.client_ids(TENANT_ID),
+                )
+            async with self:
+                self._show_accounts()
+        except Exception as e:
+            logging.exception("Error loading connected accounts")
+            async with self:
+                self.error = f"Failed to load connected accounts: {e}"
+        finally:
+            async with self:
+                self.is_loading = False
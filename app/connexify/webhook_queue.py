@@ -0,0 +1,245 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import TypedDict
+from app.config import (
+    TENANT_ID,
+    WEBHOOK_QUEUE_PATH,
+    WEBHOOK_WORKERS,
+    WEBHOOK_COALESCE_WINDOW,
+    WEBHOOK_MAX_ATTEMPTS,
+    WEBHOOK_RETENTION,
+)
+from app.mcp_server.catalog import mcp_catalog
+from app.mcp_server.query_cache import mcp_sql_cache
+from .account_index import connected_accounts
+from .client_cache import connexify_clients
+
+
+class QueuedEvent(TypedDict):
+    id: str
+    event: str
+    data: dict
+    attempts: int
+
+
+def process_event(event: str, data: dict) -> str | None:
+    """Apply one webhook event to the local caches.
+
+    Returns the client id whose data should be re-synced, if any.
+    """
+    client_id = data.get("client_id")
+    connexify_clients.apply_webhook(TENANT_ID, event, data)
+    connected_accounts.apply_webhook(TENANT_ID, event, data)
+    if event == "account.connected":
+        logging.info(f"Account connected for client: {client_id}.")
+        return client_id
+    if event == "onboarding.completed":
+        logging.info(f"Onboarding completed for client: {client_id}.")
+    else:
+        logging.warning(f"Received unhandled Connexify event type: {event}")
+    return None
+
+
+async def sync_client(client_id: str):
+    logging.info(f"Syncing data for client {client_id}.")
+    mcp_catalog.invalidate(TENANT_ID)
+    await mcp_sql_cache.invalidate(TENANT_ID)
+
+
+class WebhookQueue:
+    """Durable SQLite-backed queue between the webhook endpoint and its workers.
+
+    The endpoint only inserts the event (ignoring ids it has already seen)
+    and returns; a pool of worker tasks claims events in arrival order and
+    applies them, retrying failures with backoff. Syncs triggered by
+    `account.connected` are coalesced per client over `coalesce_window`
+    seconds, so a burst of connections during onboarding causes one sync per
+    client. A pending sync is itself a row in the queue (event "sync", due
+    when the window closes), so it survives a restart.
+    """
+
+    def __init__(
+        self,
+        path: str = WEBHOOK_QUEUE_PATH,
+        workers: int = WEBHOOK_WORKERS,
+        coalesce_window: float = WEBHOOK_COALESCE_WINDOW,
+        max_attempts: int = WEBHOOK_MAX_ATTEMPTS,
+        retention: float = WEBHOOK_RETENTION,
+    ):
+        self.path = path
+        self.workers = workers
+        self.coalesce_window = coalesce_window
+        self.max_attempts = max_attempts
+        self.retention = retention
+        self.duplicates = 0
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        self._wakeup: asyncio.Event | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    def _get_db(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS webhook_events ("
+                "id TEXT PRIMARY KEY, event TEXT NOT NULL, payload TEXT NOT NULL, "
+                "status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0, "
+                "received_at REAL NOT NULL, available_at REAL NOT NULL, last_error TEXT)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS webhook_events_pending "
+                "ON webhook_events (status, available_at)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _insert(self, event_id: str, event: str, payload: str) -> bool:
+        now = time.time()
+        with self._db_lock:
+            db = self._get_db()
+            cursor = db.execute(
+                "INSERT OR IGNORE INTO webhook_events "
+                "(id, event, payload, received_at, available_at) VALUES (?, ?, ?, ?, ?)",
+                (event_id, event, payload, now, now),
+            )
+            db.commit()
+            return cursor.rowcount == 1
+
+    def _claim(self) -> QueuedEvent | None:
+        with self._db_lock:
+            db = self._get_db()
+            row = db.execute(
+                "UPDATE webhook_events SET status = 'processing', attempts = attempts + 1 "
+                "WHERE id = (SELECT id FROM webhook_events WHERE status = 'pending' "
+                "AND available_at <= ? ORDER BY received_at LIMIT 1) "
+                "RETURNING id, event, payload, attempts",
+                (time.time(),),
+            ).fetchone()
+            db.commit()
+        if row is None:
+            return None
+        return {"id": row[0], "event": row[1], "data": json.loads(row[2]), "attempts": row[3]}
+
+    def _finish(self, event_id: str, error: str | None = None, retry_at: float | None = None):
+        if error is None:
+            status = "done"
+        elif retry_at is None:
+            status = "failed"
+        else:
+            status = "pending"
+        with self._db_lock:
+            db = self._get_db()
+            db.execute(
+                "UPDATE webhook_events SET status = ?, last_error = ?, "
+                "available_at = COALESCE(?, available_at) "
+                "WHERE id = ? AND status = 'processing'",
+                (status, error, retry_at, event_id),
+            )
+            db.commit()
+
+    def _recover(self):
+        """Requeue events left mid-processing by a crash and prune old ones."""
+        with self._db_lock:
+            db = self._get_db()
+            db.execute(
+                "UPDATE webhook_events SET status = 'pending' WHERE status = 'processing'"
+            )
+            db.execute(
+                "DELETE FROM webhook_events WHERE status IN ('done', 'failed') "
+                "AND received_at < ?",
+                (time.time() - self.retention,),
+            )
+            db.commit()
+
+    def depth(self) -> int:
+        with self._db_lock:
+            return self._get_db().execute(
+                "SELECT COUNT(*) FROM webhook_events WHERE status IN ('pending', 'processing')"
+            ).fetchone()[0]
+
+    async def enqueue(self, event_id: str, event: str, data: dict) -> bool:
+        """Persist an event. Returns False if this event id was already received."""
+        inserted = await asyncio.to_thread(self._insert, event_id, event, json.dumps(data))
+        if not inserted:
+            self.duplicates += 1
+            logging.info(f"Ignoring redelivered Connexify webhook {event_id}.")
+        elif self._wakeup is not None:
+            self._wakeup.set()
+        return inserted
+
+    def _schedule_sync(self, client_id: str):
+        """Queue a sync for `client_id` unless one is already waiting.
+
+        A sync that is running when another is requested is re-armed, so
+        the connection that arrived during it is not missed.
+        """
+        now = time.time()
+        with self._db_lock:
+            db = self._get_db()
+            db.execute(
+                "INSERT INTO webhook_events "
+                "(id, event, payload, received_at, available_at) VALUES (?, 'sync', ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET status = 'pending', attempts = 0, "
+                "last_error = NULL, received_at = excluded.received_at, "
+                "available_at = excluded.available_at WHERE status != 'pending'",
+                (
+                    f"sync:{client_id}",
+                    json.dumps({"client_id": client_id}),
+                    now,
+                    now + self.coalesce_window,
+                ),
+            )
+            db.commit()
+
+    async def _worker(self):
+        while True:
+            self._wakeup.clear()
+            item = await asyncio.to_thread(self._claim)
+            if item is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                if item["event"] == "sync":
+                    await sync_client(item["data"]["client_id"])
+                else:
+                    client_id = process_event(item["event"], item["data"])
+                    if client_id:
+                        await asyncio.to_thread(self._schedule_sync, client_id)
+                await asyncio.to_thread(self._finish, item["id"])
+            except Exception as e:
+                logging.exception(f"Failed to process Connexify webhook {item['id']}.")
+                retry_at = None
+                if item["attempts"] < self.max_attempts:
+                    retry_at = time.time() + min(60.0, 2.0 ** item["attempts"])
+                await asyncio.to_thread(self._finish, item["id"], str(e), retry_at)
+
+    async def start(self):
+        if self._tasks:
+            return
+        await asyncio.to_thread(self._recover)
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+webhook_queue = WebhookQueue()
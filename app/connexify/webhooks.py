@@ -1,20 +1,53 @@
 import hashlib
 import hmac
+import json
 import logging
 from fastapi import Request, HTTPException, Header
-from app.config import CONNEXIFY_WEBHOOK_SECRET
+from app.config import CONNEXIFY_WEBHOOK_SECRET, WEBHOOK_MAX_BODY_BYTES
 
+try:
+    import orjson
 
-async def verify_signature(request: Request, x_connexify_signature: str = Header(...)):
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+
+async def verify_signature(
+    request: Request, x_connexify_signature: str = Header(...)
+) -> dict:
+    """Read the webhook body once, verify its HMAC-SHA256 signature and decode it.
+
+    The HMAC is updated chunk by chunk while the body streams in, bodies over
+    WEBHOOK_MAX_BODY_BYTES are rejected with 413 before being buffered, and
+    the verified bytes are decoded once (with orjson when it is installed).
+    """
     if not CONNEXIFY_WEBHOOK_SECRET:
         logging.error(
             "CONNEXIFY_WEBHOOK_SECRET is not set. Cannot verify webhook signature."
         )
         raise HTTPException(status_code=500, detail="Webhook secret not configured.")
-    body = await request.body()
-    expected_signature = hmac.new(
-        CONNEXIFY_WEBHOOK_SECRET.encode(), body, hashlib.sha256
-    ).hexdigest()
-    if not hmac.compare_digest(expected_signature, x_connexify_signature):
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and (
+        int(content_length) > WEBHOOK_MAX_BODY_BYTES
+    ):
+        raise HTTPException(status_code=413, detail="Webhook body too large.")
+    mac = hmac.new(CONNEXIFY_WEBHOOK_SECRET.encode(), digestmod=hashlib.sha256)
+    chunks: list[bytes] = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > WEBHOOK_MAX_BODY_BYTES:
+            raise HTTPException(status_code=413, detail="Webhook body too large.")
+        mac.update(chunk)
+        chunks.append(chunk)
+    if not hmac.compare_digest(mac.hexdigest(), x_connexify_signature):
         logging.warning("Invalid webhook signature received.")
-        raise HTTPException(status_code=403, detail="Invalid signature.")
\ No newline at end of file
+        raise HTTPException(status_code=403, detail="Invalid signature.")
+    try:
+        data = _loads(b"".join(chunks))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body.")
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail="Webhook body must be a JSON object.")
+    return data
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Awaitable, Callable, NotRequired, TypedDict
+from app.config import COPILOT_DEADLINE
+from app.resilience import deadline as request_deadline, get_breaker, remaining
+
+
+class CopilotProvider(TypedDict):
+    name: str
+    call: Callable[[], Awaitable[object]]
+    hedge_delay: float
+    deadline: NotRequired[float]
+
+
+class CopilotUnavailableError(Exception):
+    pass
+
+
+async def open_stream(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Wait for the first chunk of `chunks`, then return an iterator over all of them.
+
+    Lets a streaming provider count as having answered at its first token.
+    """
+    try:
+        first = await anext(chunks)
+    except StopAsyncIteration:
+        raise ValueError("Stream ended without any content.")
+    except BaseException:
+        await chunks.aclose()
+        raise
+
+    async def replay() -> AsyncIterator[str]:
+        yield first
+        async for chunk in chunks:
+            yield chunk
+
+    return replay()
+
+
+def _close_result(task: asyncio.Task):
+    """Close a losing provider's answer if it is a stream."""
+    if task.cancelled() or task.exception() is not None:
+        return
+    aclose = getattr(task.result(), "aclose", None)
+    if aclose is not None:
+        asyncio.ensure_future(aclose())
+
+
+async def route(
+    providers: list[CopilotProvider], deadline: float | None = None
+) -> tuple[str, object]:
+    """Race copilot providers in preference order and return the first answer.
+
+    The first provider starts immediately. The next one starts alongside it
+    once its `hedge_delay` passes without an answer, or as soon as it fails.
+    The first success wins; the others are cancelled and any answer they
+    already produced is closed. Providers whose circuit breaker is open are
+    skipped.
+
+    `deadline` (by default COPILOT_DEADLINE) is the SLO for the whole
+    question: every provider is cut off that many seconds after the question,
+    however late it started, so hedging never adds to it. A provider's own
+    `deadline`, counted from when it starts, can only cut it off sooner. The
+    cutoff is also shortened by the current request deadline, and runs inside
+    that provider's calls as their request deadline. Provider breakers are
+    kept apart from the per-upstream ones in the HTTP transports.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    cutoff = started + remaining(COPILOT_DEADLINE if deadline is None else deadline)
+    queue = list(providers)
+    # Task -> (provider name, start time, cutoff)
+    running: dict[asyncio.Task, tuple[str, float, float]] = {}
+    next_hedge_at: float | None = None
+
+    def start_next() -> float | None:
+        while queue:
+            provider = queue.pop(0)
+            if not get_breaker(f"copilot.{provider['name']}").allow():
+                logging.info(f"Copilot provider {provider['name']} skipped: circuit open.")
+                continue
+            now = loop.time()
+            own_deadline = provider.get("deadline")
+            task_cutoff = cutoff
+            if own_deadline is not None:
+                task_cutoff = min(cutoff, now + own_deadline)
+            if task_cutoff <= now:
+                continue
+            with request_deadline(task_cutoff - now):
+                task = asyncio.create_task(provider["call"]())
+            running[task] = (provider["name"], now, task_cutoff)
+            return now + provider["hedge_delay"]
+        return None
+
+    def stop(task: asyncio.Task, timed_out: bool):
+        name, task_started, _ = running.pop(task)
+        task.cancel()
+        # A task that finished before the cancel landed still has an answer.
+        task.add_done_callback(_close_result)
+        if timed_out:
+            get_breaker(f"copilot.{name}").record_failure()
+        else:
+            get_breaker(f"copilot.{name}").release_probe()
+        logging.info(
+            f"Copilot provider {name} {'timed out' if timed_out else 'cancelled'} "
+            f"after {loop.time() - task_started:.2f}s."
+        )
+
+    try:
+        next_hedge_at = start_next()
+        while running:
+            now = loop.time()
+            for task in [task for task, entry in running.items() if entry[2] <= now]:
+                stop(task, timed_out=True)
+            if queue and (
+                not running or (next_hedge_at is not None and now >= next_hedge_at)
+            ):
+                next_hedge_at = start_next()
+            if not running:
+                break
+            wait_until = min(entry[2] for entry in running.values())
+            if queue and next_hedge_at is not None:
+                wait_until = min(wait_until, next_hedge_at)
+            done, _ = await asyncio.wait(
+                running, timeout=max(wait_until - now, 0), return_when=asyncio.FIRST_COMPLETED
+            )
+            winner: tuple[str, object] | None = None
+            # Providers start in preference order, so ties go to the earlier one.
+            for task in sorted(done, key=lambda task: running[task][1]):
+                name, task_started, _ = running.pop(task)
+                elapsed = loop.time() - task_started
+                error = task.exception()
+                if error is not None:
+                    get_breaker(f"copilot.{name}").record_failure()
+                    logging.warning(f"Copilot provider {name} failed after {elapsed:.2f}s: {error}")
+                    continue
+                get_breaker(f"copilot.{name}").record_success()
+                if winner is not None:
+                    # Finished in the same wakeup as the winner; its answer
+                    # may hold an open stream.
+                    _close_result(task)
+                    logging.info(f"Copilot provider {name} also answered in {elapsed:.2f}s.")
+                    continue
+                logging.info(
+                    f"Copilot provider {name} answered in {elapsed:.2f}s "
+                    f"({loop.time() - started:.2f}s after the question)."
+                )
+                winner = name, task.result()
+            if winner is not None:
+                return winner
+        raise CopilotUnavailableError("No copilot provider answered in time.")
+    finally:
+        for task in list(running):
+            stop(task, timed_out=False)
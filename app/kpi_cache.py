@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import time
+from typing import TypedDict
+from app.config import KPI_CACHE_MAX_AGE, KPI_CACHE_MAX_STALE
+from app.backend_client import backend_client
+from app.metrics import register_cache
+
+SummaryKey = tuple[str, str, str]
+
+
+class SummaryEntry(TypedDict):
+    rows: list[dict]
+    fetched_at: float
+    etag: str | None
+    last_modified: str | None
+
+
+class KPISummaryCache:
+    """Stale-while-revalidate cache for `/metrics/summary`.
+
+    Entries younger than `max_age` are served as-is. Older entries are
+    served immediately while a single background request revalidates them,
+    using ETag/Last-Modified so an unchanged summary costs a 304. Entries
+    older than `max_stale` are refetched before returning. Concurrent loads
+    for the same key always share one backend request.
+    """
+
+    def __init__(
+        self, max_age: float = KPI_CACHE_MAX_AGE, max_stale: float = KPI_CACHE_MAX_STALE
+    ):
+        self.max_age = max_age
+        self.max_stale = max_stale
+        self._entries: dict[SummaryKey, SummaryEntry] = {}
+        self._inflight: dict[SummaryKey, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, tenant_id: str, client_name: str, date_range: str) -> list[dict]:
+        key = (tenant_id, client_name, date_range)
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry["fetched_at"]
+            if age < self.max_age:
+                self.hits += 1
+                return entry["rows"]
+            if age < self.max_stale:
+                self.hits += 1
+                self._refresh(key)
+                return entry["rows"]
+        self.misses += 1
+        return await asyncio.shield(self._refresh(key))
+
+    def _refresh(self, key: SummaryKey) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            task.add_done_callback(self._log_refresh_error)
+        return task
+
+    def _log_refresh_error(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logging.warning(f"KPI summary refresh failed: {task.exception()}")
+
+    async def _fetch(self, key: SummaryKey) -> list[dict]:
+        tenant_id, client_name, date_range = key
+        params = {
+            "tenant_id": tenant_id,
+            "client_name": client_name,
+            "date_range": date_range,
+        }
+        headers = {}
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        response = await backend_client.get(
+            "/metrics/summary", params=params, headers=headers
+        )
+        if response.status_code == 304 and entry is not None:
+            entry["fetched_at"] = time.monotonic()
+            return entry["rows"]
+        response.raise_for_status()
+        rows = response.json()
+        self._entries[key] = {
+            "rows": rows,
+            "fetched_at": time.monotonic(),
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+        }
+        return rows
+
+    def invalidate(self):
+        self._entries.clear()
+
+
+kpi_cache = KPISummaryCache()
+register_cache("kpi_summary", kpi_cache)
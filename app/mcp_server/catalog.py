@@ -0,0 +1,115 @@
+import json
+import logging
+import time
+from app.config import MCP_CATALOG_TTL
+from app.metrics import register_cache
+from .client import tool_result
+from .pool import MCPSessionPool, mcp_pool
+from .schemas import ToolCallRequest
+
+
+class MCPCatalogCache:
+    """Per-tenant TTL cache for the Lemonado tool and object catalogue.
+
+    Covers `tools/list`, `list_objects` and `get_object_details`, which only
+    change when a client connects or disconnects an account. Call
+    `invalidate()` from the webhook handler when that happens.
+    """
+
+    def __init__(self, pool: MCPSessionPool = mcp_pool, ttl: float = MCP_CATALOG_TTL):
+        self.pool = pool
+        self.ttl = ttl
+        self._entries: dict[tuple[str, str, str], tuple[float, object]] = {}
+        self._generations: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key: tuple[str, str, str]) -> tuple[bool, object]:
+        entry = self._entries.get(key)
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            self.hits += 1
+            return True, entry[1]
+        self.misses += 1
+        return False, None
+
+    def _remember(self, key: tuple[str, str, str], generation: int, result: object):
+        is_error = isinstance(result, dict) and result.get("isError")
+        if not is_error and self._generations[key[0]] == generation:
+            self._entries[key] = (time.monotonic(), result)
+
+    async def _get(
+        self, tenant_id: str, method: str, arguments: dict[str, object]
+    ) -> object:
+        key = (tenant_id, method, json.dumps(arguments, sort_keys=True))
+        found, result = self._lookup(key)
+        if found:
+            return result
+        generation = self._generations.setdefault(tenant_id, 0)
+        async with self.pool.session(tenant_id) as client:
+            if method == "tools/list":
+                result = await client.list_tools()
+            else:
+                result = await client.call_tool(tool_name=method, arguments=arguments)
+        self._remember(key, generation, result)
+        return result
+
+    async def _get_many(
+        self, tenant_id: str, method: str, arguments: list[dict[str, object]]
+    ) -> list[object]:
+        """`_get` for several argument sets; the misses share one batch."""
+        keys = [
+            (tenant_id, method, json.dumps(args, sort_keys=True)) for args in arguments
+        ]
+        results = [self._lookup(key) for key in keys]
+        missing = [i for i, (found, _) in enumerate(results) if not found]
+        if not missing:
+            return [result for _, result in results]
+        generation = self._generations.setdefault(tenant_id, 0)
+        async with self.pool.session(tenant_id) as client:
+            responses = await client.call_tools(
+                [
+                    ToolCallRequest(tool_name=method, arguments=arguments[i])
+                    for i in missing
+                ]
+            )
+        for i, response in zip(missing, responses):
+            result = tool_result(response)
+            self._remember(keys[i], generation, result)
+            results[i] = (True, result)
+        return [result for _, result in results]
+
+    async def list_tools(self, tenant_id: str) -> object:
+        return await self._get(tenant_id, "tools/list", {})
+
+    async def list_objects(self, tenant_id: str) -> object:
+        return await self._get(tenant_id, "list_objects", {})
+
+    async def get_object_details(
+        self, tenant_id: str, arguments: dict[str, object]
+    ) -> object:
+        return await self._get(tenant_id, "get_object_details", arguments)
+
+    async def get_object_details_many(
+        self, tenant_id: str, arguments: list[dict[str, object]]
+    ) -> list[object]:
+        return await self._get_many(tenant_id, "get_object_details", arguments)
+
+    def invalidate(self, tenant_id: str | None = None):
+        """Drop cached catalogue entries for one tenant, or for all tenants."""
+        if tenant_id is None:
+            self._entries.clear()
+            self._generations = {
+                tenant: generation + 1
+                for tenant, generation in self._generations.items()
+            }
+            logging.info("Invalidated MCP catalogue cache for all tenants.")
+            return
+        self._entries = {
+            key: entry for key, entry in self._entries.items() if key[0] != tenant_id
+        }
+        self._generations[tenant_id] = self._generations.get(tenant_id, 0) + 1
+        logging.info(f"Invalidated MCP catalogue cache for tenant {tenant_id}.")
+
+
+mcp_catalog = MCPCatalogCache()
+register_cache("mcp_catalog", mcp_catalog)
@@ -1,22 +1,46 @@
+import asyncio
 import httpx
+import itertools
 import logging
 import json
-from typing import Any
+import time
+from contextlib import aclosing
+from typing import Any, AsyncIterator
 from app.config import LEMONADO_MCP_URL
+from app.resilience import ResilientTransport
 from .auth import get_auth_headers
-from .schemas import MCPTool, MCPResource
+from .schemas import MCPTool, MCPResource, ToolCallRequest, ToolCallResponse
+from .sse import aiter_sse_events
+
+
+def tool_result(response: ToolCallResponse) -> object:
+    """The `tools/call` result for `response`, with transport errors in MCP shape."""
+    if response.result is None and response.is_error:
+        text = response.error_message or "MCP call failed."
+        return {"content": [{"type": "text", "text": text}], "isError": True}
+    return response.result
+
+
+class BatchUnsupportedError(Exception):
+    """The server does not accept JSON-RPC batch arrays."""
 
 
 class LemonadoMCPClient:
-    def __init__(self, timeout: int = 30):
+    def __init__(self, timeout: int = 30, client: httpx.AsyncClient | None = None):
         self.base_url = LEMONADO_MCP_URL
-        self.client = httpx.AsyncClient(timeout=timeout, http2=True)
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(
+            timeout=timeout, transport=ResilientTransport("mcp", http2=True)
+        )
         self.session_id: str | None = None
-        self.request_id_counter = 0
+        self.supports_batch: bool | None = None
+        self.last_used = time.monotonic()
+        self._request_ids = itertools.count(1)
+        self._init_lock = asyncio.Lock()
 
     async def _get_next_request_id(self) -> int:
-        self.request_id_counter += 1
-        return self.request_id_counter
+        # Ids are never reset, so responses on a shared session can't collide.
+        return next(self._request_ids)
 
     def _parse_sse_response(
         self, text: str
@@ -35,8 +59,13 @@ class LemonadoMCPClient:
         """Initialize the MCP session and check if it's successful."""
         if self.session_id:
             return True
+        async with self._init_lock:
+            if self.session_id:
+                return True
+            return await self._initialize()
+
+    async def _initialize(self) -> bool:
         try:
-            self.request_id_counter = 0
             payload = {
                 "jsonrpc": "2.0",
                 "id": await self._get_next_request_id(),
@@ -61,30 +90,72 @@ class LemonadoMCPClient:
             self.session_id = None
             return False
 
-    async def _make_jsonrpc_request(
-        self, method: str, params: dict
-    ) -> dict[str, object] | list[dict[str, object]]:
-        """Helper to make a JSON-RPC request after session is initialized."""
+    async def _ensure_session(self):
         if not self.session_id:
             await self.health_check()
         if not self.session_id:
             raise ConnectionError("Failed to establish MCP session.")
-        headers = get_auth_headers()
-        headers["mcp-session-id"] = self.session_id
+
+    async def _stream_messages(
+        self, payload: dict[str, object] | list[dict[str, object]]
+    ) -> AsyncIterator[dict[str, object] | list[dict[str, object]]]:
+        """POST a JSON-RPC payload and yield response messages as they arrive.
+
+        Re-initializes once if the server reports the session as expired.
+        """
+        await self._ensure_session()
+        for attempt in range(2):
+            headers = get_auth_headers()
+            headers["mcp-session-id"] = self.session_id
+            async with self.client.stream(
+                "POST", self.base_url, json=payload, headers=headers
+            ) as response:
+                if response.status_code != 404 or attempt:
+                    response.raise_for_status()
+                    self.last_used = time.monotonic()
+                    content_type = response.headers.get("content-type", "")
+                    if content_type.startswith("application/json"):
+                        yield json.loads(await response.aread())
+                        return
+                    async for event in aiter_sse_events(response.aiter_lines()):
+                        if event["event"] != "message":
+                            continue
+                        try:
+                            yield json.loads(event["data"])
+                        except json.JSONDecodeError as e:
+                            logging.exception(f"Failed to parse SSE JSON: {e}")
+                            raise ValueError(
+                                f"Invalid JSON in SSE response: {event['data']}"
+                            )
+                    return
+            if self.session_id == headers["mcp-session-id"]:
+                logging.info(f"MCP session {self.session_id} expired, re-initializing.")
+                self.session_id = None
+            if not await self.health_check():
+                raise ConnectionError("Failed to re-establish MCP session.")
+            for item in payload if isinstance(payload, list) else [payload]:
+                item["id"] = await self._get_next_request_id()
+
+    async def _make_jsonrpc_request(
+        self, method: str, params: dict
+    ) -> dict[str, object] | list[dict[str, object]]:
+        """Helper to make a JSON-RPC request after session is initialized."""
         payload = {
             "jsonrpc": "2.0",
             "id": await self._get_next_request_id(),
             "method": method,
             "params": params,
         }
-        response = await self.client.post(self.base_url, json=payload, headers=headers)
-        response.raise_for_status()
-        data = self._parse_sse_response(response.text)
-        if isinstance(data, dict) and "error" in data:
-            raise ConnectionAbortedError(f"MCP Error: {data['error']}")
-        if isinstance(data, dict):
-            return data.get("result", {})
-        return data
+        async with aclosing(self._stream_messages(payload)) as messages:
+            async for data in messages:
+                if isinstance(data, dict) and data.get("id") != payload["id"]:
+                    continue
+                if isinstance(data, dict) and "error" in data:
+                    raise ConnectionAbortedError(f"MCP Error: {data['error']}")
+                if isinstance(data, dict):
+                    return data.get("result", {})
+                return data
+        raise ValueError("No JSON-RPC response found in MCP stream.")
 
     async def list_resources(self) -> list[MCPResource]:
         """Fetch the list of available resources from the Lemonado MCP."""
@@ -93,11 +164,128 @@ class LemonadoMCPClient:
         )
         return []
 
+    async def list_tools(self) -> list[dict[str, object]]:
+        """Fetch the list of available tools from the Lemonado MCP."""
+        result = await self._make_jsonrpc_request(method="tools/list", params={})
+        if isinstance(result, dict):
+            return result.get("tools", [])
+        return result
+
     async def call_tool(self, tool_name: str, arguments: dict[str, object]) -> object:
         """Invoke a specific tool on the Lemonado MCP."""
         params = {"name": tool_name, "arguments": arguments}
         return await self._make_jsonrpc_request(method="tools/call", params=params)
 
+    async def call_tools(
+        self, requests: list[ToolCallRequest], batch: bool = True
+    ) -> list[ToolCallResponse]:
+        """Invoke several tools at once and return responses in request order.
+
+        Sends a single JSON-RPC batch when the server accepts batches, and
+        otherwise fans the calls out concurrently over the shared HTTP/2
+        connection. Batching is turned off for the session only when the
+        server rejects it (JSON-RPC -32600 or HTTP 400); other batch failures
+        are raised. Per-call failures are reported on the response instead of
+        raising.
+        """
+        if not requests:
+            return []
+        await self._ensure_session()
+        if batch and len(requests) > 1 and self.supports_batch is not False:
+            try:
+                return await self._call_tools_batch(requests)
+            except BatchUnsupportedError as e:
+                logging.info(f"MCP server rejected JSON-RPC batch, fanning out: {e}")
+                self.supports_batch = False
+        return await asyncio.gather(*(self._call_tool_safe(req) for req in requests))
+
+    async def _call_tools_batch(
+        self, requests: list[ToolCallRequest]
+    ) -> list[ToolCallResponse]:
+        payloads = [
+            {
+                "jsonrpc": "2.0",
+                "id": await self._get_next_request_id(),
+                "method": "tools/call",
+                "params": {"name": req.tool_name, "arguments": req.arguments},
+            }
+            for req in requests
+        ]
+        messages_by_id: dict[object, dict[str, object]] = {}
+        try:
+            async with aclosing(self._stream_messages(payloads)) as messages:
+                async for data in messages:
+                    for message in data if isinstance(data, list) else [data]:
+                        if message.get("id") is None and "error" in message:
+                            error = message["error"]
+                            if isinstance(error, dict) and error.get("code") == -32600:
+                                raise BatchUnsupportedError(f"MCP batch error: {error}")
+                            raise ValueError(f"MCP batch error: {error}")
+                        messages_by_id[message.get("id")] = message
+        except httpx.HTTPStatusError as e:
+            # Only a 400 on the array body means batches are unsupported; 5xx
+            # and timeouts say nothing about it and are raised as-is.
+            if e.response.status_code == 400:
+                raise BatchUnsupportedError(str(e)) from e
+            raise
+        self.supports_batch = True
+        responses = []
+        for payload in payloads:
+            message = messages_by_id.get(payload["id"])
+            if message is None:
+                responses.append(
+                    ToolCallResponse(
+                        result=None,
+                        is_error=True,
+                        error_message="No response received for batched call.",
+                    )
+                )
+            elif "error" in message:
+                responses.append(
+                    ToolCallResponse(
+                        result=None,
+                        is_error=True,
+                        error_message=f"MCP Error: {message['error']}",
+                    )
+                )
+            else:
+                responses.append(self._to_tool_response(message.get("result", {})))
+        return responses
+
+    async def _call_tool_safe(self, request: ToolCallRequest) -> ToolCallResponse:
+        """`call_tool`, returning MCP, HTTP and parse failures as error responses."""
+        try:
+            result = await self.call_tool(request.tool_name, request.arguments)
+        except (httpx.HTTPError, ConnectionError, ValueError) as e:
+            return ToolCallResponse(result=None, is_error=True, error_message=str(e))
+        return self._to_tool_response(result)
+
+    def _to_tool_response(self, result: object) -> ToolCallResponse:
+        is_error = isinstance(result, dict) and bool(result.get("isError"))
+        return ToolCallResponse(result=result, is_error=is_error)
+
+    async def call_tool_stream(
+        self, tool_name: str, arguments: dict[str, object]
+    ) -> AsyncIterator[dict[str, object]]:
+        """Invoke a tool and yield every JSON-RPC message as it arrives.
+
+        Progress notifications are yielded before the final result message,
+        so large results can be consumed without buffering the whole body.
+        """
+        payload = {
+            "jsonrpc": "2.0",
+            "id": await self._get_next_request_id(),
+            "method": "tools/call",
+            "params": {"name": tool_name, "arguments": arguments},
+        }
+        async with aclosing(self._stream_messages(payload)) as messages:
+            async for message in messages:
+                if isinstance(message, dict) and "error" in message:
+                    raise ConnectionAbortedError(f"MCP Error: {message['error']}")
+                yield message
+
     async def close(self):
-        """Close the underlying HTTP client session."""
-        await self.client.aclose()
\ No newline at end of file
+        """Close the underlying HTTP client session, unless it is shared."""
+        self.session_id = None
+        if self._owns_client:
+            await self.client.aclose()
\ No newline at end of file
@@ -0,0 +1,202 @@
+import json
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Protocol
+from app.config import COPILOT_MCP_MAX_OBJECTS, DATE_RANGE_DEFAULT
+from .catalog import MCPCatalogCache, mcp_catalog
+from .replica import metrics_replica
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_LAST_DAYS_RE = re.compile(r"(?:last|past)[ _](\d+)[ _]days?")
+_MAX_DETAIL_CHARS = 1500
+_MAX_RESULT_ROWS = 20
+DATE_COLUMNS = ("date", "day", "date_start", "report_date")
+GROUP_COLUMNS = ("platform", "channel", "source")
+METRIC_COLUMNS = (
+    "spend",
+    "cost",
+    "impressions",
+    "clicks",
+    "conversions",
+    "revenue",
+    "conversion_value",
+)
+
+
+class SQLExecutor(Protocol):
+    async def execute_sql_many(self, tenant_id: str, queries: list[str]) -> list[object]:
+        ...
+
+
+def tool_text(result: object) -> str:
+    """Concatenated text content of an MCP tool result."""
+    if isinstance(result, dict) and isinstance(result.get("content"), list):
+        return "\n".join(
+            part.get("text", "") for part in result["content"] if isinstance(part, dict)
+        )
+    return "" if result is None else str(result)
+
+
+def object_names(result: object) -> list[str]:
+    """Object names from a `list_objects` result, when its text is JSON."""
+    try:
+        parsed = json.loads(tool_text(result))
+    except ValueError:
+        return []
+    if isinstance(parsed, dict):
+        parsed = parsed.get("objects", [])
+    names = []
+    for item in parsed if isinstance(parsed, list) else []:
+        if isinstance(item, dict):
+            item = item.get("name") or item.get("object_name")
+        if isinstance(item, str):
+            names.append(item)
+    return names
+
+
+def object_columns(result: object) -> list[str]:
+    """Column names from a `get_object_details` result, when its text is JSON."""
+    try:
+        parsed = json.loads(tool_text(result))
+    except ValueError:
+        return []
+    if isinstance(parsed, dict):
+        parsed = parsed.get("columns") or parsed.get("fields") or []
+    columns = []
+    for item in parsed if isinstance(parsed, list) else []:
+        if isinstance(item, dict):
+            item = item.get("name") or item.get("column_name")
+        if isinstance(item, str):
+            columns.append(item)
+    return columns
+
+
+def date_window(question: str, today: date) -> tuple[date, date]:
+    """The inclusive date range a question asks about, or DATE_RANGE_DEFAULT.
+
+    Ranges of whole days end yesterday: data is ingested daily, so today is
+    never complete.
+    """
+    text = question.lower()
+    if "yesterday" in text:
+        return today - timedelta(days=1), today - timedelta(days=1)
+    if "today" in text:
+        return today, today
+    if "this month" in text:
+        return today.replace(day=1), today
+    match = _LAST_DAYS_RE.search(text)
+    if match:
+        days = int(match.group(1))
+    elif "week" in text:
+        days = 7
+    elif "month" in text:
+        days = 30
+    else:
+        match = _LAST_DAYS_RE.search(DATE_RANGE_DEFAULT)
+        days = int(match.group(1)) if match else 30
+    yesterday = today - timedelta(days=1)
+    return yesterday - timedelta(days=max(days, 1) - 1), yesterday
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def metrics_query(name: str, columns: list[str], start: date, end: date) -> str | None:
+    """Metric totals for one object over [start, end], if it has the columns for it.
+
+    Grouped by platform (or channel) when the object has one.
+    """
+    by_lower = {column.lower(): column for column in columns}
+    date_column = next((by_lower[c] for c in DATE_COLUMNS if c in by_lower), None)
+    metrics = [by_lower[c] for c in METRIC_COLUMNS if c in by_lower]
+    if date_column is None or not metrics:
+        return None
+    group = next((by_lower[c] for c in GROUP_COLUMNS if c in by_lower), None)
+    select = [_quote(group)] if group else []
+    select += [f"SUM({_quote(metric)}) AS {_quote(metric)}" for metric in metrics]
+    query = (
+        f"SELECT {', '.join(select)} FROM {_quote(name)} "
+        f"WHERE {_quote(date_column)} >= '{start.isoformat()}' "
+        f"AND {_quote(date_column)} <= '{end.isoformat()}'"
+    )
+    if group:
+        query += f" GROUP BY {_quote(group)} ORDER BY {_quote(group)}"
+    return query
+
+
+def format_rows(result: object) -> str:
+    """A short text rendering of an `execute_sql` result."""
+    text = tool_text(result)
+    try:
+        rows = json.loads(text)
+    except ValueError:
+        rows = None
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        return text[:_MAX_DETAIL_CHARS]
+    if not rows:
+        return "No rows."
+    lines = [
+        ", ".join(
+            f"{key}: {value:,.2f}" if isinstance(value, float) else f"{key}: {value}"
+            for key, value in row.items()
+        )
+        for row in rows[:_MAX_RESULT_ROWS]
+    ]
+    if len(rows) > _MAX_RESULT_ROWS:
+        lines.append(f"… {len(rows) - _MAX_RESULT_ROWS} more rows")
+    return "\n".join(f"- {line}" for line in lines)
+
+
+def relevant_objects(names: list[str], question: str, limit: int) -> list[str]:
+    """Objects whose name shares a word with `question`, or the first `limit`."""
+    words = set(_WORD_RE.findall(question.lower()))
+    matching = [name for name in names if words & set(_WORD_RE.findall(name.lower()))]
+    return (matching or names)[:limit]
+
+
+async def answer_question(
+    tenant_id: str,
+    question: str,
+    catalog: MCPCatalogCache = mcp_catalog,
+    sql: SQLExecutor = metrics_replica,
+    max_objects: int = COPILOT_MCP_MAX_OBJECTS,
+    today: date | None = None,
+) -> str:
+    """Answer a copilot question from the tenant's Lemonado data.
+
+    One call lists the objects; the details of those relevant to the
+    question are then fetched in a single batch, and metric totals for the
+    asked-about dates are queried from every object that has a date and
+    metric columns. Those queries are answered by the local metrics replica
+    when it provably holds the data, and otherwise go to Lemonado through the
+    SQL result cache, again as one batch. The catalogue is read through its
+    cache too.
+    """
+    objects = await catalog.list_objects(tenant_id)
+    names = object_names(objects)
+    if not names:
+        return f"MCP tool 'list_objects' executed. Result: {tool_text(objects)}"
+    wanted = relevant_objects(names, question, max_objects)
+    details = await catalog.get_object_details_many(
+        tenant_id, [{"object_name": name} for name in wanted]
+    )
+    start, end = date_window(question, today or datetime.now(timezone.utc).date())
+    queries = {
+        name: query
+        for name, result in zip(wanted, details)
+        if (query := metrics_query(name, object_columns(result), start, end))
+    }
+    sections = [f"Lemonado data sources: {', '.join(names)}."]
+    if queries:
+        results = await sql.execute_sql_many(tenant_id, list(queries.values()))
+        period = f"{start.isoformat()} to {end.isoformat()}"
+        for name, result in zip(queries, results):
+            sections.append(f"{name}, {period}:\n{format_rows(result)}")
+        return "\n\n".join(sections)
+    for name, result in zip(wanted, details):
+        text = tool_text(result)
+        if len(text) > _MAX_DETAIL_CHARS:
+            text = text[:_MAX_DETAIL_CHARS] + "…"
+        sections.append(f"{name}:\n{text}")
+    return "\n\n".join(sections)
@@ -0,0 +1,92 @@
+import asyncio
+import httpx
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from app.config import MCP_MAX_SESSIONS_PER_TENANT, MCP_SESSION_IDLE_TTL
+from app.resilience import ResilientTransport
+from .client import LemonadoMCPClient
+
+
+class MCPSessionPool:
+    """Process-wide pool of initialized Lemonado MCP sessions, keyed by tenant.
+
+    All sessions share one HTTP/2 client, so connections stay warm between
+    copilot questions and an idle `mcp-session-id` is reused instead of
+    running the `initialize` handshake again.
+    """
+
+    def __init__(
+        self,
+        max_sessions_per_tenant: int = MCP_MAX_SESSIONS_PER_TENANT,
+        idle_ttl: float = MCP_SESSION_IDLE_TTL,
+        timeout: int = 30,
+    ):
+        self.max_sessions_per_tenant = max_sessions_per_tenant
+        self.idle_ttl = idle_ttl
+        self.timeout = timeout
+        self._http: httpx.AsyncClient | None = None
+        self._idle: dict[str, list[LemonadoMCPClient]] = {}
+        self._limits: dict[str, asyncio.Semaphore] = {}
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                timeout=self.timeout,
+                transport=ResilientTransport(
+                    "mcp",
+                    http2=True,
+                    limits=httpx.Limits(keepalive_expiry=self.idle_ttl),
+                ),
+            )
+        return self._http
+
+    def _checkout(self, tenant_id: str) -> LemonadoMCPClient:
+        idle = self._idle.setdefault(tenant_id, [])
+        now = time.monotonic()
+        while idle:
+            session = idle.pop()
+            if session.session_id and now - session.last_used < self.idle_ttl:
+                return session
+            logging.info(f"Dropping idle MCP session {session.session_id}.")
+        return LemonadoMCPClient(timeout=self.timeout, client=self._get_http_client())
+
+    def _checkin(self, tenant_id: str, session: LemonadoMCPClient):
+        if not session.session_id:
+            return
+        session.last_used = time.monotonic()
+        self._idle.setdefault(tenant_id, []).append(session)
+
+    @asynccontextmanager
+    async def session(self, tenant_id: str) -> AsyncIterator[LemonadoMCPClient]:
+        """Borrow an MCP session for `tenant_id`.
+
+        Waits when the tenant already has `max_sessions_per_tenant` sessions in
+        use. A session that raised is discarded so the next borrower
+        re-initializes.
+        """
+        limit = self._limits.get(tenant_id)
+        if limit is None:
+            limit = self._limits[tenant_id] = asyncio.Semaphore(
+                self.max_sessions_per_tenant
+            )
+        async with limit:
+            session = self._checkout(tenant_id)
+            try:
+                yield session
+            except BaseException:
+                session.session_id = None
+                raise
+            finally:
+                self._checkin(tenant_id, session)
+
+    async def close(self):
+        """Drop all idle sessions and close the shared HTTP client."""
+        self._idle.clear()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+
+mcp_pool = MCPSessionPool()
@@ -0,0 +1,288 @@
+import asyncio
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from app.config import MCP_SQL_CACHE_MAX_BYTES, MCP_SQL_CACHE_PATH, MCP_SQL_CACHE_TTL
+from app.metrics import register_cache
+from .client import tool_result
+from .pool import MCPSessionPool, mcp_pool
+from .schemas import ToolCallRequest
+
+_LITERAL_RE = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """Fold whitespace and case outside quoted literals and identifiers."""
+    parts = _LITERAL_RE.split(sql)
+    for i in range(0, len(parts), 2):
+        parts[i] = _WHITESPACE_RE.sub(" ", parts[i]).lower()
+    return "".join(parts).strip().rstrip(";").rstrip()
+
+
+class SQLResultCache:
+    """LRU + TTL cache for `execute_sql` results, keyed by tenant and SQL.
+
+    Entries are evicted least-recently-used first once the serialized size
+    of the cache exceeds `max_bytes`. Concurrent identical queries share a
+    single in-flight MCP call. When `disk_path` is set, results are also
+    written to a SQLite file so hits survive restarts.
+
+    `invalidate` bumps the tenant's generation, so a fetch that started
+    before it never writes its (now stale) result back, and disk rows stored
+    before it are ignored even if the disk delete has not run yet.
+    """
+
+    def __init__(
+        self,
+        pool: MCPSessionPool = mcp_pool,
+        ttl: float = MCP_SQL_CACHE_TTL,
+        max_bytes: int = MCP_SQL_CACHE_MAX_BYTES,
+        disk_path: str | None = MCP_SQL_CACHE_PATH,
+    ):
+        self.pool = pool
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.disk_path = disk_path
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, int, object]] = OrderedDict()
+        self._bytes = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._disk: sqlite3.Connection | None = None
+        self._disk_lock = threading.Lock()
+        self._generations: dict[str, int] = {}
+        self._invalidated_at: dict[str | None, float] = {}
+
+    def _key(self, tenant_id: str, sql: str) -> str:
+        return f"{tenant_id}\x1f{normalize_sql(sql)}"
+
+    def _get_disk(self) -> sqlite3.Connection | None:
+        if not self.disk_path:
+            return None
+        if self._disk is None:
+            self._disk = sqlite3.connect(self.disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS sql_results "
+                "(key TEXT PRIMARY KEY, stored_at REAL NOT NULL, payload TEXT NOT NULL)"
+            )
+            self._disk.execute(
+                "DELETE FROM sql_results WHERE stored_at < ?", (time.time() - self.ttl,)
+            )
+            self._disk.commit()
+        return self._disk
+
+    def _disk_read(self, keys: list[str]) -> list[tuple[float, str] | None]:
+        with self._disk_lock:
+            disk = self._get_disk()
+            if disk is None:
+                return [None] * len(keys)
+            return [
+                disk.execute(
+                    "SELECT stored_at, payload FROM sql_results WHERE key = ?", (key,)
+                ).fetchone()
+                for key in keys
+            ]
+
+    def _disk_write(self, key: str, stored_at: float, payload: str):
+        with self._disk_lock:
+            disk = self._get_disk()
+            if disk is None:
+                return
+            disk.execute(
+                "INSERT OR REPLACE INTO sql_results (key, stored_at, payload) "
+                "VALUES (?, ?, ?)",
+                (key, stored_at, payload),
+            )
+            disk.commit()
+
+    def _disk_delete(self, tenant_id: str | None):
+        with self._disk_lock:
+            disk = self._get_disk()
+            if disk is None:
+                return
+            if tenant_id is None:
+                disk.execute("DELETE FROM sql_results")
+            else:
+                prefix = f"{tenant_id}\x1f"
+                disk.execute(
+                    "DELETE FROM sql_results WHERE substr(key, 1, ?) = ?",
+                    (len(prefix), prefix),
+                )
+            disk.commit()
+
+    def _store(self, key: str, stored_at: float, size: int, result: object):
+        if size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous:
+            self._bytes -= previous[1]
+        self._entries[key] = (stored_at, size, result)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+
+    def _lookup(self, key: str) -> tuple[bool, object]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if time.time() - entry[0] >= self.ttl:
+            self._entries.pop(key)
+            self._bytes -= entry[1]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[2]
+
+    async def _remember(self, tenant_id: str, generation: int, key: str, result: object):
+        if isinstance(result, dict) and result.get("isError"):
+            return
+        if self._generations[tenant_id] != generation:
+            return
+        payload = json.dumps(result)
+        stored_at = time.time()
+        self._store(key, stored_at, len(payload), result)
+        try:
+            await asyncio.to_thread(self._disk_write, key, stored_at, payload)
+        except sqlite3.Error as e:
+            logging.warning(f"Failed to persist SQL result to disk cache: {e}")
+
+    def _from_disk(
+        self, tenant_id: str, key: str, row: tuple[float, str] | None
+    ) -> tuple[bool, object]:
+        invalidated_at = max(
+            self._invalidated_at.get(None, 0.0), self._invalidated_at.get(tenant_id, 0.0)
+        )
+        if row and row[0] > invalidated_at and time.time() - row[0] < self.ttl:
+            result = json.loads(row[1])
+            self._store(key, row[0], len(row[1]), result)
+            return True, result
+        return False, None
+
+    async def _fetch(self, key: str, tenant_id: str, arguments: dict[str, object]):
+        generation = self._generations.setdefault(tenant_id, 0)
+        [row] = await asyncio.to_thread(self._disk_read, [key])
+        found, result = self._from_disk(tenant_id, key, row)
+        if found:
+            self.hits += 1
+            return result
+        self.misses += 1
+        async with self.pool.session(tenant_id) as client:
+            result = await client.call_tool(tool_name="execute_sql", arguments=arguments)
+        await self._remember(tenant_id, generation, key, result)
+        return result
+
+    async def _fetch_many(self, tenant_id: str, items: list[tuple[str, str]]) -> list[object]:
+        generation = self._generations.setdefault(tenant_id, 0)
+        rows = await asyncio.to_thread(self._disk_read, [key for key, _ in items])
+        results: list[object] = [None] * len(items)
+        remote = []
+        for i, ((key, _), row) in enumerate(zip(items, rows)):
+            found, results[i] = self._from_disk(tenant_id, key, row)
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+                remote.append(i)
+        if remote:
+            async with self.pool.session(tenant_id) as client:
+                responses = await client.call_tools(
+                    [
+                        ToolCallRequest(
+                            tool_name="execute_sql", arguments={"query": items[i][1]}
+                        )
+                        for i in remote
+                    ]
+                )
+            for i, response in zip(remote, responses):
+                results[i] = tool_result(response)
+                await self._remember(tenant_id, generation, items[i][0], results[i])
+        return results
+
+    async def execute_sql(self, tenant_id: str, query: str) -> object:
+        """Run `execute_sql` through the cache for `tenant_id`."""
+        key = self._key(tenant_id, query)
+        found, result = self._lookup(key)
+        if found:
+            self.hits += 1
+            return result
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, tenant_id, {"query": query}))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.hits += 1
+        return await asyncio.shield(task)
+
+    async def execute_sql_many(self, tenant_id: str, queries: list[str]) -> list[object]:
+        """`execute_sql` for several queries, in order.
+
+        Cached and in-flight queries are shared as usual; the rest go to
+        Lemonado together in one `call_tools` batch.
+        """
+        loop = asyncio.get_running_loop()
+        waits: list[asyncio.Future] = []
+        to_fetch: list[tuple[str, str]] = []
+        fetched: list[asyncio.Future] = []
+        for query in queries:
+            key = self._key(tenant_id, query)
+            found, result = self._lookup(key)
+            if found:
+                self.hits += 1
+                future = loop.create_future()
+                future.set_result(result)
+            elif key in self._inflight:
+                self.hits += 1
+                future = self._inflight[key]
+            else:
+                future = loop.create_future()
+                self._inflight[key] = future
+                future.add_done_callback(lambda _, key=key: self._inflight.pop(key, None))
+                to_fetch.append((key, query))
+                fetched.append(future)
+            waits.append(future)
+        if to_fetch:
+            batch = asyncio.create_task(self._fetch_many(tenant_id, to_fetch))
+            batch.add_done_callback(lambda _: _resolve(batch, fetched))
+        return list(await asyncio.gather(*(asyncio.shield(future) for future in waits)))
+
+    async def invalidate(self, tenant_id: str | None = None):
+        """Drop cached results for one tenant, or for all tenants."""
+        if tenant_id is None:
+            self._entries.clear()
+            self._bytes = 0
+            self._generations = {
+                tenant: generation + 1 for tenant, generation in self._generations.items()
+            }
+        else:
+            prefix = f"{tenant_id}\x1f"
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                self._bytes -= self._entries.pop(key)[1]
+            self._generations[tenant_id] = self._generations.get(tenant_id, 0) + 1
+        self._invalidated_at[tenant_id] = time.time()
+        try:
+            await asyncio.to_thread(self._disk_delete, tenant_id)
+        except sqlite3.Error as e:
+            logging.warning(f"Failed to clear SQL disk cache: {e}")
+
+
+def _resolve(batch: asyncio.Task, futures: list[asyncio.Future]):
+    """Hand each query its result (or the batch's error) from a finished batch."""
+    for i, future in enumerate(futures):
+        if future.done():
+            continue
+        if batch.cancelled():
+            future.cancel()
+        elif batch.exception() is not None:
+            future.set_exception(batch.exception())
+        else:
+            future.set_result(batch.result()[i])
+
+
+mcp_sql_cache = SQLResultCache()
+register_cache("mcp_sql", mcp_sql_cache)
@@ -0,0 +1,387 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from app.backend_client import backend_client
+from app.config import (
+    CLIENT_NAME,
+    DATE_RANGE_DEFAULT,
+    LEMONADO_BEARER_TOKEN,
+    METRICS_REPLICA_DIR,
+    METRICS_REPLICA_ENABLED,
+    METRICS_REPLICA_OVERLAP_DAYS,
+    METRICS_REPLICA_QUERY_TIMEOUT,
+    METRICS_REPLICA_SYNC_DELAY,
+    METRICS_REPLICA_SYNC_HOUR,
+    METRICS_REPLICA_TABLE,
+    TENANT_ID,
+)
+from app.metrics import register_cache
+from .query_cache import SQLResultCache, mcp_sql_cache, normalize_sql
+
+REPLICA_COLUMNS = (
+    "account_id",
+    "platform",
+    "date",
+    "spend",
+    "clicks",
+    "conversions",
+    "revenue",
+)
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_UNSAFE_NAME_RE = re.compile(r"[^A-Za-z0-9_-]")
+_DATE_COLUMN = r"(?<![\w.\"])(?:[a-z_][a-z0-9_]*\.)?\"?date\"?"
+_DATE_LITERAL = r"'(\d{4}-\d{2}-\d{2})'"
+_DATE_COMPARISON_RE = re.compile(rf"{_DATE_COLUMN}\s*(>=|>|<=|<|=)\s*{_DATE_LITERAL}")
+_DATE_BETWEEN_RE = re.compile(
+    rf"{_DATE_COLUMN}\s+between\s+{_DATE_LITERAL}\s+and\s+{_DATE_LITERAL}"
+)
+_WHERE_RE = re.compile(r"\bwhere\b(.*?)(?:\bgroup\s+by\b|\border\s+by\b|\blimit\b|$)", re.S)
+# Anything that could make literal bounds on `date` not bound the rows read:
+# alternatives, negation, subqueries, conditional expressions and dates
+# computed at run time.
+_UNBOUNDED_RE = re.compile(
+    r"\b(?:or|not|union|intersect|except|case|with|current_date|current_time|"
+    r"current_timestamp)\b|\b(?:date|datetime|time|julianday|strftime|unixepoch)\s*\(|'now'"
+)
+
+
+class ReplicaMiss(Exception):
+    """The replica cannot answer this query; it should go to Lemonado."""
+
+
+def last_ingestion(now: datetime, hour: int, delay: float) -> datetime:
+    """Most recent time the daily ingestion window is known to have finished."""
+    finished = now.replace(hour=hour, minute=0, second=0, microsecond=0) + timedelta(
+        seconds=delay
+    )
+    return finished if finished <= now else finished - timedelta(days=1)
+
+
+def date_bounds(query: str) -> tuple[str, str]:
+    """The literal [first, last] dates a query's WHERE clause restricts `date` to.
+
+    Only a plain conjunction of comparisons against ISO date literals counts;
+    anything else (no WHERE, one bound only, OR/NOT, subqueries, CASE, or
+    dates computed with `date('now', ...)` and friends) raises `ReplicaMiss`,
+    as the replica cannot prove which days such a query reads.
+    """
+    sql = normalize_sql(query)
+    if sql.count("select") != 1 or _UNBOUNDED_RE.search(sql):
+        raise ReplicaMiss("query dates are not plain literal bounds")
+    where = _WHERE_RE.search(sql)
+    if where is None:
+        raise ReplicaMiss("query has no date filter")
+    lower: list[str] = []
+    upper: list[str] = []
+    for first, last in _DATE_BETWEEN_RE.findall(where.group(1)):
+        lower.append(first)
+        upper.append(last)
+    for operator, literal in _DATE_COMPARISON_RE.findall(where.group(1)):
+        if operator in (">=", ">", "="):
+            lower.append(literal)
+        if operator in ("<=", "<", "="):
+            upper.append(literal)
+    if not lower or not upper:
+        raise ReplicaMiss("query does not bound its dates on both sides")
+    return max(lower), min(upper)
+
+
+class MetricsReplica:
+    """Local, per-tenant SQLite copy of `/metrics/daily` for `execute_sql`.
+
+    The replica mirrors the normalized `metrics` table the worker builds from
+    Lemonado (account, platform, date and the daily totals), under the object
+    name METRICS_REPLICA_TABLE. Each tenant gets its own database file, so a
+    query can only ever see that tenant's rows. Rows are keyed on (account_id,
+    platform, date) and synced incrementally once the nightly ingestion
+    window has passed: only the days since the last sync (plus
+    `overlap_days` for late corrections) are upserted.
+
+    A query is answered locally only when the replica provably holds
+    everything it reads: every table and column it touches exists locally,
+    and its WHERE clause bounds `date` with literals inside the synced range
+    of every account. Anything else goes to Lemonado through the SQL cache.
+    """
+
+    def __init__(
+        self,
+        directory: str = METRICS_REPLICA_DIR,
+        table: str = METRICS_REPLICA_TABLE,
+        fallback: SQLResultCache = mcp_sql_cache,
+        enabled: bool = METRICS_REPLICA_ENABLED and bool(LEMONADO_BEARER_TOKEN),
+        sync_hour: int = METRICS_REPLICA_SYNC_HOUR,
+        sync_delay: float = METRICS_REPLICA_SYNC_DELAY,
+        overlap_days: int = METRICS_REPLICA_OVERLAP_DAYS,
+        query_timeout: float = METRICS_REPLICA_QUERY_TIMEOUT,
+    ):
+        if not _IDENTIFIER_RE.fullmatch(table):
+            raise ValueError(f"Invalid metrics replica table name: {table!r}")
+        self.directory = directory
+        self.table = table
+        self.fallback = fallback
+        self.enabled = enabled
+        self.sync_hour = sync_hour
+        self.sync_delay = sync_delay
+        self.overlap_days = overlap_days
+        self.query_timeout = query_timeout
+        self.hits = 0
+        self.misses = 0
+        self._writers: dict[str, sqlite3.Connection] = {}
+        self._db_lock = threading.Lock()
+        self._coverage: dict[str, tuple[str | None, str | None]] = {}
+        self._accounts: set[tuple[str, str]] = set()
+        self._inflight: dict[tuple[str, str], asyncio.Task] = {}
+        self._task: asyncio.Task | None = None
+
+    def _path(self, tenant_id: str) -> Path:
+        return Path(self.directory) / f"{_UNSAFE_NAME_RE.sub('_', tenant_id)}.db"
+
+    def _writer(self, tenant_id: str) -> sqlite3.Connection:
+        db = self._writers.get(tenant_id)
+        if db is None:
+            os.makedirs(self.directory, exist_ok=True)
+            db = sqlite3.connect(self._path(tenant_id), check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "account_id TEXT NOT NULL, platform TEXT NOT NULL, date TEXT NOT NULL, "
+                "spend REAL, clicks INTEGER, conversions INTEGER, revenue REAL, "
+                "PRIMARY KEY (account_id, platform, date)) WITHOUT ROWID"
+            )
+            db.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_date "
+                f"ON {self.table} (date, platform)"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS metrics_sync ("
+                "account TEXT PRIMARY KEY, synced_from TEXT, synced_through TEXT, "
+                "synced_at REAL NOT NULL)"
+            )
+            db.commit()
+            self._writers[tenant_id] = db
+        return db
+
+    def _sync_state(self, tenant_id: str, account: str) -> tuple[str | None, float] | None:
+        with self._db_lock:
+            return self._writer(tenant_id).execute(
+                "SELECT synced_through, synced_at FROM metrics_sync WHERE account = ?",
+                (account,),
+            ).fetchone()
+
+    def _read_coverage(self, db: sqlite3.Connection) -> tuple[str | None, str | None]:
+        # A day is only covered if every account has synced it.
+        return db.execute(
+            "SELECT MAX(synced_from), MIN(synced_through) FROM metrics_sync"
+        ).fetchone()
+
+    def _upsert(self, tenant_id: str, account: str, rows: list[dict]):
+        with self._db_lock:
+            db = self._writer(tenant_id)
+            db.executemany(
+                f"INSERT OR REPLACE INTO {self.table} ({', '.join(REPLICA_COLUMNS)}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        row.get("account_id") or account,
+                        row["platform"],
+                        row["date"][:10],
+                        row.get("spend"),
+                        row.get("clicks"),
+                        row.get("conversions"),
+                        row.get("revenue"),
+                    )
+                    for row in rows
+                ],
+            )
+            dates = [row["date"][:10] for row in rows]
+            db.execute(
+                "INSERT INTO metrics_sync (account, synced_from, synced_through, synced_at) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT (account) DO UPDATE SET "
+                "synced_at = excluded.synced_at, "
+                "synced_from = COALESCE(MIN(synced_from, excluded.synced_from), "
+                "synced_from, excluded.synced_from), "
+                "synced_through = COALESCE(MAX(synced_through, excluded.synced_through), "
+                "synced_through, excluded.synced_through)",
+                (account, min(dates, default=None), max(dates, default=None), time.time()),
+            )
+            db.commit()
+            self._coverage[tenant_id] = self._read_coverage(db)
+
+    def is_due(self, tenant_id: str, account: str, now: datetime | None = None) -> bool:
+        """Whether an ingestion window has finished since `account` last synced."""
+        state = self._sync_state(tenant_id, account)
+        if state is None:
+            return True
+        now = now or datetime.now(timezone.utc)
+        return state[1] < last_ingestion(now, self.sync_hour, self.sync_delay).timestamp()
+
+    async def sync(self, tenant_id: str, account: str = CLIENT_NAME, force: bool = False):
+        """Pull new days from `/metrics/daily` for one account, if due."""
+        self._accounts.add((tenant_id, account))
+        key = (tenant_id, account)
+        task = self._inflight.get(key)
+        if task is None:
+            if not force and not await asyncio.to_thread(self.is_due, tenant_id, account):
+                return
+            task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._sync(tenant_id, account))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        await asyncio.shield(task)
+
+    async def _sync(self, tenant_id: str, account: str):
+        started = time.monotonic()
+        state = await asyncio.to_thread(self._sync_state, tenant_id, account)
+        params = {
+            "tenant_id": tenant_id,
+            "client_name": account,
+            "date_range": DATE_RANGE_DEFAULT,
+        }
+        if state is not None and state[0]:
+            # Backends that ignore `start_date` return the full range, which
+            # upserts to the same result.
+            since = date.fromisoformat(state[0]) - timedelta(days=self.overlap_days)
+            params["start_date"] = since.isoformat()
+        response = await backend_client.get("/metrics/daily", params=params)
+        response.raise_for_status()
+        rows = [
+            row
+            for row in response.json()
+            if "start_date" not in params or row["date"][:10] >= params["start_date"]
+        ]
+        await asyncio.to_thread(self._upsert, tenant_id, account, rows)
+        logging.info(
+            f"Synced {len(rows)} daily metric rows for {tenant_id}/{account} "
+            f"into the local replica in {time.monotonic() - started:.2f}s."
+        )
+
+    def coverage(self, tenant_id: str) -> tuple[str | None, str | None]:
+        """First and last day every synced account of `tenant_id` has in the replica."""
+        if tenant_id not in self._coverage:
+            if not self._path(tenant_id).exists():
+                return None, None
+            with self._db_lock:
+                self._coverage[tenant_id] = self._read_coverage(self._writer(tenant_id))
+        return self._coverage[tenant_id]
+
+    def _query(self, tenant_id: str, query: str) -> list[dict[str, object]]:
+        first, last = self.coverage(tenant_id)
+        if first is None or last is None:
+            raise ReplicaMiss("replica has not synced this tenant")
+        lower, upper = date_bounds(query)
+        if lower < first or upper > last:
+            raise ReplicaMiss(f"query reads {lower}..{upper}, replica holds {first}..{last}")
+        db = sqlite3.connect(f"{self._path(tenant_id).resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            db.execute("PRAGMA query_only = 1")
+            db.set_authorizer(self._authorize_read)
+            stop_at = time.monotonic() + self.query_timeout
+            db.set_progress_handler(lambda: time.monotonic() > stop_at, 10_000)
+            cursor = db.execute(query)
+            columns = [column[0] for column in cursor.description or ()]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            # Includes tables or columns the replica does not have.
+            raise ReplicaMiss(str(e)) from e
+        finally:
+            db.close()
+
+    async def _local(self, tenant_id: str, query: str) -> object:
+        """The MCP-shaped result of `query` from the replica, or `ReplicaMiss`."""
+        if not self.enabled:
+            raise ReplicaMiss("replica is disabled")
+        try:
+            rows = await asyncio.to_thread(self._query, tenant_id, query)
+        except ReplicaMiss as e:
+            self.misses += 1
+            logging.info(f"Metrics replica miss for {tenant_id} ({e}); asking Lemonado.")
+            if self.coverage(tenant_id)[0] is None:
+                asyncio.create_task(self.sync(tenant_id)).add_done_callback(_log_sync_error)
+            raise
+        self.hits += 1
+        return {"content": [{"type": "text", "text": json.dumps(rows)}], "isError": False}
+
+    async def execute_sql(self, tenant_id: str, query: str) -> object:
+        """Answer `query` from the replica, or from Lemonado when it can't."""
+        try:
+            return await self._local(tenant_id, query)
+        except ReplicaMiss:
+            return await self.fallback.execute_sql(tenant_id, query)
+
+    async def execute_sql_many(self, tenant_id: str, queries: list[str]) -> list[object]:
+        """`execute_sql` for several queries, in order.
+
+        Those the replica can't answer go to Lemonado together in one batch.
+        """
+        results: list[object] = [None] * len(queries)
+        remote = []
+        for i, query in enumerate(queries):
+            try:
+                results[i] = await self._local(tenant_id, query)
+            except ReplicaMiss:
+                remote.append(i)
+        if remote:
+            fetched = await self.fallback.execute_sql_many(
+                tenant_id, [queries[i] for i in remote]
+            )
+            for i, result in zip(remote, fetched):
+                results[i] = result
+        return results
+
+    async def _run(self):
+        while True:
+            for tenant_id, account in list(self._accounts):
+                try:
+                    await self.sync(tenant_id, account)
+                except Exception:
+                    logging.exception(f"Metrics replica sync failed for {tenant_id}/{account}.")
+            now = datetime.now(timezone.utc)
+            next_sync = last_ingestion(now, self.sync_hour, self.sync_delay) + timedelta(days=1)
+            await asyncio.sleep((next_sync - now).total_seconds())
+
+    async def start(self, accounts: list[tuple[str, str]] | None = None):
+        """Sync `accounts` now if due and then after every ingestion window.
+
+        Does nothing unless the replica is enabled, which by default needs the
+        MCP copilot (LEMONADO_BEARER_TOKEN) that reads from it.
+        """
+        if self._task is not None or not self.enabled:
+            return
+        self._accounts.update(accounts or [(TENANT_ID, CLIENT_NAME)])
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        with self._db_lock:
+            for db in self._writers.values():
+                db.close()
+            self._writers.clear()
+
+    def _authorize_read(self, action: int, arg1: str | None, arg2: str | None, *_) -> int:
+        """Allow plain reads of the replicated table and nothing else."""
+        if action == sqlite3.SQLITE_READ:
+            return sqlite3.SQLITE_OK if arg1 == self.table else sqlite3.SQLITE_DENY
+        if action in (sqlite3.SQLITE_SELECT, sqlite3.SQLITE_FUNCTION):
+            return sqlite3.SQLITE_OK
+        return sqlite3.SQLITE_DENY
+
+
+def _log_sync_error(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logging.warning(f"Background metrics replica sync failed: {task.exception()}")
+
+
+metrics_replica = MetricsReplica()
+register_cache("metrics_replica", metrics_replica)
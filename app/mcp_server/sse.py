@@ -0,0 +1,45 @@
+from typing import AsyncIterable, AsyncIterator, TypedDict
+
+
+class SSEEvent(TypedDict):
+    event: str
+    data: str
+    id: str | None
+
+
+async def aiter_sse_events(lines: AsyncIterable[str]) -> AsyncIterator[SSEEvent]:
+    """Incrementally parse Server-Sent Events from an async line iterator.
+
+    Follows the WHATWG event-stream format: multi-line `data:` fields are
+    joined with newlines, `event:` and `id:` are tracked per event, comment
+    lines are skipped, and a blank line dispatches the event.
+    """
+    event_type = "message"
+    data_lines: list[str] = []
+    last_event_id: str | None = None
+    async for raw_line in lines:
+        line = raw_line.rstrip("\r\n")
+        if not line:
+            if data_lines:
+                yield {
+                    "event": event_type,
+                    "data": "\n".join(data_lines),
+                    "id": last_event_id,
+                }
+            event_type = "message"
+            data_lines = []
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "data":
+            data_lines.append(value)
+        elif field == "event":
+            event_type = value or "message"
+        elif field == "id":
+            if "\0" not in value:
+                last_event_id = value
+    if data_lines:
+        yield {"event": event_type, "data": "\n".join(data_lines), "id": last_event_id}
@@ -0,0 +1,262 @@
+import functools
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Callable, Iterator, Protocol
+from app.config import TRACING_ENABLED
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class LatencyMetrics:
+    """Call count, latency histogram, outcomes and in-flight count for one name.
+
+    For upstreams, latency is measured until response headers arrive, so
+    streamed bodies do not inflate it. Calls that never got a response are
+    counted under their exception class name instead of a status code.
+    """
+
+    def __init__(self, name: str, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.statuses: Counter[str] = Counter()
+        self.count = 0
+        self.total_seconds = 0.0
+        self.in_flight = 0
+
+    def observe(self, seconds: float, status: int | str):
+        self.count += 1
+        self.total_seconds += seconds
+        self.bucket_counts[bisect_left(self.buckets, seconds)] += 1
+        self.statuses[str(status)] += 1
+
+    def reject(self, reason: str):
+        """Count a call refused before it started (open circuit, spent deadline)."""
+        self.statuses[reason] += 1
+
+    def quantile(self, q: float) -> float | None:
+        """Approximate latency quantile: the upper bound of the bucket it falls in."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> dict[str, object]:
+        return {
+            "requests": self.count,
+            "in_flight": self.in_flight,
+            "avg_seconds": self.total_seconds / self.count if self.count else 0.0,
+            "p50_seconds": self.quantile(0.5),
+            "p95_seconds": self.quantile(0.95),
+            "p99_seconds": self.quantile(0.99),
+            "statuses": dict(self.statuses),
+            "latency_buckets": dict(
+                zip([*map(str, self.buckets), "+Inf"], self.bucket_counts)
+            ),
+        }
+
+
+class CacheStats(Protocol):
+    hits: int
+    misses: int
+
+
+_upstreams: dict[str, LatencyMetrics] = {}
+_operations: dict[str, LatencyMetrics] = {}
+_caches: dict[str, CacheStats] = {}
+_queue_waits: dict[str, LatencyMetrics] = {}
+_values: dict[str, tuple[str, str, Callable[[], float]]] = {}
+
+
+def get_upstream_metrics(name: str) -> LatencyMetrics:
+    metrics = _upstreams.get(name)
+    if metrics is None:
+        metrics = _upstreams[name] = LatencyMetrics(name)
+    return metrics
+
+
+def get_operation_metrics(name: str) -> LatencyMetrics:
+    metrics = _operations.get(name)
+    if metrics is None:
+        metrics = _operations[name] = LatencyMetrics(name)
+    return metrics
+
+
+def get_queue_wait_metrics(name: str) -> LatencyMetrics:
+    """Histogram of how long requests waited in queue `name` before running."""
+    metrics = _queue_waits.get(name)
+    if metrics is None:
+        metrics = _queue_waits[name] = LatencyMetrics(name)
+    return metrics
+
+
+def all_upstream_metrics() -> dict[str, LatencyMetrics]:
+    return dict(_upstreams)
+
+
+def register_cache(name: str, cache: CacheStats):
+    """Export `cache.hits` and `cache.misses`; they are read at scrape time."""
+    _caches[name] = cache
+
+
+def register_value(name: str, kind: str, help_text: str, read: Callable[[], float]):
+    """Export `read()` as gauge or counter `ask_your_ads_<name>`, read at scrape time."""
+    _values[name] = (kind, help_text, read)
+
+
+@functools.cache
+def _get_tracer() -> object | None:
+    if not TRACING_ENABLED:
+        return None
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        return None
+    return trace.get_tracer("ask_your_ads")
+
+
+def start_span(name: str, attributes: dict[str, str | int] | None = None):
+    """An OpenTelemetry span when the API is installed and tracing is enabled."""
+    tracer = _get_tracer()
+    if tracer is None:
+        return nullcontext()
+    return tracer.start_as_current_span(name, attributes=attributes)
+
+
+class Operation:
+    def __init__(self, span: object | None):
+        self.status = "ok"
+        self.span = span
+
+
+_operation: ContextVar[Operation | None] = ContextVar("operation", default=None)
+
+
+def record_error(error: BaseException):
+    """Mark the current tracked operation as failed without raising.
+
+    For handlers that catch an error and show it instead of propagating it.
+    """
+    operation = _operation.get()
+    if operation is None:
+        return
+    operation.status = type(error).__name__
+    if operation.span is not None:
+        from opentelemetry.trace import Status, StatusCode
+
+        operation.span.record_exception(error)
+        operation.span.set_status(Status(StatusCode.ERROR, str(error)))
+
+
+@contextmanager
+def track(name: str) -> Iterator[Operation]:
+    """Record latency, outcome and in-flight count for one call of `name`."""
+    metrics = get_operation_metrics(name)
+    with start_span(name) as span:
+        operation = Operation(span)
+        token = _operation.set(operation)
+        metrics.in_flight += 1
+        started = time.monotonic()
+        try:
+            yield operation
+        except BaseException as e:
+            operation.status = type(e).__name__
+            raise
+        finally:
+            metrics.in_flight -= 1
+            metrics.observe(time.monotonic() - started, operation.status)
+            _operation.reset(token)
+
+
+def instrument(name: str) -> Callable:
+    """Decorator form of `track` for coroutine functions such as event handlers."""
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with track(name):
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _render_latency(
+    lines: list[str], prefix: str, label: str, help_text: str, metrics: dict[str, LatencyMetrics]
+):
+    lines.append(f"# HELP {prefix}_call_duration_seconds {help_text} latency.")
+    lines.append(f"# TYPE {prefix}_call_duration_seconds histogram")
+    for name, entry in metrics.items():
+        name = _label(name)
+        cumulative = 0
+        for bound, count in zip([*map(str, entry.buckets), "+Inf"], entry.bucket_counts):
+            cumulative += count
+            lines.append(
+                f'{prefix}_call_duration_seconds_bucket{{{label}="{name}",le="{bound}"}} {cumulative}'
+            )
+        lines.append(f'{prefix}_call_duration_seconds_sum{{{label}="{name}"}} {entry.total_seconds}')
+        lines.append(f'{prefix}_call_duration_seconds_count{{{label}="{name}"}} {entry.count}')
+    lines.append(f"# HELP {prefix}_calls_total {help_text} count by status.")
+    lines.append(f"# TYPE {prefix}_calls_total counter")
+    for name, entry in metrics.items():
+        for status, count in entry.statuses.items():
+            lines.append(
+                f'{prefix}_calls_total{{{label}="{_label(name)}",status="{_label(status)}"}} {count}'
+            )
+    lines.append(f"# HELP {prefix}_calls_in_flight {help_text} calls in progress.")
+    lines.append(f"# TYPE {prefix}_calls_in_flight gauge")
+    for name, entry in metrics.items():
+        lines.append(f'{prefix}_calls_in_flight{{{label}="{_label(name)}"}} {entry.in_flight}')
+
+
+def render_prometheus() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines: list[str] = []
+    _render_latency(
+        lines,
+        "ask_your_ads_upstream",
+        "upstream",
+        "Upstream HTTP request",
+        _upstreams,
+    )
+    _render_latency(
+        lines, "ask_your_ads_operation", "operation", "Event handler and client call", _operations
+    )
+    lines.append("# HELP ask_your_ads_queue_wait_seconds Time spent queued before running.")
+    lines.append("# TYPE ask_your_ads_queue_wait_seconds histogram")
+    for name, entry in _queue_waits.items():
+        name = _label(name)
+        cumulative = 0
+        for bound, count in zip([*map(str, entry.buckets), "+Inf"], entry.bucket_counts):
+            cumulative += count
+            lines.append(
+                f'ask_your_ads_queue_wait_seconds_bucket{{queue="{name}",le="{bound}"}} {cumulative}'
+            )
+        lines.append(f'ask_your_ads_queue_wait_seconds_sum{{queue="{name}"}} {entry.total_seconds}')
+        lines.append(f'ask_your_ads_queue_wait_seconds_count{{queue="{name}"}} {entry.count}')
+    for name, (kind, help_text, read) in _values.items():
+        lines.append(f"# HELP ask_your_ads_{name} {help_text}")
+        lines.append(f"# TYPE ask_your_ads_{name} {kind}")
+        lines.append(f"ask_your_ads_{name} {read()}")
+    for kind in ("hits", "misses"):
+        lines.append(f"# HELP ask_your_ads_cache_{kind}_total Cache {kind}.")
+        lines.append(f"# TYPE ask_your_ads_cache_{kind}_total counter")
+        for name, cache in _caches.items():
+            lines.append(
+                f'ask_your_ads_cache_{kind}_total{{cache="{_label(name)}"}} {getattr(cache, kind)}'
+            )
+    return "\n".join(lines) + "\n"
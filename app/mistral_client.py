@@ -1,40 +1,104 @@
-import reflex as rx
-import os
-import json
 import logging
-from mistralai.client import MistralClient
-from app.config import MISTRAL_API_KEY, CLIENT_NAME, DATE_RANGE_DEFAULT
-from app.state import KPIRow, ChatMessage
+import time
+from contextlib import aclosing
+from typing import TYPE_CHECKING, AsyncIterator
+from app.config import (
+    MISTRAL_API_KEY,
+    MISTRAL_MODEL,
+    TENANT_ID,
+    CLIENT_NAME,
+    DATE_RANGE_DEFAULT,
+    PROMPT_TOKEN_BUDGET,
+    PROMPT_HISTORY_TURNS,
+)
+from app.metrics import get_operation_metrics, track
+from app.mistral_gateway import mistral_gateway
+from app.prompt_builder import encode_rows, estimate_tokens, window_history
 
+if TYPE_CHECKING:
+    from app.state import KPIRow, ChatMessage
 
-def _build_prompt(question: str, kpi_data: list[KPIRow]) -> list[ChatMessage]:
-    system_prompt = """You are a world-class marketing analytics assistant for a digital agency.
+
+SYSTEM_PROMPT = """You are a world-class marketing analytics assistant for a digital agency.
 Your client is asking for insights about their performance data.
 Analyze the provided KPI data and answer user questions with actionable, data-driven insights.
 Focus on: spend efficiency, Return On Ad Spend (ROAS), conversion trends, and clear optimization recommendations.
 Be concise and clear in your analysis. Use the provided data to back up your claims.
 """
-    kpi_json = json.dumps([dict(row) for row in kpi_data], indent=2)
-    user_prompt = f"\nClient: {CLIENT_NAME}\nDate Range: {DATE_RANGE_DEFAULT}\n\nCurrent Metrics:\n{kpi_json}\n\nQuestion: {question}\n"
-    return [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": user_prompt},
-    ]
 
 
-async def query_mistral(question: str, kpi_data: list[KPIRow]) -> str:
+def _build_prompt(
+    question: str,
+    kpi_data: "list[KPIRow]",
+    history: "list[ChatMessage] | None" = None,
+    token_budget: int = PROMPT_TOKEN_BUDGET,
+) -> "list[ChatMessage]":
+    """Assemble the chat messages for `question` within `token_budget` input tokens.
+
+    The fixed parts (system prompt, client context, question) are counted
+    first; what remains is split between the metrics table and the chat
+    history, with any unused history budget handed back to the metrics.
+    """
+    context = f"Client: {CLIENT_NAME}\nDate Range: {DATE_RANGE_DEFAULT}\n"
+    fixed = estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(context + question) + 16
+    remaining = max(token_budget - fixed, 0)
+    recent, summary = window_history(
+        history or [], PROMPT_HISTORY_TURNS, remaining // 3
+    )
+    system_prompt = SYSTEM_PROMPT
+    if summary:
+        system_prompt += f"\nEarlier in this conversation:\n{summary}\n"
+    history_tokens = sum(estimate_tokens(m["content"]) for m in recent)
+    metrics_budget = remaining - history_tokens - estimate_tokens(summary)
+    metrics = encode_rows([dict(row) for row in kpi_data], question, metrics_budget)
+    user_prompt = f"\n{context}\nCurrent Metrics (CSV):\n{metrics}\n\nQuestion: {question}\n"
+    messages: "list[ChatMessage]" = [{"role": "system", "content": system_prompt}]
+    messages.extend({"role": m["role"], "content": m["content"]} for m in recent)
+    messages.append({"role": "user", "content": user_prompt})
+    input_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+    logging.info(
+        f"Copilot prompt: ~{input_tokens} input tokens "
+        f"({len(recent)} recent messages, budget {token_budget})."
+    )
+    return messages
+
+
+async def stream_mistral(
+    question: str, kpi_data: "list[KPIRow]", history: "list[ChatMessage] | None" = None
+) -> AsyncIterator[str]:
+    """Stream the completion for `question` as text deltas.
+
+    Errors are raised so the caller can fall back. The wait for the first
+    chunk is tracked as `stream_mistral_first_chunk` and the whole stream,
+    including errors part-way through, as `stream_mistral`.
+    """
     if not MISTRAL_API_KEY:
         raise ValueError("MISTRAL_API_KEY is not set.")
+    metrics = get_operation_metrics("stream_mistral")
+    metrics.in_flight += 1
+    started = time.monotonic()
+    status = "ok"
     try:
-        client = MistralClient(api_key=MISTRAL_API_KEY)
-        messages = _build_prompt(question, kpi_data)
-        chat_response = await client.chat_async(
-            model="mistral-medium-latest",
-            messages=messages,
-            temperature=0.7,
-            max_tokens=1000,
-        )
-        return chat_response.choices[0].message.content
-    except Exception as e:
-        logging.exception(f"Error querying Mistral AI: {e}")
-        return "Sorry, I encountered an error while trying to generate a response. Please check the logs."
\ No newline at end of file
+        messages = _build_prompt(question, kpi_data, history)
+        async with aclosing(
+            mistral_gateway.stream(
+                TENANT_ID,
+                messages,
+                model=MISTRAL_MODEL,
+                temperature=0.7,
+                max_tokens=1000,
+            )
+        ) as chunks:
+            with track("stream_mistral_first_chunk"):
+                first = await anext(chunks, None)
+            if first is None:
+                return
+            yield first
+            async for delta in chunks:
+                yield delta
+    except BaseException as e:
+        status = type(e).__name__
+        raise
+    finally:
+        metrics.in_flight -= 1
+        metrics.observe(time.monotonic() - started, status)
@@ -0,0 +1,345 @@
+import asyncio
+import httpx
+import logging
+import random
+import time
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, TypeVar
+from app.config import (
+    MISTRAL_API_KEY,
+    MISTRAL_SERVER_URL,
+    MISTRAL_MAX_CONCURRENCY,
+    MISTRAL_MAX_CONCURRENCY_PER_TENANT,
+    MISTRAL_TOKENS_PER_MINUTE,
+    MISTRAL_TOKENS_PER_MINUTE_PER_TENANT,
+    MISTRAL_MAX_RETRIES,
+    MISTRAL_DEADLINE,
+)
+from app.metrics import get_queue_wait_metrics, register_value
+from app.resilience import (
+    CircuitOpenError,
+    DeadlineExceededError,
+    ResilientTransport,
+    get_retry_budget,
+    remaining,
+)
+
+if TYPE_CHECKING:
+    from mistralai import Mistral
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """Token-per-minute budget that refills continuously. Zero means unlimited."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = per_minute
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.capacity / 60
+        )
+        self.updated = now
+
+    def delay_for(self, tokens: int) -> float:
+        """Seconds until `tokens` can be spent."""
+        if self.capacity <= 0:
+            return 0.0
+        self._refill()
+        tokens = min(tokens, self.capacity)
+        if self.tokens >= tokens:
+            return 0.0
+        return (tokens - self.tokens) * 60 / self.capacity
+
+    def take(self, tokens: int):
+        if self.capacity > 0:
+            self._refill()
+            self.tokens -= tokens
+
+    def refund(self, tokens: int):
+        if self.capacity > 0:
+            self.tokens = min(self.capacity, self.tokens + tokens)
+
+
+def estimate_tokens(messages: list[dict], max_tokens: int) -> int:
+    return sum(len(m["content"]) for m in messages) // 4 + max_tokens
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (CircuitOpenError, DeadlineExceededError)):
+        return False
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, httpx.TransportError)
+
+
+class MistralGateway:
+    """Shared Mistral client behind a fair, concurrency- and budget-limited queue.
+
+    Requests wait in per-tenant FIFO queues that are served round-robin, so
+    one busy tenant cannot starve the others. A request is admitted when the
+    global and per-tenant concurrency limits and token-per-minute budgets all
+    allow it. 429 and 5xx responses are retried with jittered exponential
+    backoff until the request deadline, as long as the shared "mistral"
+    retry budget allows.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = MISTRAL_MAX_CONCURRENCY,
+        max_concurrency_per_tenant: int = MISTRAL_MAX_CONCURRENCY_PER_TENANT,
+        tokens_per_minute: int = MISTRAL_TOKENS_PER_MINUTE,
+        tokens_per_minute_per_tenant: int = MISTRAL_TOKENS_PER_MINUTE_PER_TENANT,
+        max_retries: int = MISTRAL_MAX_RETRIES,
+        deadline: float = MISTRAL_DEADLINE,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_concurrency_per_tenant = max_concurrency_per_tenant
+        self.tokens_per_minute_per_tenant = tokens_per_minute_per_tenant
+        self.max_retries = max_retries
+        self.deadline = deadline
+        self._client: "Mistral | None" = None
+        self._http: httpx.AsyncClient | None = None
+        self._active = 0
+        self._active_by_tenant: dict[str, int] = {}
+        self._queues: OrderedDict[str, deque[tuple[asyncio.Future, int, float]]] = (
+            OrderedDict()
+        )
+        self._global_budget = TokenBucket(tokens_per_minute)
+        self._tenant_budgets: dict[str, TokenBucket] = {}
+        self._wakeup: asyncio.TimerHandle | None = None
+        self.requests = 0
+        self.retries = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.wait_metrics = get_queue_wait_metrics("mistral")
+
+    @property
+    def client(self) -> "Mistral":
+        if self._client is None:
+            # The SDK is slow to import, so load it on first use.
+            from mistralai import Mistral
+
+            if not MISTRAL_API_KEY:
+                raise ValueError("MISTRAL_API_KEY is not set.")
+            self._http = httpx.AsyncClient(
+                timeout=self.deadline,
+                transport=ResilientTransport(
+                    "mistral", limits=httpx.Limits(keepalive_expiry=60)
+                ),
+            )
+            self._client = Mistral(
+                api_key=MISTRAL_API_KEY,
+                server_url=MISTRAL_SERVER_URL,
+                async_client=self._http,
+            )
+        return self._client
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "queue_depth": self.queue_depth,
+            "active": self.active,
+            "requests": self.requests,
+            "retries": self.retries,
+            "avg_wait_seconds": self.total_wait / self.requests if self.requests else 0.0,
+            "max_wait_seconds": self.max_wait,
+        }
+
+    def _tenant_budget(self, tenant_id: str) -> TokenBucket:
+        budget = self._tenant_budgets.get(tenant_id)
+        if budget is None:
+            budget = self._tenant_budgets[tenant_id] = TokenBucket(
+                self.tokens_per_minute_per_tenant
+            )
+        return budget
+
+    def _dispatch(self):
+        retry_in: float | None = None
+        granted = True
+        while granted and self._active < self.max_concurrency:
+            granted = False
+            for tenant_id in list(self._queues):
+                queue = self._queues[tenant_id]
+                while queue and queue[0][0].done():
+                    queue.popleft()
+                if not queue:
+                    del self._queues[tenant_id]
+                    continue
+                if self._active_by_tenant.get(tenant_id, 0) >= (
+                    self.max_concurrency_per_tenant
+                ):
+                    continue
+                future, tokens, enqueued_at = queue[0]
+                tenant_budget = self._tenant_budget(tenant_id)
+                delay = max(
+                    self._global_budget.delay_for(tokens), tenant_budget.delay_for(tokens)
+                )
+                if delay > 0:
+                    retry_in = delay if retry_in is None else min(retry_in, delay)
+                    continue
+                queue.popleft()
+                self._global_budget.take(tokens)
+                tenant_budget.take(tokens)
+                self._active += 1
+                self._active_by_tenant[tenant_id] = (
+                    self._active_by_tenant.get(tenant_id, 0) + 1
+                )
+                self._queues.move_to_end(tenant_id)
+                waited = time.monotonic() - enqueued_at
+                self.requests += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+                self.wait_metrics.observe(waited, "granted")
+                if waited > 0.1:
+                    logging.info(
+                        f"Mistral request for {tenant_id} waited {waited:.2f}s "
+                        f"(queue depth {self.queue_depth})."
+                    )
+                future.set_result(None)
+                granted = True
+                break
+        if retry_in is not None and self._wakeup is None:
+            self._wakeup = asyncio.get_running_loop().call_later(
+                retry_in, self._on_wakeup
+            )
+
+    def _on_wakeup(self):
+        self._wakeup = None
+        self._dispatch()
+
+    async def _acquire(self, tenant_id: str, tokens: int):
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(tenant_id, deque()).append(
+            (future, tokens, time.monotonic())
+        )
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(tenant_id)
+            raise
+
+    def _release(self, tenant_id: str, refund: int = 0):
+        self._active -= 1
+        self._active_by_tenant[tenant_id] -= 1
+        if refund:
+            self._global_budget.refund(refund)
+            self._tenant_budget(tenant_id).refund(refund)
+        self._dispatch()
+
+    async def _call_with_retries(
+        self, call: Callable[[], Awaitable[T]], deadline: float
+    ) -> T:
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await asyncio.wait_for(call(), deadline - time.monotonic())
+            except Exception as e:
+                backoff = random.uniform(0, min(8.0, 0.5 * 2**attempt))
+                if (
+                    not _is_retryable(e)
+                    or attempt == self.max_retries
+                    or time.monotonic() + backoff >= deadline
+                    or not get_retry_budget("mistral").try_spend()
+                ):
+                    raise
+                self.retries += 1
+                logging.warning(
+                    f"Mistral request failed ({e}), retrying in {backoff:.2f}s."
+                )
+                await asyncio.sleep(backoff)
+
+    async def complete(
+        self, tenant_id: str, messages: list[dict], max_tokens: int = 1000, **kwargs
+    ) -> str:
+        """Run a chat completion through the queue and return its text."""
+        budget = remaining(self.deadline)
+        deadline = time.monotonic() + budget
+        estimate = estimate_tokens(messages, max_tokens)
+        await asyncio.wait_for(self._acquire(tenant_id, estimate), budget)
+        refund = 0
+        try:
+            response = await self._call_with_retries(
+                lambda: self.client.chat.complete_async(
+                    messages=messages, max_tokens=max_tokens, **kwargs
+                ),
+                deadline,
+            )
+            if response.usage is not None:
+                refund = estimate - response.usage.total_tokens
+            return response.choices[0].message.content
+        finally:
+            self._release(tenant_id, refund)
+
+    async def stream(
+        self, tenant_id: str, messages: list[dict], max_tokens: int = 1000, **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream a chat completion through the queue as text deltas.
+
+        The deadline covers queueing and opening the stream, not generation.
+        """
+        budget = remaining(self.deadline)
+        deadline = time.monotonic() + budget
+        estimate = estimate_tokens(messages, max_tokens)
+        await asyncio.wait_for(self._acquire(tenant_id, estimate), budget)
+        refund = 0
+        try:
+            response = await self._call_with_retries(
+                lambda: self.client.chat.stream_async(
+                    messages=messages, max_tokens=max_tokens, **kwargs
+                ),
+                deadline,
+            )
+            async for event in response:
+                if event.data.usage is not None:
+                    refund = estimate - event.data.usage.total_tokens
+                if not event.data.choices:
+                    continue
+                delta = event.data.choices[0].delta.content
+                if isinstance(delta, str) and delta:
+                    yield delta
+        finally:
+            self._release(tenant_id, refund)
+
+    async def close(self):
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        if self._http is not None:
+            await self._http.aclose()
+        self._client = None
+        self._http = None
+
+
+mistral_gateway = MistralGateway()
+register_value(
+    "mistral_queue_depth",
+    "gauge",
+    "Mistral requests waiting for a concurrency slot or token budget.",
+    lambda: mistral_gateway.queue_depth,
+)
+register_value(
+    "mistral_active_requests",
+    "gauge",
+    "Mistral requests currently running.",
+    lambda: mistral_gateway.active,
+)
+register_value(
+    "mistral_retries_total",
+    "counter",
+    "Mistral requests retried after a 429 or 5xx.",
+    lambda: mistral_gateway.retries,
+)
@@ -0,0 +1,124 @@
+import reflex as rx
+from app.components.sidebar import main_content
+from app.connexify.state import AccountHealthState, AccountRow, AccountStatusRow
+
+STATUS_BADGE_CLASSES = {
+    "active": "px-2 py-1 text-xs font-medium text-green-700 bg-green-100 rounded-full",
+    "disconnected": "px-2 py-1 text-xs font-medium text-gray-700 bg-gray-100 rounded-full",
+    "error": "px-2 py-1 text-xs font-medium text-red-700 bg-red-100 rounded-full",
+}
+
+
+def status_row(row: AccountStatusRow) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(row["platform"], class_name="px-4 py-2 font-medium text-gray-900"),
+        rx.el.td(row["active"], class_name="px-4 py-2 text-right text-green-700"),
+        rx.el.td(row["disconnected"], class_name="px-4 py-2 text-right text-gray-600"),
+        rx.el.td(row["error"], class_name="px-4 py-2 text-right text-red-700"),
+        class_name="border-t border-gray-200",
+    )
+
+
+def status_table() -> rx.Component:
+    return rx.el.table(
+        rx.el.thead(
+            rx.el.tr(
+                rx.el.th("Platform", class_name="px-4 py-2 text-left"),
+                rx.el.th("Active", class_name="px-4 py-2 text-right"),
+                rx.el.th("Disconnected", class_name="px-4 py-2 text-right"),
+                rx.el.th("Error", class_name="px-4 py-2 text-right"),
+            ),
+            class_name="text-sm text-gray-500",
+        ),
+        rx.el.tbody(rx.foreach(AccountHealthState.status_rows, status_row)),
+        class_name="w-full text-sm border border-gray-200 rounded-lg",
+    )
+
+
+def account_row(row: AccountRow) -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.p(row["display_name"], class_name="font-semibold text-gray-900"),
+            rx.el.p(
+                f"{row['client_name']} · {row['platform']}",
+                class_name="text-sm text-gray-500",
+            ),
+        ),
+        rx.el.span(
+            row["status"],
+            class_name=rx.match(
+                row["status"],
+                ("active", STATUS_BADGE_CLASSES["active"]),
+                ("disconnected", STATUS_BADGE_CLASSES["disconnected"]),
+                STATUS_BADGE_CLASSES["error"],
+            ),
+        ),
+        class_name="flex items-center justify-between p-4 border border-gray-200 rounded-lg shadow-sm",
+    )
+
+
+def account_list() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.h2("Accounts", class_name="text-xl font-bold text-gray-900"),
+            rx.el.select(
+                rx.el.option("Error", value="error"),
+                rx.el.option("Disconnected", value="disconnected"),
+                rx.el.option("Active", value="active"),
+                value=AccountHealthState.account_status,
+                on_change=AccountHealthState.set_account_status,
+                class_name="px-3 py-2 border border-gray-300 rounded-md shadow-sm bg-white",
+            ),
+            class_name="flex items-center justify-between mb-4",
+        ),
+        rx.cond(
+            AccountHealthState.accounts.length() > 0,
+            rx.el.div(
+                rx.foreach(AccountHealthState.accounts, account_row),
+                rx.cond(
+                    AccountHealthState.total_accounts
+                    > AccountHealthState.accounts.length(),
+                    rx.el.p(
+                        f"Showing {AccountHealthState.accounts.length()} of "
+                        f"{AccountHealthState.total_accounts} accounts.",
+                        class_name="text-sm text-gray-500",
+                    ),
+                    None,
+                ),
+                class_name="space-y-3",
+            ),
+            rx.el.p("No accounts found.", class_name="text-center text-gray-500"),
+        ),
+    )
+
+
+def accounts() -> rx.Component:
+    return main_content(
+        rx.el.div(
+            rx.el.h1(
+                "Account Health", class_name="text-3xl font-bold text-gray-900 mb-6"
+            ),
+            rx.cond(
+                AccountHealthState.error != "",
+                rx.el.div(
+                    rx.icon("badge_alert", class_name="h-5 w-5 text-red-500 mr-2"),
+                    rx.el.p(AccountHealthState.error),
+                    class_name="flex items-center p-4 mb-4 text-sm text-red-800 border border-red-300 rounded-lg bg-red-50",
+                ),
+                None,
+            ),
+            rx.cond(
+                AccountHealthState.is_loading,
+                rx.el.div(
+                    rx.el.p("Loading connected accounts..."),
+                    class_name="text-center text-gray-500",
+                ),
+                rx.el.div(
+                    status_table(),
+                    account_list(),
+                    class_name="space-y-8",
+                ),
+            ),
+            class_name="max-w-4xl mx-auto",
+        )
+    )
@@ -28,7 +28,7 @@ def chat_interface() -> rx.Component:
         rx.el.div(
             rx.foreach(AppState.chat_messages, chat_message_bubble),
             rx.cond(
-                AppState.is_loading_chat,
+                AppState.is_loading_chat & ~AppState.is_streaming_chat,
                 rx.el.div(
                     rx.el.div(
                         rx.icon(
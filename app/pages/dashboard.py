@@ -32,6 +32,140 @@ def widget_selection_panel() -> rx.Component:
     )
 
 
+def performance_chart() -> rx.Component:
+    return rx.el.div(
+        rx.el.select(
+            rx.el.option("Spend", value="spend"),
+            rx.el.option("Revenue", value="revenue"),
+            rx.el.option("Conversions", value="conversions"),
+            rx.el.option("Clicks", value="clicks"),
+            rx.el.option("ROAS", value="roas"),
+            rx.el.option("CPA", value="cpa"),
+            value=WidgetState.performance_metric,
+            on_change=WidgetState.set_performance_metric,
+            class_name="mb-2 px-2 py-1 text-sm border border-gray-300 rounded-md",
+        ),
+        rx.cond(
+            WidgetState.performance_error != "",
+            rx.el.p(WidgetState.performance_error, class_name="text-sm text-red-600"),
+            rx.cond(
+                WidgetState.is_loading_performance,
+                rx.el.p("Loading...", class_name="text-sm text-gray-500"),
+                rx.recharts.line_chart(
+                    rx.recharts.line(
+                        data_key="value", stroke="#7c3aed", dot=False, name="Daily"
+                    ),
+                    rx.recharts.line(
+                        data_key="rolling_7d",
+                        stroke="#c4b5fd",
+                        dot=False,
+                        name="Rolling 7d",
+                    ),
+                    rx.recharts.x_axis(data_key="date"),
+                    rx.recharts.y_axis(),
+                    rx.recharts.graphing_tooltip(),
+                    data=WidgetState.performance_points,
+                    width="100%",
+                    height=200,
+                ),
+            ),
+        ),
+    )
+
+
+def top_campaign_row(row: rx.Var) -> rx.Component:
+    return rx.el.div(
+        rx.el.span(row["name"], class_name="text-gray-800 truncate"),
+        rx.el.span(row["platform"], class_name="text-gray-600"),
+        rx.el.span(row["value"], class_name="text-gray-900 text-right font-medium"),
+        class_name="grid grid-cols-3 gap-2 text-sm py-1 border-b",
+    )
+
+
+def top_campaigns() -> rx.Component:
+    return rx.el.div(
+        rx.el.select(
+            rx.el.option("ROAS", value="roas"),
+            rx.el.option("Conversions", value="conversions"),
+            rx.el.option("Spend", value="spend"),
+            rx.el.option("CPA (lowest)", value="cpa"),
+            value=WidgetState.top_campaigns_metric,
+            on_change=WidgetState.set_top_campaigns_metric,
+            class_name="mb-2 px-2 py-1 text-sm border border-gray-300 rounded-md",
+        ),
+        rx.cond(
+            WidgetState.campaigns_error != "",
+            rx.el.p(WidgetState.campaigns_error, class_name="text-sm text-red-600"),
+            rx.cond(
+                WidgetState.is_loading_campaigns,
+                rx.el.p("Loading...", class_name="text-sm text-gray-500"),
+                rx.foreach(WidgetState.top_campaigns, top_campaign_row),
+            ),
+        ),
+    )
+
+
+def summary_stat(label: str, value: rx.Var) -> rx.Component:
+    return rx.el.div(
+        rx.el.p(label, class_name="text-xs text-gray-500"),
+        rx.el.p(value, class_name="text-lg font-semibold text-gray-900"),
+    )
+
+
+def kpi_summary() -> rx.Component:
+    return rx.el.div(
+        summary_stat("Spend", WidgetState.summary_totals["spend"]),
+        summary_stat("Revenue", WidgetState.summary_totals["revenue"]),
+        summary_stat("Conversions", WidgetState.summary_totals["conversions"]),
+        summary_stat("ROAS", WidgetState.summary_totals["roas"]),
+        class_name="grid grid-cols-2 gap-4",
+    )
+
+
+def platform_breakdown_row(row: rx.Var) -> rx.Component:
+    return rx.el.div(
+        rx.el.span(row["platform"], class_name="text-gray-800"),
+        rx.el.span(row["total_spend"], class_name="text-gray-600"),
+        rx.el.span(row["total_revenue"], class_name="text-gray-600"),
+        class_name="grid grid-cols-3 gap-2 text-sm py-1 border-b",
+    )
+
+
+def platform_breakdown() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.span("Platform"),
+            rx.el.span("Spend"),
+            rx.el.span("Revenue"),
+            class_name="grid grid-cols-3 gap-2 text-xs font-semibold text-gray-500 pb-1 border-b",
+        ),
+        rx.foreach(WidgetState.formatted_summary_rows, platform_breakdown_row),
+    )
+
+
+def summary_widget(content: rx.Component) -> rx.Component:
+    return rx.cond(
+        WidgetState.summary_error != "",
+        rx.el.p(WidgetState.summary_error, class_name="text-sm text-red-600"),
+        rx.cond(
+            WidgetState.is_loading_summary,
+            rx.el.p("Loading...", class_name="text-sm text-gray-500"),
+            content,
+        ),
+    )
+
+
+def widget_content(widget: SelectedWidget) -> rx.Component:
+    return rx.match(
+        widget.type,
+        ("kpi_summary", summary_widget(kpi_summary())),
+        ("platform_breakdown", summary_widget(platform_breakdown())),
+        ("performance_chart", performance_chart()),
+        ("top_campaigns", top_campaigns()),
+        rx.el.p("Widget content placeholder..."),
+    )
+
+
 def selected_widget_display(widget: SelectedWidget) -> rx.Component:
     return rx.el.div(
         rx.el.div(
@@ -44,7 +178,7 @@ def selected_widget_display(widget: SelectedWidget) -> rx.Component:
             ),
             class_name="flex justify-between items-center mb-2 pb-2 border-b",
         ),
-        rx.el.p("Widget content placeholder..."),
+        widget_content(widget),
         class_name="p-4 border border-gray-200 rounded-lg shadow-sm bg-white min-h-[200px]",
     )
 
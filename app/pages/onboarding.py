@@ -83,9 +83,54 @@ def onboarding_form() -> rx.Component:
     )
 
 
+def client_filters() -> rx.Component:
+    return rx.el.div(
+        rx.el.input(
+            placeholder="Search clients",
+            default_value=OnboardingState.search,
+            on_change=OnboardingState.set_search.debounce(300),
+            class_name="flex-1 px-3 py-2 border border-gray-300 rounded-md shadow-sm focus:outline-none focus:ring-violet-500 focus:border-violet-500",
+        ),
+        rx.el.select(
+            rx.el.option("All", value="all"),
+            rx.el.option("Pending", value="pending"),
+            rx.el.option("Completed", value="completed"),
+            rx.el.option("Expired", value="expired"),
+            value=OnboardingState.status_filter,
+            on_change=OnboardingState.set_status_filter,
+            class_name="px-3 py-2 border border-gray-300 rounded-md shadow-sm bg-white",
+        ),
+        class_name="flex gap-2 mb-4",
+    )
+
+
+def client_pagination() -> rx.Component:
+    return rx.el.div(
+        rx.el.button(
+            "Previous",
+            on_click=OnboardingState.previous_page,
+            disabled=OnboardingState.page <= 1,
+            class_name="px-3 py-1 text-sm border border-gray-300 rounded-md disabled:opacity-50",
+        ),
+        rx.el.span(
+            f"Page {OnboardingState.page} of {OnboardingState.page_count} "
+            f"({OnboardingState.total_clients} clients)",
+            class_name="text-sm text-gray-600",
+        ),
+        rx.el.button(
+            "Next",
+            on_click=OnboardingState.next_page,
+            disabled=OnboardingState.page >= OnboardingState.page_count,
+            class_name="px-3 py-1 text-sm border border-gray-300 rounded-md disabled:opacity-50",
+        ),
+        class_name="flex items-center justify-between mt-4",
+    )
+
+
 def client_list() -> rx.Component:
     return rx.el.div(
         rx.el.h2("Clients", class_name="text-xl font-bold text-gray-900 mb-4"),
+        client_filters(),
         rx.cond(
             OnboardingState.is_loading,
             rx.el.div(
@@ -94,8 +139,11 @@ def client_list() -> rx.Component:
             rx.cond(
                 OnboardingState.clients.length() > 0,
                 rx.el.div(
-                    rx.foreach(OnboardingState.clients, client_card),
-                    class_name="space-y-3",
+                    rx.el.div(
+                        rx.foreach(OnboardingState.clients, client_card),
+                        class_name="space-y-3",
+                    ),
+                    client_pagination(),
                 ),
                 rx.el.p("No clients found.", class_name="text-center text-gray-500"),
             ),
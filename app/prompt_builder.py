@@ -0,0 +1,123 @@
+import re
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.state import ChatMessage
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s")
+_GENERIC_PLATFORM_WORDS = {"ads", "ad", "analytics"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for Mistral tokenizers (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+def _format_number(value: object) -> str:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return str(value).replace(",", " ")
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    if abs(value) >= 100:
+        return f"{value:.0f}"
+    return f"{value:.2f}"
+
+
+def _with_derived_metrics(row: dict) -> dict:
+    derived = {
+        (key[6:] if key.startswith("total_") else key): value
+        for key, value in row.items()
+    }
+    spend = derived.get("spend")
+    if isinstance(spend, (int, float)):
+        revenue = derived.get("revenue")
+        conversions = derived.get("conversions")
+        if isinstance(revenue, (int, float)):
+            derived["roas"] = revenue / spend if spend else None
+        if isinstance(conversions, (int, float)):
+            derived["cpa"] = spend / conversions if conversions else None
+    return derived
+
+
+def rank_rows(rows: list[dict], question: str) -> list[dict]:
+    """Order rows by relevance: platforms named in the question first, then by spend."""
+    question_words = set(_WORD_RE.findall(question.lower()))
+
+    def score(row: dict) -> tuple[int, float]:
+        platform_words = set(_WORD_RE.findall(str(row.get("platform", "")).lower()))
+        mentioned = bool((platform_words - _GENERIC_PLATFORM_WORDS) & question_words)
+        spend = row.get("total_spend", row.get("spend", 0)) or 0
+        return (0 if mentioned else 1, -spend)
+
+    return sorted(rows, key=score)
+
+
+def encode_rows(rows: list[dict], question: str, token_budget: int) -> str:
+    """Encode metric rows as compact CSV within `token_budget`.
+
+    Numbers are rounded, ROAS and CPA are precomputed, and rows are added in
+    relevance order until the budget is spent.
+    """
+    if not rows:
+        return "(no data)"
+    ranked = [_with_derived_metrics(row) for row in rank_rows(rows, question)]
+    columns = list(ranked[0].keys())
+    lines = [",".join(columns)]
+    used = estimate_tokens(lines[0])
+    for row in ranked:
+        line = ",".join(
+            "" if row.get(column) is None else _format_number(row[column])
+            for column in columns
+        )
+        cost = estimate_tokens(line)
+        if used + cost > token_budget:
+            break
+        lines.append(line)
+        used += cost
+    omitted = len(ranked) - (len(lines) - 1)
+    if omitted:
+        lines.append(f"({omitted} lower-priority rows omitted)")
+    return "\n".join(lines)
+
+
+def _first_sentence(text: str, limit: int = 160) -> str:
+    sentence = _SENTENCE_END_RE.split(text.strip(), maxsplit=1)[0]
+    return sentence if len(sentence) <= limit else sentence[: limit - 3] + "..."
+
+
+def window_history(
+    history: "list[ChatMessage]", max_turns: int, token_budget: int
+) -> "tuple[list[ChatMessage], str]":
+    """Split chat history into recent verbatim messages and a summary of older turns.
+
+    Returns the recent messages (newest `max_turns` that fit in the budget)
+    and a one-line-per-message summary of everything older, trimmed so the
+    total stays within `token_budget`.
+    """
+    end = len(history)
+    if end and history[end - 1]["role"] == "user":
+        end -= 1
+    start = end
+    used = 0
+    while start > max(end - max_turns, 0):
+        cost = estimate_tokens(history[start - 1]["content"])
+        if used + cost > token_budget:
+            break
+        start -= 1
+        used += cost
+    while start < end and history[start]["role"] == "assistant":
+        used -= estimate_tokens(history[start]["content"])
+        start += 1
+    recent = history[start:end]
+    older = history[:start]
+    summary_lines: list[str] = []
+    for message in reversed(older):
+        speaker = "User" if message["role"] == "user" else "Copilot"
+        line = f"- {speaker}: {_first_sentence(message['content'])}"
+        cost = estimate_tokens(line)
+        if used + cost > token_budget:
+            break
+        summary_lines.insert(0, line)
+        used += cost
+    return recent, "\n".join(summary_lines)
@@ -0,0 +1,263 @@
+import httpx
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Literal
+from app.config import (
+    CIRCUIT_FAILURE_RATE,
+    CIRCUIT_MIN_REQUESTS,
+    CIRCUIT_WINDOW,
+    CIRCUIT_COOLDOWN,
+    RETRY_BUDGET_RATIO,
+    RETRY_BUDGET_MIN_RETRIES,
+    RETRY_BUDGET_WINDOW,
+)
+from app.metrics import get_upstream_metrics, start_span
+
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+class CircuitOpenError(httpx.ConnectError):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+class DeadlineExceededError(httpx.TimeoutException):
+    """Raised instead of calling an upstream once the request deadline has passed."""
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """Bound every outbound call made inside the block to `seconds` from now.
+
+    Nested deadlines can only shorten the one already in effect. The deadline
+    lives in a context variable, so tasks started inside the block inherit it.
+    """
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(at if current is None else min(at, current))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining(default: float | None = None) -> float | None:
+    """Seconds left before the current deadline, capped at `default`.
+
+    Returns `default` when no deadline is set.
+    """
+    at = _deadline.get()
+    if at is None:
+        return default
+    left = at - time.monotonic()
+    return left if default is None else min(left, default)
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker with half-open probing.
+
+    Opens when at least `min_requests` outcomes in the last `window` seconds
+    have a failure rate of `failure_rate` or more. After `cooldown` seconds a
+    single probe is let through; its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = CIRCUIT_FAILURE_RATE,
+        min_requests: int = CIRCUIT_MIN_REQUESTS,
+        window: float = CIRCUIT_WINDOW,
+        cooldown: float = CIRCUIT_COOLDOWN,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.cooldown = cooldown
+        self.state: Literal["closed", "open", "half_open"] = "closed"
+        self._outcomes: deque[tuple[float, bool]] = deque()
+        self._opened_at = 0.0
+
+    def _trim(self, now: float):
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+
+    def allow(self) -> bool:
+        """Whether a call may go out now. Claims the probe slot when half-open."""
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self._opened_at >= self.cooldown:
+            self.state = "half_open"
+            logging.info(f"Circuit {self.name} half-open, sending probe.")
+            return True
+        return False
+
+    def record_success(self):
+        now = time.monotonic()
+        if self.state == "half_open":
+            logging.info(f"Circuit {self.name} closed.")
+            self.state = "closed"
+            self._outcomes.clear()
+        self._outcomes.append((now, True))
+        self._trim(now)
+
+    def record_failure(self):
+        now = time.monotonic()
+        if self.state == "half_open":
+            self._open(now)
+            return
+        self._outcomes.append((now, False))
+        self._trim(now)
+        if len(self._outcomes) < self.min_requests:
+            return
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        if failures / len(self._outcomes) >= self.failure_rate:
+            self._open(now)
+
+    def release_probe(self):
+        """Give back a half-open probe slot whose call was cancelled."""
+        if self.state == "half_open":
+            self.state = "open"
+            self._opened_at = time.monotonic() - self.cooldown
+
+    def _open(self, now: float):
+        if self.state != "open":
+            logging.warning(f"Circuit {self.name} opened.")
+        self.state = "open"
+        self._opened_at = now
+
+
+class RetryBudget:
+    """Caps retries against one upstream to a fraction of its recent traffic.
+
+    Over the last `window` seconds, at most `min_retries` plus `ratio` times
+    the number of requests may be retries, so retry storms cannot multiply
+    load on a struggling dependency.
+    """
+
+    def __init__(
+        self,
+        ratio: float = RETRY_BUDGET_RATIO,
+        min_retries: int = RETRY_BUDGET_MIN_RETRIES,
+        window: float = RETRY_BUDGET_WINDOW,
+    ):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._requests: deque[float] = deque()
+        self._retries: deque[float] = deque()
+
+    def _trim(self, now: float):
+        for events in (self._requests, self._retries):
+            while events and now - events[0] > self.window:
+                events.popleft()
+
+    def record_request(self):
+        now = time.monotonic()
+        self._requests.append(now)
+        self._trim(now)
+
+    def try_spend(self) -> bool:
+        """Claim one retry, or return False when the budget is exhausted."""
+        now = time.monotonic()
+        self._trim(now)
+        if len(self._retries) >= self.min_retries + self.ratio * len(self._requests):
+            return False
+        self._retries.append(now)
+        return True
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """httpx transport that applies the shared resilience policy for one upstream.
+
+    Requests fail immediately when the deadline has passed or the upstream's
+    circuit is open; otherwise their timeouts are trimmed to the time left.
+    Transport errors, 429 and 5xx responses count as failures for the
+    breaker. Latency and status codes are recorded per upstream in
+    `app.metrics`, and each request gets an OpenTelemetry span when the API
+    is installed.
+    """
+
+    def __init__(
+        self, upstream: str, transport: httpx.AsyncBaseTransport | None = None, **kwargs
+    ):
+        self.upstream = upstream
+        self.breaker = get_breaker(upstream)
+        self.retry_budget = get_retry_budget(upstream)
+        self.metrics = get_upstream_metrics(upstream)
+        self._transport = transport or httpx.AsyncHTTPTransport(**kwargs)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        left = remaining()
+        if left is not None:
+            if left <= 0:
+                self.metrics.reject("DeadlineExceeded")
+                raise DeadlineExceededError(
+                    f"Deadline exceeded before calling {self.upstream}.", request=request
+                )
+            timeout = request.extensions.get("timeout") or dict.fromkeys(
+                ("connect", "read", "write", "pool")
+            )
+            request.extensions["timeout"] = {
+                key: left if value is None else min(value, left)
+                for key, value in timeout.items()
+            }
+        if not self.breaker.allow():
+            self.metrics.reject("CircuitOpen")
+            raise CircuitOpenError(
+                f"Circuit for {self.upstream} is open.", request=request
+            )
+        self.retry_budget.record_request()
+        self.metrics.in_flight += 1
+        started = time.monotonic()
+        try:
+            with start_span(
+                f"{self.upstream} {request.method}",
+                {
+                    "upstream": self.upstream,
+                    "http.request.method": request.method,
+                    "url.path": request.url.path,
+                },
+            ) as span:
+                response = await self._transport.handle_async_request(request)
+                if span is not None:
+                    span.set_attribute("http.response.status_code", response.status_code)
+        except httpx.TransportError as e:
+            self.breaker.record_failure()
+            self.metrics.observe(time.monotonic() - started, type(e).__name__)
+            raise
+        except BaseException as e:
+            self.breaker.release_probe()
+            self.metrics.observe(time.monotonic() - started, type(e).__name__)
+            raise
+        finally:
+            self.metrics.in_flight -= 1
+        self.metrics.observe(time.monotonic() - started, response.status_code)
+        if response.status_code == 429 or response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_retry_budgets: dict[str, RetryBudget] = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(name)
+    return breaker
+
+
+def get_retry_budget(name: str) -> RetryBudget:
+    budget = _retry_budgets.get(name)
+    if budget is None:
+        budget = _retry_budgets[name] = RetryBudget()
+    return budget
@@ -1,8 +1,21 @@
 import reflex as rx
 import httpx
 import logging
-from typing import TypedDict, Literal
-from app.config import API_BACKEND_URL, TENANT_ID, CLIENT_NAME, DATE_RANGE_DEFAULT
+import time
+from typing import AsyncIterator, TypedDict, Literal
+from app.config import (
+    TENANT_ID,
+    CLIENT_NAME,
+    DATE_RANGE_DEFAULT,
+    CHAT_STREAM_FLUSH_INTERVAL,
+    CHAT_STREAM_FLUSH_CHUNKS,
+    EVENT_DEADLINE,
+)
+from app.backend_client import backend_client
+from app.resilience import deadline
+from app.metrics import instrument, record_error
+from app.kpi_cache import kpi_cache
+from app.answer_cache import answer_cache, kpi_fingerprint
 
 
 class KPIRow(TypedDict):
@@ -23,6 +36,7 @@ class AppState(rx.State):
     chat_messages: list[ChatMessage] = []
     is_loading_kpis: bool = False
     is_loading_chat: bool = False
+    is_streaming_chat: bool = False
     kpi_error: str = ""
     chat_error: str = ""
     chat_input: str = ""
@@ -46,114 +60,158 @@ class AppState(rx.State):
         ]
 
     @rx.event(background=True)
+    @instrument("load_summary")
     async def load_summary(self):
         async with self:
             self.is_loading_kpis = True
             self.kpi_error = ""
         try:
-            params = {
-                "tenant_id": TENANT_ID,
-                "client_name": CLIENT_NAME,
-                "date_range": DATE_RANGE_DEFAULT,
-            }
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{API_BACKEND_URL}/metrics/summary", params=params
-                )
-                response.raise_for_status()
-                data = response.json()
+            with deadline(EVENT_DEADLINE):
+                data = await kpi_cache.get(TENANT_ID, CLIENT_NAME, DATE_RANGE_DEFAULT)
             async with self:
-                self.kpi_rows = data
+                self.kpi_rows = [dict(row) for row in data]
         except httpx.HTTPStatusError as e:
             logging.exception(f"HTTP error loading summary: {e}")
+            record_error(e)
             async with self:
                 self.kpi_error = f"API Error: {e.response.status_code}. Please ensure the api-backend service is running and accessible."
         except httpx.ConnectError as e:
             logging.exception(f"Connection error loading summary: {e}")
+            record_error(e)
             async with self:
                 self.kpi_error = "Connection Error: Cannot connect to the API backend. Is the service running?"
         except Exception as e:
             logging.exception(f"Error loading summary: {e}")
+            record_error(e)
             async with self:
                 self.kpi_error = f"An unexpected error occurred: {e}"
         finally:
             async with self:
                 self.is_loading_kpis = False
 
+    async def _stream_assistant_message(self, chunks: AsyncIterator[str]) -> str | None:
+        """Append streamed text to a new assistant message in throttled batches.
+
+        State is pushed to the browser on the first chunk, then at most every
+        CHAT_STREAM_FLUSH_INTERVAL seconds or CHAT_STREAM_FLUSH_CHUNKS chunks.
+        Errors before the first chunk are raised so the caller can fall back.
+        Returns the full answer, or None if the stream was interrupted.
+        """
+        received: list[str] = []
+        pending: list[str] = []
+        started = False
+        last_flush = time.monotonic()
+        try:
+            async for chunk in chunks:
+                received.append(chunk)
+                pending.append(chunk)
+                if (
+                    started
+                    and len(pending) < CHAT_STREAM_FLUSH_CHUNKS
+                    and time.monotonic() - last_flush < CHAT_STREAM_FLUSH_INTERVAL
+                ):
+                    continue
+                async with self:
+                    if not started:
+                        self.chat_messages.append({"role": "assistant", "content": ""})
+                        self.is_streaming_chat = True
+                    self.chat_messages[-1]["content"] += "".join(pending)
+                started = True
+                pending = []
+                last_flush = time.monotonic()
+        except Exception:
+            if not started:
+                raise
+            logging.exception("Streaming response was interrupted.")
+            async with self:
+                self.chat_error = "The response was interrupted before it finished."
+            return None
+        finally:
+            async with self:
+                if started and pending:
+                    self.chat_messages[-1]["content"] += "".join(pending)
+                self.is_streaming_chat = False
+        return "".join(received)
+
     @rx.event(background=True)
+    @instrument("ask_copilot")
     async def ask_copilot(self, form_data: dict):
         question = form_data.get("question", "").strip()
         if not question:
             return
         async with self:
+            history = [dict(message) for message in self.chat_messages]
             self.chat_messages.append({"role": "user", "content": question})
             self.is_loading_chat = True
             self.chat_error = ""
         try:
-            from app.config import MISTRAL_API_KEY, LEMONADO_BEARER_TOKEN
-            from app.mcp_server.client import LemonadoMCPClient
-
-            if LEMONADO_BEARER_TOKEN:
-                logging.info("Attempting to use Lemonado MCP client.")
-                mcp_client = LemonadoMCPClient()
-                try:
-                    if await mcp_client.health_check():
-                        logging.info(
-                            f"MCP session established: {mcp_client.session_id}"
-                        )
-                        tool_response = await mcp_client.call_tool(
-                            tool_name="list_objects", arguments={}
-                        )
-                        answer = f"MCP tool 'list_objects' executed. Result: {str(tool_response)}"
-                        async with self:
-                            self.chat_messages.append(
-                                {"role": "assistant", "content": answer}
-                            )
-                        return
-                    else:
-                        logging.warning("MCP health check failed, falling back.")
-                except Exception as e:
-                    logging.exception(
-                        "MCP tool call failed, falling back to other methods."
-                    )
-                finally:
-                    await mcp_client.close()
-            logging.info("Falling back to Mistral or API query.")
-            if MISTRAL_API_KEY:
-                try:
-                    from app.mistral_client import query_mistral
-
-                    answer = await query_mistral(question, self.kpi_rows)
-                    async with self:
-                        self.chat_messages.append(
-                            {"role": "assistant", "content": answer}
-                        )
-                    return
-                except Exception as e:
-                    logging.exception(
-                        "Mistral query failed, falling back to API backend."
-                    )
-            try:
+            from app.config import get_settings
+            from app.copilot_router import (
+                CopilotProvider,
+                CopilotUnavailableError,
+                open_stream,
+                route,
+            )
+
+            fingerprint = kpi_fingerprint(self.kpi_rows)
+            answer = None if history else answer_cache.get(TENANT_ID, fingerprint, question)
+            if answer is not None:
+                async with self:
+                    self.chat_messages.append({"role": "assistant", "content": answer})
+                return
+
+            async def ask_mcp() -> str:
+                from app.mcp_server.copilot import answer_question
+
+                return await answer_question(TENANT_ID, question)
+
+            async def ask_mistral() -> AsyncIterator[str]:
+                from app.mistral_client import stream_mistral
+
+                return await open_stream(stream_mistral(question, self.kpi_rows, history))
+
+            async def ask_backend() -> str:
                 payload = {
                     "question": question,
                     "tenant_id": TENANT_ID,
                     "client_name": CLIENT_NAME,
                 }
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        f"{API_BACKEND_URL}/ai/query", json=payload, timeout=60
-                    )
-                    response.raise_for_status()
-                    ai_response = response.json()
-                async with self:
-                    self.chat_messages.append(
-                        {
-                            "role": "assistant",
-                            "content": ai_response.get("answer", "No answer received."),
-                        }
-                    )
-            except Exception as e:
-                logging.exception("Final fallback to API backend failed.")
+                # The router's deadline bounds this call; the transport trims
+                # the (unset) timeouts to it.
+                response = await backend_client.post("/ai/query", json=payload, timeout=None)
+                response.raise_for_status()
+                return response.json().get("answer", "No answer received.")
+
+            settings = get_settings()
+            providers: list[CopilotProvider] = []
+            if settings.LEMONADO_BEARER_TOKEN:
+                providers.append(
+                    {
+                        "name": "mcp",
+                        "call": ask_mcp,
+                        "hedge_delay": settings.COPILOT_MCP_HEDGE_DELAY,
+                    }
+                )
+            if settings.MISTRAL_API_KEY:
+                providers.append(
+                    {
+                        "name": "mistral",
+                        "call": ask_mistral,
+                        "hedge_delay": settings.COPILOT_MISTRAL_HEDGE_DELAY,
+                    }
+                )
+            providers.append(
+                {
+                    "name": "backend",
+                    "call": ask_backend,
+                    "hedge_delay": 0,
+                }
+            )
+            try:
+                provider, result = await route(providers, settings.COPILOT_DEADLINE)
+            except CopilotUnavailableError as e:
+                logging.exception("No copilot provider could answer.")
+                record_error(e)
                 async with self:
                     self.chat_error = "All AI services are currently unavailable. Please check your configuration and network."
                     self.chat_messages.append(
@@ -162,12 +220,22 @@ class AppState(rx.State):
                             "content": "I'm unable to process your request at the moment.",
                         }
                     )
+                return
+            if isinstance(result, str):
+                async with self:
+                    self.chat_messages.append({"role": "assistant", "content": result})
+                return
+            answer = await self._stream_assistant_message(result)
+            if answer and provider == "mistral" and not history:
+                answer_cache.put(TENANT_ID, fingerprint, question, answer)
         except httpx.HTTPStatusError as e:
             logging.exception(f"HTTP error asking copilot: {e}")
+            record_error(e)
             async with self:
                 self.chat_error = f"Failed to get response: {e.response.status_code}. Is the API backend running?"
         except Exception as e:
             logging.exception(f"Error asking copilot: {e}")
+            record_error(e)
             async with self:
                 self.chat_error = f"An unexpected error occurred: {str(e)}"
         finally:
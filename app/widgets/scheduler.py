@@ -0,0 +1,58 @@
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable
+from app.kpi_cache import kpi_cache
+from .timeseries import daily_metrics_store
+from .top_campaigns import campaign_rankings
+
+WidgetDataKey = tuple[str, str, str, str]
+
+WIDGET_SOURCES: dict[str, tuple[str, ...]] = {
+    "kpi_summary": ("summary",),
+    "platform_breakdown": ("summary",),
+    "performance_chart": ("daily",),
+    "top_campaigns": ("campaigns",),
+}
+
+SOURCE_LOADERS: dict[str, Callable[[str, str, str], Awaitable[object]]] = {
+    "summary": kpi_cache.get,
+    "daily": daily_metrics_store.get,
+    "campaigns": campaign_rankings.get,
+}
+
+
+def plan_widget_requests(
+    widget_types: list[str], tenant_id: str, client_name: str, date_range: str
+) -> list[WidgetDataKey]:
+    """Merge the data needs of `widget_types` into the minimal set of requests.
+
+    Widgets that read the same source for the same tenant, client and date
+    range share one request, so adding widgets does not add round trips.
+    """
+    keys: list[WidgetDataKey] = []
+    for widget_type in widget_types:
+        for source in WIDGET_SOURCES.get(widget_type, ()):
+            key = (source, tenant_id, client_name, date_range)
+            if key not in keys:
+                keys.append(key)
+    return keys
+
+
+async def iter_widget_data(
+    keys: list[WidgetDataKey],
+) -> AsyncIterator[tuple[WidgetDataKey, object, Exception | None]]:
+    """Run all requests concurrently and yield each result as it resolves."""
+    tasks = {
+        asyncio.create_task(SOURCE_LOADERS[key[0]](*key[1:])): key for key in keys
+    }
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                error = task.exception()
+                yield tasks[task], None if error else task.result(), error
+    finally:
+        for task in pending:
+            task.cancel()
@@ -1,6 +1,13 @@
 import reflex as rx
+import logging
 from typing import TypedDict
 import uuid
+from app.config import TENANT_ID, CLIENT_NAME, DATE_RANGE_DEFAULT, EVENT_DEADLINE
+from app.resilience import deadline
+from app.state import KPIRow
+from .scheduler import iter_widget_data, plan_widget_requests
+from .timeseries import ChartPoint, DailyMetrics, daily_metrics_store
+from .top_campaigns import RankedCampaign, TopCampaigns, campaign_rankings
 
 
 class AvailableWidget(TypedDict):
@@ -17,6 +24,17 @@ class SelectedWidget(AvailableWidget):
 class WidgetState(rx.State):
     available_widgets: list[AvailableWidget] = []
     selected_widgets: list[SelectedWidget] = []
+    summary_rows: list[KPIRow] = []
+    is_loading_summary: bool = False
+    summary_error: str = ""
+    performance_metric: str = "spend"
+    performance_points: list[ChartPoint] = []
+    is_loading_performance: bool = False
+    performance_error: str = ""
+    top_campaigns_metric: str = "roas"
+    top_campaigns: list[RankedCampaign] = []
+    is_loading_campaigns: bool = False
+    campaigns_error: str = ""
 
     def _get_widget_id(self) -> str:
         return str(uuid.uuid4())
@@ -54,9 +72,129 @@ class WidgetState(rx.State):
     def add_widget(self, widget: AvailableWidget):
         new_widget = SelectedWidget(**widget, id=self._get_widget_id())
         self.selected_widgets.append(new_widget)
+        return WidgetState.load_widget_data
 
     @rx.event
     def remove_widget(self, widget_id: str):
         self.selected_widgets = [
             w for w in self.selected_widgets if w["id"] != widget_id
-        ]
\ No newline at end of file
+        ]
+
+    @rx.var
+    def summary_totals(self) -> dict[str, str]:
+        spend = sum(row["total_spend"] for row in self.summary_rows)
+        revenue = sum(row["total_revenue"] for row in self.summary_rows)
+        conversions = sum(row["total_conversions"] for row in self.summary_rows)
+        return {
+            "spend": f"${spend:,.2f}",
+            "revenue": f"${revenue:,.2f}",
+            "conversions": f"{conversions:,}",
+            "roas": f"{revenue / spend:.2f}x" if spend else "-",
+        }
+
+    @rx.var
+    def formatted_summary_rows(self) -> list[dict[str, str]]:
+        return [
+            {
+                "platform": row["platform"].replace("_", " ").title(),
+                "total_spend": f"${row['total_spend']:.2f}",
+                "total_revenue": f"${row['total_revenue']:.2f}",
+            }
+            for row in self.summary_rows
+        ]
+
+    @rx.event(background=True)
+    async def load_widget_data(self):
+        """Load data for every selected widget with the minimum set of requests."""
+        async with self:
+            widget_types = [w["type"] for w in self.selected_widgets]
+            keys = plan_widget_requests(
+                widget_types, TENANT_ID, CLIENT_NAME, DATE_RANGE_DEFAULT
+            )
+            sources = {key[0] for key in keys}
+            self.is_loading_summary = "summary" in sources
+            self.is_loading_performance = "daily" in sources
+            self.is_loading_campaigns = "campaigns" in sources
+            self.summary_error = ""
+            self.performance_error = ""
+            self.campaigns_error = ""
+            metric = self.performance_metric
+            campaigns_metric = self.top_campaigns_metric
+        with deadline(EVENT_DEADLINE):
+            async for key, data, error in iter_widget_data(keys):
+                source = key[0]
+                if error is not None:
+                    logging.error(f"Error loading widget data from {source}: {error}")
+                async with self:
+                    if source == "summary":
+                        self.is_loading_summary = False
+                        if error is not None:
+                            self.summary_error = f"Failed to load KPI summary: {error}"
+                        else:
+                            self.summary_rows = [dict(row) for row in data]
+                    elif source == "daily":
+                        self.is_loading_performance = False
+                        if error is not None:
+                            self.performance_error = f"Failed to load daily metrics: {error}"
+                        elif isinstance(data, DailyMetrics):
+                            self.performance_points = data.chart_points(metric)
+                    elif source == "campaigns":
+                        self.is_loading_campaigns = False
+                        if error is not None:
+                            self.campaigns_error = f"Failed to load campaigns: {error}"
+                        elif isinstance(data, TopCampaigns):
+                            self.top_campaigns = data.ranked(campaigns_metric)
+
+    @rx.event
+    def set_performance_metric(self, metric: str):
+        self.performance_metric = metric
+        return WidgetState.load_performance_chart
+
+    @rx.event(background=True)
+    async def load_performance_chart(self):
+        async with self:
+            self.is_loading_performance = True
+            self.performance_error = ""
+            metric = self.performance_metric
+        try:
+            with deadline(EVENT_DEADLINE):
+                daily_metrics = await daily_metrics_store.get(
+                    TENANT_ID, CLIENT_NAME, DATE_RANGE_DEFAULT
+                )
+            points = daily_metrics.chart_points(metric)
+            async with self:
+                self.performance_points = points
+        except Exception as e:
+            logging.exception(f"Error loading daily metrics: {e}")
+            async with self:
+                self.performance_error = f"Failed to load daily metrics: {e}"
+        finally:
+            async with self:
+                self.is_loading_performance = False
+
+    @rx.event
+    def set_top_campaigns_metric(self, metric: str):
+        self.top_campaigns_metric = metric
+        return WidgetState.load_top_campaigns
+
+    @rx.event(background=True)
+    async def load_top_campaigns(self):
+        """Re-rank from the stored heaps; only fetches if they have expired."""
+        async with self:
+            self.is_loading_campaigns = True
+            self.campaigns_error = ""
+            metric = self.top_campaigns_metric
+        try:
+            with deadline(EVENT_DEADLINE):
+                rankings = await campaign_rankings.get(
+                    TENANT_ID, CLIENT_NAME, DATE_RANGE_DEFAULT
+                )
+            async with self:
+                self.top_campaigns = rankings.ranked(metric)
+        except Exception as e:
+            logging.exception(f"Error loading top campaigns: {e}")
+            async with self:
+                self.campaigns_error = f"Failed to load campaigns: {e}"
+        finally:
+            async with self:
+                self.is_loading_campaigns = False
@@ -0,0 +1,216 @@
+import asyncio
+import time
+import numpy as np
+from typing import TypedDict
+from app.config import CHART_MAX_POINTS, KPI_CACHE_MAX_AGE
+from app.backend_client import backend_client
+from app.metrics import register_cache
+
+METRICS = ("spend", "clicks", "conversions", "revenue")
+
+
+class DailyRow(TypedDict):
+    date: str
+    platform: str
+    spend: float
+    clicks: int
+    conversions: int
+    revenue: float
+
+
+class ChartPoint(TypedDict):
+    date: str
+    value: float | None
+    rolling_7d: float | None
+    wow_pct: float | None
+    roas: float | None
+
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing sum over `window` days; the first days sum what is available."""
+    cumulative = np.cumsum(values)
+    out = cumulative.copy()
+    out[window:] = cumulative[window:] - cumulative[:-window]
+    return out
+
+
+def week_over_week(values: np.ndarray) -> np.ndarray:
+    """Percent change against the same day one week earlier (NaN if undefined)."""
+    out = np.full(values.shape, np.nan)
+    if len(values) <= 7:
+        return out
+    previous = values[:-7]
+    np.divide(
+        (values[7:] - previous) * 100,
+        previous,
+        out=out[7:],
+        where=previous != 0,
+    )
+    return out
+
+
+def ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    out = np.full(numerator.shape, np.nan)
+    np.divide(numerator, denominator, out=out, where=denominator != 0)
+    return out
+
+
+def lttb_indices(values: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices picked by Largest-Triangle-Three-Buckets downsampling."""
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    y = np.nan_to_num(values.astype(float))
+    x = np.arange(n, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+class DailyMetrics:
+    """Per-platform daily metrics stored as dense platform x day arrays.
+
+    Missing days are zero-filled so every series shares one date axis and
+    all derived values are computed with vectorized NumPy operations.
+    """
+
+    def __init__(self, rows: list[DailyRow]):
+        if rows:
+            dates = np.array([row["date"][:10] for row in rows], dtype="datetime64[D]")
+            self.platforms, platform_index = np.unique(
+                [row["platform"] for row in rows], return_inverse=True
+            )
+            start = dates.min()
+            self.days = np.arange(start, dates.max() + 1)
+            day_index = (dates - start).astype(int)
+        else:
+            self.platforms = np.array([], dtype=str)
+            self.days = np.array([], dtype="datetime64[D]")
+            platform_index = day_index = np.array([], dtype=int)
+        shape = (len(self.platforms), len(self.days))
+        self.values: dict[str, np.ndarray] = {}
+        for metric in METRICS:
+            matrix = np.zeros(shape)
+            np.add.at(
+                matrix,
+                (platform_index, day_index),
+                np.array([row.get(metric) or 0 for row in rows], dtype=float),
+            )
+            self.values[metric] = matrix
+
+    def series(self, metric: str, platform: str | None = None) -> np.ndarray:
+        if metric == "roas":
+            return ratio(self.series("revenue", platform), self.series("spend", platform))
+        if metric == "cpa":
+            return ratio(
+                self.series("spend", platform), self.series("conversions", platform)
+            )
+        matrix = self.values[metric]
+        if platform is None:
+            return matrix.sum(axis=0)
+        mask = self.platforms == platform
+        return matrix[mask].sum(axis=0)
+
+    def chart_points(
+        self,
+        metric: str = "spend",
+        platform: str | None = None,
+        max_points: int = CHART_MAX_POINTS,
+    ) -> list[ChartPoint]:
+        """Chart-ready points for `metric`, downsampled to `max_points`."""
+        values = self.series(metric, platform)
+        if metric in ("roas", "cpa"):
+            numerator, denominator = (
+                ("revenue", "spend") if metric == "roas" else ("spend", "conversions")
+            )
+            rolling = ratio(
+                rolling_sum(self.series(numerator, platform), 7),
+                rolling_sum(self.series(denominator, platform), 7),
+            )
+        else:
+            rolling = rolling_sum(values, 7)
+        wow = week_over_week(values)
+        roas = self.series("roas", platform)
+        keep = lttb_indices(values, max_points)
+        dates = np.datetime_as_string(self.days[keep])
+        columns = [np.round(column[keep], 2) for column in (values, rolling, wow, roas)]
+        return [
+            {
+                "date": str(date),
+                "value": _json_float(value),
+                "rolling_7d": _json_float(rolling_value),
+                "wow_pct": _json_float(wow_value),
+                "roas": _json_float(roas_value),
+            }
+            for date, value, rolling_value, wow_value, roas_value in zip(
+                dates, *(column.tolist() for column in columns)
+            )
+        ]
+
+
+def _json_float(value: float) -> float | None:
+    return None if value != value else value
+
+
+class DailyMetricsStore:
+    """Fetches `/metrics/daily` once per key and keeps the columnar result."""
+
+    def __init__(self, max_age: float = KPI_CACHE_MAX_AGE):
+        self.max_age = max_age
+        self._entries: dict[tuple[str, str, str], tuple[float, DailyMetrics]] = {}
+        self._inflight: dict[tuple[str, str, str], asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, tenant_id: str, client_name: str, date_range: str) -> DailyMetrics:
+        key = (tenant_id, client_name, date_range)
+        entry = self._entries.get(key)
+        if entry and time.monotonic() - entry[0] < self.max_age:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: tuple[str, str, str]) -> DailyMetrics:
+        tenant_id, client_name, date_range = key
+        response = await backend_client.get(
+            "/metrics/daily",
+            params={
+                "tenant_id": tenant_id,
+                "client_name": client_name,
+                "date_range": date_range,
+            },
+        )
+        response.raise_for_status()
+        metrics = DailyMetrics(response.json())
+        self._entries[key] = (time.monotonic(), metrics)
+        return metrics
+
+    def invalidate(self):
+        self._entries.clear()
+
+
+daily_metrics_store = DailyMetricsStore()
+register_cache("daily_metrics", daily_metrics_store)
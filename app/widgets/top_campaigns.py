@@ -0,0 +1,186 @@
+import asyncio
+import itertools
+import json
+import time
+from heapq import heappush, heapreplace
+from typing import AsyncIterator, Callable, TypedDict
+from app.config import KPI_CACHE_MAX_AGE, TOP_CAMPAIGNS_K
+from app.backend_client import backend_client
+from app.metrics import register_cache
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+
+class CampaignRow(TypedDict):
+    campaign_id: str
+    campaign_name: str
+    platform: str
+    spend: float
+    clicks: int
+    conversions: int
+    revenue: float
+
+
+class RankedCampaign(TypedDict):
+    name: str
+    platform: str
+    value: str
+
+
+def _roas(row: CampaignRow) -> float | None:
+    return row["revenue"] / row["spend"] if row["spend"] > 0 else None
+
+
+def _cpa(row: CampaignRow) -> float | None:
+    if row["spend"] <= 0 or row["conversions"] <= 0:
+        return None
+    return row["spend"] / row["conversions"]
+
+
+# Metric -> (score, higher is better, display format). Rows without a score
+# (ROAS with no spend, CPA with no spend or no conversions) are left out of
+# that ranking, so a free campaign never tops CPA at "$0.00".
+RANKING_METRICS: dict[str, tuple[Callable[[CampaignRow], float | None], bool, str]] = {
+    "roas": (_roas, True, "{:.2f}x"),
+    "conversions": (lambda row: row["conversions"], True, "{:,.0f}"),
+    "spend": (lambda row: row["spend"], True, "${:,.2f}"),
+    "cpa": (_cpa, False, "${:,.2f}"),
+}
+
+
+def _campaign_row(raw: dict) -> CampaignRow:
+    return {
+        "campaign_id": str(raw.get("campaign_id", "")),
+        "campaign_name": raw.get("campaign_name") or str(raw.get("campaign_id", "")),
+        "platform": raw.get("platform", ""),
+        "spend": float(raw.get("spend") or 0),
+        "clicks": int(raw.get("clicks") or 0),
+        "conversions": int(raw.get("conversions") or 0),
+        "revenue": float(raw.get("revenue") or 0),
+    }
+
+
+class TopCampaigns:
+    """Top `k` campaigns for every ranking metric, built in one pass.
+
+    Each metric keeps a min-heap of its best `k` rows, so memory stays at
+    O(k × metrics) however many campaigns stream through, and switching the
+    ranking metric is a lookup rather than a refetch. Ties keep the row seen
+    first.
+    """
+
+    def __init__(
+        self, k: int = TOP_CAMPAIGNS_K, metrics: tuple[str, ...] = tuple(RANKING_METRICS)
+    ):
+        self.k = k
+        self.rows_seen = 0
+        self._heaps: dict[str, list[tuple[float, int, CampaignRow]]] = {
+            metric: [] for metric in metrics
+        }
+        self._order = itertools.count()
+
+    def add(self, row: CampaignRow):
+        self.rows_seen += 1
+        order = -next(self._order)
+        for metric, heap in self._heaps.items():
+            score_fn, higher_is_better, _ = RANKING_METRICS[metric]
+            score = score_fn(row)
+            if score is None:
+                continue
+            if not higher_is_better:
+                score = -score
+            if len(heap) < self.k:
+                heappush(heap, (score, order, row))
+            elif score > heap[0][0]:
+                # Rows arrive in order, so an equal score never displaces the
+                # row already kept.
+                heapreplace(heap, (score, order, row))
+
+    def top(self, metric: str) -> list[CampaignRow]:
+        """Best rows for `metric`, best first."""
+        return [row for _, _, row in sorted(self._heaps[metric], reverse=True)]
+
+    def ranked(self, metric: str) -> list[RankedCampaign]:
+        """`top(metric)` formatted for display."""
+        score_fn, _, display = RANKING_METRICS[metric]
+        return [
+            {
+                "name": row["campaign_name"],
+                "platform": row["platform"].replace("_", " ").title(),
+                "value": display.format(score_fn(row)),
+            }
+            for row in self.top(metric)
+        ]
+
+
+async def iter_campaign_rows(
+    tenant_id: str, client_name: str, date_range: str
+) -> AsyncIterator[CampaignRow]:
+    """Stream campaign rows from `/metrics/campaigns`.
+
+    NDJSON responses are parsed line by line as they arrive; a backend that
+    answers with a plain JSON array is decoded in one go.
+    """
+    async with backend_client.stream(
+        "GET",
+        "/metrics/campaigns",
+        params={
+            "tenant_id": tenant_id,
+            "client_name": client_name,
+            "date_range": date_range,
+        },
+        headers={"Accept": "application/x-ndjson, application/json;q=0.5"},
+    ) as response:
+        response.raise_for_status()
+        if "ndjson" in response.headers.get("content-type", ""):
+            async for line in response.aiter_lines():
+                if line.strip():
+                    yield _campaign_row(_loads(line))
+        else:
+            for raw in _loads(await response.aread()):
+                yield _campaign_row(raw)
+
+
+class CampaignRankingStore:
+    """Keeps one `TopCampaigns` per key so re-ranking never refetches."""
+
+    def __init__(self, max_age: float = KPI_CACHE_MAX_AGE, k: int = TOP_CAMPAIGNS_K):
+        self.max_age = max_age
+        self.k = k
+        self._entries: dict[tuple[str, str, str], tuple[float, TopCampaigns]] = {}
+        self._inflight: dict[tuple[str, str, str], asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, tenant_id: str, client_name: str, date_range: str) -> TopCampaigns:
+        key = (tenant_id, client_name, date_range)
+        entry = self._entries.get(key)
+        if entry and time.monotonic() - entry[0] < self.max_age:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: tuple[str, str, str]) -> TopCampaigns:
+        rankings = TopCampaigns(self.k)
+        async for row in iter_campaign_rows(*key):
+            rankings.add(row)
+        self._entries[key] = (time.monotonic(), rankings)
+        return rankings
+
+    def invalidate(self):
+        self._entries.clear()
+
+
+campaign_rankings = CampaignRankingStore()
+register_cache("campaign_rankings", campaign_rankings)
@@ -0,0 +1,287 @@
+"""Local stand-ins for every upstream the app talks to.
+
+Each fake is a FastAPI app with configurable latency and payload size, read
+from environment variables when the module is imported:
+
+    FAKE_LATENCY_MS        added to every response (default 20)
+    FAKE_LATENCY_JITTER_MS uniform jitter on top (default 10)
+    FAKE_ROWS              rows per metrics response / clients total (default 500)
+    FAKE_PAYLOAD_BYTES     size of MCP tool results (default 16384)
+    FAKE_STREAM_CHUNKS     chunks per streamed Mistral answer (default 40)
+    FAKE_CAMPAIGNS         campaign rows streamed by /metrics/campaigns (default 10000)
+
+    python -m benchmarks.fakes            # serve all four on ports 9101-9104
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import time
+import uuid
+from datetime import date, timedelta
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY = float(os.getenv("FAKE_LATENCY_MS", "20")) / 1000
+JITTER = float(os.getenv("FAKE_LATENCY_JITTER_MS", "10")) / 1000
+ROWS = int(os.getenv("FAKE_ROWS", "500"))
+PAYLOAD_BYTES = int(os.getenv("FAKE_PAYLOAD_BYTES", "16384"))
+STREAM_CHUNKS = int(os.getenv("FAKE_STREAM_CHUNKS", "40"))
+CAMPAIGNS = int(os.getenv("FAKE_CAMPAIGNS", "10000"))
+PLATFORMS = ("google_ads", "meta_ads", "linkedin_ads", "tiktok_ads")
+PORTS = {"backend": 9101, "mcp": 9102, "mistral": 9103, "connexify": 9104}
+
+
+async def delay(scale: float = 1.0):
+    await asyncio.sleep((LATENCY + random.uniform(0, JITTER)) * scale)
+
+
+# api-backend
+
+backend_app = FastAPI()
+
+
+@backend_app.get("/metrics/summary")
+async def metrics_summary():
+    await delay()
+    return [
+        {
+            "platform": platform,
+            "total_spend": random.uniform(1000, 50000),
+            "total_clicks": random.randint(1000, 90000),
+            "total_conversions": random.randint(10, 2000),
+            "total_revenue": random.uniform(1000, 150000),
+        }
+        for platform in PLATFORMS
+    ]
+
+
+@backend_app.get("/metrics/daily")
+async def metrics_daily():
+    await delay()
+    start = date.today() - timedelta(days=ROWS // len(PLATFORMS))
+    return [
+        {
+            "date": (start + timedelta(days=i // len(PLATFORMS))).isoformat(),
+            "platform": PLATFORMS[i % len(PLATFORMS)],
+            "spend": random.uniform(10, 2000),
+            "clicks": random.randint(10, 5000),
+            "conversions": random.randint(0, 100),
+            "revenue": random.uniform(0, 8000),
+        }
+        for i in range(ROWS)
+    ]
+
+
+@backend_app.get("/metrics/campaigns")
+async def metrics_campaigns():
+    async def rows():
+        await delay()
+        batch = []
+        for i in range(CAMPAIGNS):
+            batch.append({
+                "campaign_id": f"cmp_{i}",
+                "campaign_name": f"Campaign {i}",
+                "platform": PLATFORMS[i % len(PLATFORMS)],
+                "spend": random.uniform(0, 5000),
+                "clicks": random.randint(0, 20000),
+                "conversions": random.randint(0, 300),
+                "revenue": random.uniform(0, 20000),
+            })
+            if len(batch) == 500 or i == CAMPAIGNS - 1:
+                yield "".join(json.dumps(row) + "\n" for row in batch)
+                batch = []
+
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+
+@backend_app.post("/ai/query")
+async def ai_query(request: Request):
+    await delay(10)
+    question = (await request.json()).get("question", "")
+    return {"answer": f"Backend answer to: {question}"}
+
+
+# Lemonado MCP (JSON-RPC over SSE)
+
+mcp_app = FastAPI()
+
+
+def _mcp_result(message: dict) -> dict:
+    method = message.get("method")
+    if method == "initialize":
+        result = {"protocolVersion": "2024-11-05", "capabilities": {"tools": {}}}
+    elif method == "tools/list":
+        result = {
+            "tools": [
+                {"name": name, "description": name, "inputSchema": {"type": "object"}}
+                for name in ("list_objects", "get_object_details", "execute_sql")
+            ]
+        }
+    else:
+        result = {"content": [{"type": "text", "text": "x" * PAYLOAD_BYTES}], "isError": False}
+    return {"jsonrpc": "2.0", "id": message.get("id"), "result": result}
+
+
+@mcp_app.post("/mcp")
+async def mcp(request: Request):
+    payload = await request.json()
+    session_id = request.headers.get("mcp-session-id") or uuid.uuid4().hex
+    messages = payload if isinstance(payload, list) else [payload]
+
+    async def events():
+        for message in messages:
+            await delay()
+            yield f"event: message\ndata: {json.dumps(_mcp_result(message))}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"mcp-session-id": session_id},
+    )
+
+
+# Mistral chat completions
+
+mistral_app = FastAPI()
+
+
+@mistral_app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "fake-model")
+    words = [f"word{i} " for i in range(STREAM_CHUNKS)]
+    usage = {"prompt_tokens": 500, "completion_tokens": len(words), "total_tokens": 500 + len(words)}
+    completion_id = uuid.uuid4().hex
+    if not body.get("stream"):
+        await delay(10)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "model": model,
+            "created": int(time.time()),
+            "usage": usage,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(words)},
+                    "finish_reason": "stop",
+                }
+            ],
+        }
+
+    async def events():
+        await delay(5)
+        for i, word in enumerate(words):
+            last = i == len(words) - 1
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "model": model,
+                "created": int(time.time()),
+                "choices": [
+                    {
+                        "index": 0,
+                        "delta": {"content": word},
+                        "finish_reason": "stop" if last else None,
+                    }
+                ],
+            }
+            if last:
+                chunk["usage"] = usage
+            yield f"data: {json.dumps(chunk)}\n\n"
+            await delay(0.1)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# Connexify
+
+connexify_app = FastAPI()
+
+
+@connexify_app.get("/api/data/clients")
+async def list_clients(page: int = 1, per_page: int = 100):
+    await delay()
+    start = (page - 1) * per_page
+    return {
+        "data": [
+            {
+                "id": f"client_{i}",
+                "name": f"Client {i}",
+                "onboarding_status": ("pending", "completed", "expired")[i % 3],
+            }
+            for i in range(start, min(start + per_page, ROWS))
+        ],
+        "pagination": {"page": page, "per_page": per_page, "total": ROWS},
+    }
+
+
+@connexify_app.get("/api/data/clients/{client_id}/accounts")
+async def connected_accounts(client_id: str):
+    await delay()
+    return [
+        {
+            "id": f"{client_id}_{platform}",
+            "platform": platform,
+            "display_name": f"{client_id} {platform}",
+            "status": random.choice(("active", "active", "active", "disconnected", "error")),
+        }
+        for platform in PLATFORMS
+    ]
+
+
+@connexify_app.post("/api/data/links")
+async def create_link():
+    await delay()
+    return JSONResponse(
+        {
+            "onboarding_url": f"https://connect.example/{uuid.uuid4().hex}",
+            "expires_at": "2099-01-01T00:00:00Z",
+        }
+    )
+
+
+def serve(name: str, port: int):
+    from granian import Granian
+    from granian.constants import Interfaces
+
+    Granian(
+        f"benchmarks.fakes:{name}_app",
+        port=port,
+        interface=Interfaces.ASGI,
+        log_enabled=False,
+    ).serve()
+
+
+def start_all() -> list[multiprocessing.Process]:
+    """Start every fake in its own process and return the processes."""
+    processes = [
+        multiprocessing.Process(target=serve, args=(name, port))
+        for name, port in PORTS.items()
+    ]
+    for process in processes:
+        process.start()
+    return processes
+
+
+def upstream_env(host: str = "127.0.0.1") -> dict[str, str]:
+    """Environment variables that point the app at the fakes."""
+    return {
+        "API_BACKEND_URL": f"http://{host}:{PORTS['backend']}",
+        "LEMONADO_MCP_URL": f"http://{host}:{PORTS['mcp']}/mcp",
+        "LEMONADO_BEARER_TOKEN": "benchmark",
+        "MISTRAL_SERVER_URL": f"http://{host}:{PORTS['mistral']}",
+        "MISTRAL_API_KEY": "benchmark",
+        "CONNEXIFY_API_URL": f"http://{host}:{PORTS['connexify']}",
+        "CONNEXIFY_API_KEY": "benchmark",
+        "CONNEXIFY_WEBHOOK_SECRET": "benchmark",
+    }
+
+
+if __name__ == "__main__":
+    for process in start_all():
+        process.join()
@@ -0,0 +1,89 @@
+"""Measure how long `import app.app` takes and where the time goes.
+
+Runs the import in fresh interpreters under `python -X importtime` and prints
+the median total and the slowest top-level packages. Exits non-zero when the
+median exceeds `--budget-ms` or when any module that is meant to load on first
+use (see `LAZY_MODULES`) is imported at startup, so CI can catch regressions.
+
+    python -m benchmarks.importtime [--runs 5] [--top 15] [--budget-ms 0]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+TARGET = "app.app"
+LAZY_MODULES = (
+    "mistralai",
+    "fastapi",
+    "opentelemetry",
+    "app.api",
+    "app.mistral_gateway",
+    "app.mcp_server.client",
+    "app.connexify.webhook_queue",
+)
+CHECK = (
+    f"import sys, {TARGET}; "
+    f"print('eager:' + ','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+)
+
+
+def measure() -> tuple[float, dict[str, float], list[str]]:
+    """Import the app once; return total ms, self ms per top-level package, eager lazies."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHECK],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.getcwd()},
+        check=True,
+    )
+    total = 0.0
+    by_package: dict[str, float] = defaultdict(float)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        by_package[name.strip().split(".")[0]] += int(self_us) / 1000
+        if name.strip() == TARGET:
+            total = int(cumulative_us) / 1000
+    # Reflex may print warnings on import, so look for the marked line.
+    marked = [line for line in result.stdout.splitlines() if line.startswith("eager:")]
+    eager = [m for m in marked[-1][len("eager:") :].split(",") if m]
+    return total, by_package, eager
+
+
+def main(runs: int, top: int, budget_ms: float) -> int:
+    totals = []
+    packages: dict[str, list[float]] = defaultdict(list)
+    eager: list[str] = []
+    for _ in range(runs):
+        total, by_package, eager = measure()
+        totals.append(total)
+        for package, ms in by_package.items():
+            packages[package].append(ms)
+    median = statistics.median(totals)
+    print(f"import {TARGET}: median {median:.0f} ms over {runs} runs")
+    print(f"{'package':<28} {'self ms':>9}")
+    ranked = sorted(packages.items(), key=lambda item: -statistics.median(item[1]))
+    for package, values in ranked[:top]:
+        print(f"{package:<28} {statistics.median(values):>9.1f}")
+    failed = False
+    if eager:
+        print(f"Loaded at startup but should be lazy: {', '.join(eager)}")
+        failed = True
+    if budget_ms and median > budget_ms:
+        print(f"Import time {median:.0f} ms is over the {budget_ms:.0f} ms budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=0, help="0 disables the check")
+    args = parser.parse_args()
+    sys.exit(main(args.runs, args.top, args.budget_ms))
@@ -0,0 +1,250 @@
+"""Load generator for the app's hot paths, run against the local fakes.
+
+Drives `AppState.load_summary`, `AppState.ask_copilot` (once per copilot
+provider) and the Connexify webhook endpoint at each concurrency level, and
+reports throughput and p50/p95/p99 latency. State event handlers run on an
+in-memory stand-in for the Reflex state proxy, so everything below the
+handler (caches, pools, breakers, gateways) is the real code.
+
+    python -m benchmarks.load --concurrency 1,8,32 --requests 200
+    python -m benchmarks.load --no-cache     # bypass result caches per call
+    python -m benchmarks.load --external     # fakes already running
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import inspect
+import itertools
+import json
+import os
+import tempfile
+import time
+import types
+from typing import Awaitable, Callable
+
+from benchmarks.fakes import PORTS, start_all, upstream_env
+
+for name, value in upstream_env().items():
+    os.environ.setdefault(name, value)
+os.environ.setdefault(
+    "WEBHOOK_QUEUE_PATH", os.path.join(tempfile.mkdtemp(), "webhook_queue.db")
+)
+
+import httpx
+import app.config
+from app.answer_cache import answer_cache
+from app.api import api
+from app.backend_client import backend_client
+from app.connexify.client import connexify_client
+from app.connexify.webhook_queue import webhook_queue
+from app.kpi_cache import kpi_cache
+from app.mcp_server.catalog import mcp_catalog
+from app.mcp_server.pool import mcp_pool
+from app.mistral_gateway import mistral_gateway
+from app.state import AppState
+
+COPILOT_PROVIDERS = {
+    "mcp": {"LEMONADO_BEARER_TOKEN": "benchmark", "MISTRAL_API_KEY": None},
+    "mistral": {"LEMONADO_BEARER_TOKEN": None, "MISTRAL_API_KEY": "benchmark"},
+    "backend": {"LEMONADO_BEARER_TOKEN": None, "MISTRAL_API_KEY": None},
+}
+# Question numbers are unique per process so the answer cache never matches.
+question_ids = itertools.count()
+
+
+class StateStub:
+    """Stand-in for the state proxy Reflex passes to background events.
+
+    Starts from the state class's default values, makes `async with self:` a
+    no-op and binds the class's helper methods to itself.
+    """
+
+    def __init__(self, state_cls: type):
+        self._state_cls = state_cls
+        for name, field in state_cls.get_fields().items():
+            if name in state_cls.base_vars:
+                setattr(self, name, field.default_value())
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.__dict__["_state_cls"], name)
+        if inspect.isfunction(attr):
+            return types.MethodType(attr, self)
+        raise AttributeError(name)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_level(
+    call: Callable[[int], Awaitable[bool]], requests: int, concurrency: int
+) -> dict[str, float]:
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                ok = await call(i)
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "errors": errors,
+    }
+
+
+def load_summary_scenario(no_cache: bool) -> Callable[[int], Awaitable[bool]]:
+    async def call(i: int) -> bool:
+        if no_cache:
+            kpi_cache.invalidate()
+        state = StateStub(AppState)
+        await AppState.load_summary.fn(state)
+        return not state.kpi_error
+
+    return call
+
+
+def copilot_scenario(provider: str, no_cache: bool) -> Callable[[int], Awaitable[bool]]:
+    async def call(i: int) -> bool:
+        for name, value in COPILOT_PROVIDERS[provider].items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        app.config.get_settings.cache_clear()
+        if no_cache:
+            mcp_catalog.invalidate()
+            answer_cache.invalidate()
+        state = StateStub(AppState)
+        await AppState.ask_copilot.fn(
+            state,
+            {"question": f"How did campaign {next(question_ids)} perform last week?"},
+        )
+        return not state.chat_error and state.chat_messages[-1]["role"] == "assistant"
+
+    return call
+
+
+def webhook_scenario(client: httpx.AsyncClient) -> Callable[[int], Awaitable[bool]]:
+    secret = app.config.CONNEXIFY_WEBHOOK_SECRET.encode()
+    run_id = time.time_ns()
+    event_ids = itertools.count()
+
+    async def call(i: int) -> bool:
+        body = json.dumps(
+            {
+                "id": f"bench-{run_id}-{next(event_ids)}",
+                "event": "account.connected",
+                "data": {"client_id": f"client_{i % 50}"},
+            }
+        ).encode()
+        response = await client.post(
+            "/api/webhooks/connexify",
+            content=body,
+            headers={
+                "content-type": "application/json",
+                "x-connexify-signature": hmac.new(secret, body, hashlib.sha256).hexdigest(),
+            },
+        )
+        return response.status_code == 202
+
+    return call
+
+
+async def wait_for_fakes(timeout: float = 20.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        for port in PORTS.values():
+            while True:
+                try:
+                    await client.get(f"http://127.0.0.1:{port}/docs")
+                    break
+                except httpx.TransportError:
+                    if time.monotonic() > deadline:
+                        raise RuntimeError(f"Fake upstream on port {port} did not start.")
+                    await asyncio.sleep(0.2)
+
+
+async def main(args: argparse.Namespace):
+    await wait_for_fakes()
+    await backend_client.start()
+    await connexify_client.start()
+    await webhook_queue.start()
+    webhook_client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=api), base_url="http://bench"
+    )
+    scenarios = {
+        "load_summary": load_summary_scenario(args.no_cache),
+        **{
+            f"ask_copilot[{provider}]": copilot_scenario(provider, args.no_cache)
+            for provider in COPILOT_PROVIDERS
+        },
+        "webhook": webhook_scenario(webhook_client),
+    }
+    selected = args.scenarios.split(",") if args.scenarios else list(scenarios)
+    print(
+        f"{'scenario':<22} {'conc':>5} {'req/s':>9} {'p50 ms':>9} "
+        f"{'p95 ms':>9} {'p99 ms':>9} {'errors':>7}"
+    )
+    try:
+        for name in selected:
+            for concurrency in args.concurrency:
+                await run_level(scenarios[name], min(concurrency, args.requests), concurrency)
+                result = await run_level(scenarios[name], args.requests, concurrency)
+                print(
+                    f"{name:<22} {concurrency:>5} {result['rps']:>9.1f} "
+                    f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                    f"{result['p99_ms']:>9.2f} {result['errors']:>7}"
+                )
+    finally:
+        await webhook_client.aclose()
+        await webhook_queue.close()
+        await backend_client.close()
+        await connexify_client.close()
+        await mcp_pool.close()
+        await mistral_gateway.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--concurrency",
+        type=lambda value: [int(level) for level in value.split(",")],
+        default=[1, 8, 32],
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--scenarios", default="", help="comma-separated subset")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--external", action="store_true")
+    args = parser.parse_args()
+    processes = [] if args.external else start_all()
+    try:
+        asyncio.run(main(args))
+    finally:
+        for process in processes:
+            process.terminate()
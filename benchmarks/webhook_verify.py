@@ -0,0 +1,122 @@
+"""Compare webhook signature verification paths.
+
+`legacy` is the previous dependency: buffer the body with `request.body()`,
+HMAC it, then let FastAPI parse the same body again into the payload model.
+`streaming` is `app.connexify.webhooks.verify_signature`: one streamed read
+with an incremental HMAC and a single (orjson) decode.
+
+    python -m benchmarks.webhook_verify [--requests 2000] [--concurrency 32]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import statistics
+import time
+
+os.environ.setdefault("CONNEXIFY_WEBHOOK_SECRET", "benchmark-secret")
+
+import httpx
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
+from app.api import WebhookPayload, verified_payload
+
+SECRET = os.environ["CONNEXIFY_WEBHOOK_SECRET"]
+PAYLOAD_SIZES = (1024, 64 * 1024, 512 * 1024)
+
+
+async def legacy_verify_signature(
+    request: Request, x_connexify_signature: str = Header(...)
+):
+    body = await request.body()
+    expected = hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(expected, x_connexify_signature):
+        raise HTTPException(status_code=403, detail="Invalid signature.")
+
+
+async def legacy_handler(
+    payload: WebhookPayload, signature: str = Depends(legacy_verify_signature)
+):
+    return {"event": payload.event}
+
+
+async def streaming_handler(payload: WebhookPayload = Depends(verified_payload)):
+    return {"event": payload.event}
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_api_route("/legacy", legacy_handler, methods=["POST"])
+    app.add_api_route("/streaming", streaming_handler, methods=["POST"])
+    return app
+
+
+def make_body(size: int) -> bytes:
+    accounts = []
+    body = b""
+    while len(body) < size:
+        accounts.append(
+            {
+                "id": f"acc_{len(accounts)}",
+                "platform": "google_ads",
+                "display_name": f"Account {len(accounts)}",
+                "status": "active",
+            }
+        )
+        body = json.dumps(
+            {"event": "account.connected", "data": {"client_id": "c1", "accounts": accounts}}
+        ).encode()
+    return body
+
+
+async def run(client: httpx.AsyncClient, path: str, body: bytes, requests: int, concurrency: int):
+    headers = {
+        "content-type": "application/json",
+        "x-connexify-signature": hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest(),
+    }
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(path, content=body, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main(requests: int, concurrency: int):
+    app = build_app()
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        print(f"{'size':>8} {'path':>10} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+        for size in PAYLOAD_SIZES:
+            body = make_body(size)
+            for path in ("/legacy", "/streaming"):
+                await run(client, path, body, min(requests, 50), concurrency)
+                result = await run(client, path, body, requests, concurrency)
+                print(
+                    f"{len(body) // 1024:>6}KB {path[1:]:>10} {result['rps']:>9.0f} "
+                    f"{result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,46 @@
+import pytest
+
+from app.answer_cache import AnswerCache
+
+
+@pytest.fixture
+def cache():
+    return AnswerCache(threshold=0.85, ttl=3600)
+
+
+def test_rephrased_question_is_served_from_cache(cache):
+    cache.put("tenant", "kpis", "What is the CPA for LinkedIn ads?", "cpa answer")
+    assert cache.get("tenant", "kpis", "what is the cpa for linkedin ads") == "cpa answer"
+    assert cache.get("tenant", "kpis", "What's the CPA for LinkedIn ads?") == "cpa answer"
+    assert (cache.hits, cache.misses) == (2, 0)
+
+
+@pytest.mark.parametrize(
+    "cached, asked",
+    [
+        ("what is the cpc for linkedin ads", "what is the cpa for linkedin ads"),
+        ("what was my roas on meta ads", "what was my ctr on meta ads"),
+        (
+            "what was my total spend on bing ads last month",
+            "what was my total spend on google ads last month",
+        ),
+        ("how many clicks did we get last week", "how many clicks did we get this week"),
+        ("how many clicks in the last 7 days", "how many clicks in the last 30 days"),
+        ("total spend yesterday", "total spend today"),
+    ],
+)
+def test_near_miss_questions_do_not_match(cache, cached, asked):
+    cache.put("tenant", "kpis", cached, "cached answer")
+    assert cache.get("tenant", "kpis", asked) is None
+    assert cache.misses == 1
+
+
+def test_synonyms_share_a_key_term(cache):
+    cache.put("tenant", "kpis", "what did we spend on facebook ads last week", "answer")
+    assert cache.get("tenant", "kpis", "what did we spend on facebook ads past week") == "answer"
+
+
+def test_answers_are_scoped_to_tenant_and_snapshot(cache):
+    cache.put("tenant", "kpis", "total spend last week", "answer")
+    assert cache.get("other", "kpis", "total spend last week") is None
+    assert cache.get("tenant", "new-kpis", "total spend last week") is None
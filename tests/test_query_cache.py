@@ -0,0 +1,208 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from datetime import date
+
+from app.mcp_server.catalog import MCPCatalogCache
+from app.mcp_server.copilot import answer_question
+from app.mcp_server.query_cache import SQLResultCache
+from app.mcp_server.schemas import ToolCallResponse
+
+
+def _result(query: str) -> dict:
+    return {"content": [{"type": "text", "text": f"rows for {query}"}], "isError": False}
+
+
+class FakeMCPClient:
+    def __init__(self, calls: list):
+        self.calls = calls
+
+    async def call_tool(self, tool_name: str, arguments: dict) -> dict:
+        self.calls.append((tool_name, arguments["query"]))
+        await asyncio.sleep(0)
+        return _result(arguments["query"])
+
+    async def call_tools(self, requests: list) -> list[ToolCallResponse]:
+        self.calls.append([(req.tool_name, req.arguments["query"]) for req in requests])
+        await asyncio.sleep(0)
+        return [ToolCallResponse(result=_result(req.arguments["query"])) for req in requests]
+
+
+class FakePool:
+    def __init__(self):
+        self.calls: list = []
+
+    @asynccontextmanager
+    async def session(self, tenant_id: str):
+        yield FakeMCPClient(self.calls)
+
+
+def test_identical_query_is_served_from_cache():
+    pool = FakePool()
+    cache = SQLResultCache(pool=pool, disk_path=None)
+
+    async def run():
+        first = await cache.execute_sql("tenant", "SELECT SUM(spend) FROM metrics")
+        second = await cache.execute_sql("tenant", "select  sum(spend)\nfrom METRICS;")
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert second == first
+    assert pool.calls == [("execute_sql", "SELECT SUM(spend) FROM metrics")]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_is_per_tenant():
+    pool = FakePool()
+    cache = SQLResultCache(pool=pool, disk_path=None)
+
+    async def run():
+        await cache.execute_sql("a", "SELECT 1")
+        await cache.execute_sql("b", "SELECT 1")
+
+    asyncio.run(run())
+    assert len(pool.calls) == 2
+
+
+def test_concurrent_identical_queries_share_one_call():
+    pool = FakePool()
+    cache = SQLResultCache(pool=pool, disk_path=None)
+
+    async def run():
+        return await asyncio.gather(
+            *(cache.execute_sql("tenant", "SELECT 1") for _ in range(5))
+        )
+
+    results = asyncio.run(run())
+    assert all(result == results[0] for result in results)
+    assert len(pool.calls) == 1
+
+
+def test_batch_sends_only_misses_and_repeats_hit_the_cache():
+    pool = FakePool()
+    cache = SQLResultCache(pool=pool, disk_path=None)
+
+    async def run():
+        await cache.execute_sql("tenant", "SELECT 1")
+        first = await cache.execute_sql_many("tenant", ["SELECT 1", "SELECT 2", "SELECT 3"])
+        second = await cache.execute_sql_many("tenant", ["SELECT 3", "SELECT 2", "SELECT 1"])
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == [_result("SELECT 1"), _result("SELECT 2"), _result("SELECT 3")]
+    assert second == first[::-1]
+    assert pool.calls == [
+        ("execute_sql", "SELECT 1"),
+        [("execute_sql", "SELECT 2"), ("execute_sql", "SELECT 3")],
+    ]
+
+
+def test_errors_are_not_cached():
+    pool = FakePool()
+    cache = SQLResultCache(pool=pool, disk_path=None)
+    error = {"content": [{"type": "text", "text": "syntax error"}], "isError": True}
+
+    async def failing_call_tool(tool_name: str, arguments: dict) -> dict:
+        pool.calls.append((tool_name, arguments["query"]))
+        return error
+
+    @asynccontextmanager
+    async def session(tenant_id: str):
+        client = FakeMCPClient(pool.calls)
+        client.call_tool = failing_call_tool
+        yield client
+
+    pool.session = session
+
+    async def run():
+        return [await cache.execute_sql("tenant", "SELEC 1") for _ in range(2)]
+
+    assert asyncio.run(run()) == [error, error]
+    assert len(pool.calls) == 2
+
+
+def test_repeated_copilot_question_does_not_reach_mcp():
+    calls: list = []
+
+    def text(value) -> dict:
+        return {"content": [{"type": "text", "text": json.dumps(value)}], "isError": False}
+
+    class CopilotClient:
+        async def call_tool(self, tool_name: str, arguments: dict) -> dict:
+            calls.append(tool_name)
+            return text([{"name": "ads_daily"}])
+
+        async def call_tools(self, requests: list) -> list[ToolCallResponse]:
+            calls.append([req.tool_name for req in requests])
+            if requests[0].tool_name == "get_object_details":
+                return [
+                    ToolCallResponse(result=text({"columns": ["date", "platform", "spend"]}))
+                    for _ in requests
+                ]
+            return [
+                ToolCallResponse(result=text([{"platform": "meta_ads", "spend": 12.5}]))
+                for _ in requests
+            ]
+
+    class CopilotPool:
+        @asynccontextmanager
+        async def session(self, tenant_id: str):
+            yield CopilotClient()
+
+    pool = CopilotPool()
+    catalog = MCPCatalogCache(pool=pool)
+    cache = SQLResultCache(pool=pool, disk_path=None)
+
+    async def ask() -> str:
+        return await answer_question(
+            "tenant",
+            "What did we spend in the last 7 days?",
+            catalog=catalog,
+            sql=cache,
+            today=date(2025, 10, 21),
+        )
+
+    first = asyncio.run(ask())
+    second = asyncio.run(ask())
+    assert second == first
+    assert "ads_daily, 2025-10-14 to 2025-10-20:" in first
+    assert "platform: meta_ads, spend: 12.50" in first
+    assert calls == ["list_objects", ["get_object_details"], ["execute_sql"]]
+
+
+def test_invalidate_during_fetch_discards_the_stale_result(tmp_path):
+    pool = FakePool()
+    cache = SQLResultCache(pool=pool, disk_path=str(tmp_path / "sql.db"))
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_call_tool(tool_name: str, arguments: dict) -> dict:
+        pool.calls.append((tool_name, arguments["query"]))
+        started.set()
+        await release.wait()
+        return _result(arguments["query"])
+
+    @asynccontextmanager
+    async def session(tenant_id: str):
+        client = FakeMCPClient(pool.calls)
+        client.call_tool = slow_call_tool
+        yield client
+
+    pool.session = session
+
+    async def run():
+        fetch = asyncio.create_task(cache.execute_sql("tenant", "SELECT 1"))
+        await started.wait()
+        await cache.invalidate("tenant")
+        release.set()
+        await fetch
+        started.clear()
+        second = asyncio.create_task(cache.execute_sql("tenant", "SELECT 1"))
+        await started.wait()
+        await second
+
+    asyncio.run(run())
+    assert len(pool.calls) == 2
+    restarted = SQLResultCache(pool=pool, disk_path=str(tmp_path / "sql.db"))
+    assert asyncio.run(restarted.execute_sql("tenant", "SELECT 1")) == _result("SELECT 1")
+    assert len(pool.calls) == 2
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from app.mcp_server.replica import MetricsReplica, ReplicaMiss, date_bounds
+
+
+class FakeSQLCache:
+    def __init__(self):
+        self.queries: list[str] = []
+
+    async def execute_sql(self, tenant_id: str, query: str) -> dict:
+        self.queries.append(query)
+        return {"content": [{"type": "text", "text": "from lemonado"}], "isError": False}
+
+    async def execute_sql_many(self, tenant_id: str, queries: list[str]) -> list[dict]:
+        return [await self.execute_sql(tenant_id, query) for query in queries]
+
+
+def _rows(platform: str, days: range) -> list[dict]:
+    return [
+        {"platform": platform, "date": f"2025-10-{day:02d}", "spend": 10.0, "clicks": 1}
+        for day in days
+    ]
+
+
+@pytest.fixture
+def replica(tmp_path):
+    replica = MetricsReplica(directory=str(tmp_path), fallback=FakeSQLCache(), enabled=True)
+    replica._upsert("tenant", "client_a", _rows("google_ads", range(1, 21)))
+    # The second account has synced a shorter range; only the overlap counts.
+    replica._upsert("tenant", "client_b", _rows("meta_ads", range(5, 25)))
+    yield replica
+    asyncio.run(replica.close())
+
+
+def test_date_bounds_needs_literal_bounds_on_both_sides():
+    assert date_bounds(
+        "SELECT SUM(spend) FROM metrics WHERE date >= '2025-10-01' AND date <= '2025-10-07'"
+    ) == ("2025-10-01", "2025-10-07")
+    assert date_bounds(
+        "select * from metrics where \"date\" between '2025-10-02' and '2025-10-03'"
+    ) == ("2025-10-02", "2025-10-03")
+    for query in (
+        "SELECT SUM(spend) FROM metrics",
+        "SELECT SUM(spend) FROM metrics WHERE date >= '2025-10-01'",
+        "SELECT SUM(spend) FROM metrics WHERE date >= date('now', '-90 days')",
+        "SELECT * FROM metrics WHERE date >= '2025-10-05' AND date <= '2025-10-06' "
+        "OR platform = 'x'",
+        "SELECT * FROM metrics WHERE end_date >= '2025-10-05' AND end_date <= '2025-10-06'",
+        "SELECT * FROM metrics WHERE date >= '2025-10-05' AND date <= '2025-10-06' "
+        "AND spend > (SELECT 1)",
+    ):
+        with pytest.raises(ReplicaMiss):
+            date_bounds(query)
+
+
+def test_covered_query_is_answered_locally(replica):
+    result = asyncio.run(
+        replica.execute_sql(
+            "tenant",
+            "SELECT platform, SUM(spend) AS spend FROM metrics "
+            "WHERE date >= '2025-10-05' AND date <= '2025-10-20' GROUP BY platform",
+        )
+    )
+    assert result["content"][0]["text"] == (
+        '[{"platform": "google_ads", "spend": 160.0}, {"platform": "meta_ads", "spend": 160.0}]'
+    )
+    assert replica.fallback.queries == []
+    assert replica.hits == 1
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT SUM(spend) FROM metrics",
+        "SELECT SUM(spend) FROM metrics WHERE date >= date('now', '-90 days')",
+        # Before the later account's first synced day.
+        "SELECT SUM(spend) FROM metrics WHERE date >= '2025-10-01' AND date <= '2025-10-10'",
+        # After the earlier account's last synced day.
+        "SELECT SUM(spend) FROM metrics WHERE date >= '2025-10-10' AND date <= '2025-10-22'",
+        "SELECT SUM(spend) FROM ads WHERE date >= '2025-10-05' AND date <= '2025-10-06'",
+        "SELECT SUM(cost) FROM metrics WHERE date >= '2025-10-05' AND date <= '2025-10-06'",
+        "SELECT * FROM metrics_sync WHERE date >= '2025-10-05' AND date <= '2025-10-06'",
+    ],
+)
+def test_uncovered_query_falls_back_to_lemonado(replica, query):
+    result = asyncio.run(replica.execute_sql("tenant", query))
+    assert result["content"][0]["text"] == "from lemonado"
+    assert replica.fallback.queries == [query]
+
+
+def test_disabled_replica_always_falls_back(tmp_path):
+    replica = MetricsReplica(directory=str(tmp_path), fallback=FakeSQLCache(), enabled=False)
+    query = "SELECT SUM(spend) FROM metrics WHERE date >= '2025-10-05' AND date <= '2025-10-06'"
+    asyncio.run(replica.execute_sql("tenant", query))
+    assert replica.fallback.queries == [query]
+    assert not any(tmp_path.iterdir())
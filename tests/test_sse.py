@@ -0,0 +1,73 @@
+import asyncio
+
+import httpx
+
+from app.mcp_server.sse import aiter_sse_events
+
+
+async def _lines(lines: list[str]):
+    for line in lines:
+        yield line
+
+
+def parse_lines(lines: list[str]) -> list[dict]:
+    async def run():
+        return [event async for event in aiter_sse_events(_lines(lines))]
+
+    return asyncio.run(run())
+
+
+def parse_chunks(chunks: list[bytes]) -> list[dict]:
+    """Parse a response body delivered in `chunks`, as the MCP client reads it."""
+
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def run():
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=stream()))
+        async with httpx.AsyncClient(transport=transport) as client:
+            async with client.stream("POST", "http://mcp.test/") as response:
+                return [event async for event in aiter_sse_events(response.aiter_lines())]
+
+    return asyncio.run(run())
+
+
+def test_multi_line_data_is_joined_with_newlines():
+    events = parse_lines(["event: message", "id: 7", "data: {", 'data: "a": 1', "data: }", ""])
+    assert events == [{"event": "message", "data": '{\n"a": 1\n}', "id": "7"}]
+
+
+def test_crlf_line_endings():
+    events = parse_chunks([b"event: update\r\ndata: one\r\n\r\ndata: two\r\n\r\n"])
+    assert events == [
+        {"event": "update", "data": "one", "id": None},
+        {"event": "message", "data": "two", "id": None},
+    ]
+
+
+def test_comment_lines_are_skipped():
+    events = parse_lines([": keep-alive", "data: ping", ":another comment", "", ": only", ""])
+    assert events == [{"event": "message", "data": "ping", "id": None}]
+
+
+def test_events_split_across_chunk_boundaries():
+    body = b'id: 1\ndata: {"jsonrpc": "2.0", "id": 1}\n\nevent: note\ndata: second\n\n'
+    chunks = [body[i : i + 5] for i in range(0, len(body), 5)]
+    assert parse_chunks(chunks) == [
+        {"event": "message", "data": '{"jsonrpc": "2.0", "id": 1}', "id": "1"},
+        {"event": "note", "data": "second", "id": "1"},
+    ]
+
+
+def test_final_event_without_trailing_blank_line_is_dispatched():
+    assert parse_chunks([b"data: first\n\n", b"data: last"]) == [
+        {"event": "message", "data": "first", "id": None},
+        {"event": "message", "data": "last", "id": None},
+    ]
+
+
+def test_field_without_space_and_event_without_data():
+    assert parse_lines(["data:x", "", "event: unused", ""]) == [
+        {"event": "message", "data": "x", "id": None}
+    ]